@@ -6,14 +6,21 @@ Convenience imports for quick access.
 Usage:
     from eod_strategy import (
         StrategyConfig, run_strategy_on_dataframe,
-        simulate_positions, compare_signals, run_core_strategy
+        simulate_positions, compare_signals, run_core_strategy,
+        SRStrategyConfig, run_sr_strategy
     )
 """
 
+__version__ = "0.1.0"
+
 from .eod_continuation import StrategyConfig, run_strategy_on_dataframe
 from .simulator import simulate_positions
 from .compare_logs import compare_signals
 from .core_strategy import run_core_strategy
+from .sr_strategy import SRStrategyConfig, run_sr_strategy
+from .strategies import register_strategy, run_strategies
+from .metrics import compute_metrics, metrics_batch
+from .store import ResultStore
 
 __all__ = [
     "StrategyConfig",
@@ -21,4 +28,11 @@ __all__ = [
     "simulate_positions",
     "compare_signals",
     "run_core_strategy",
+    "SRStrategyConfig",
+    "run_sr_strategy",
+    "register_strategy",
+    "run_strategies",
+    "compute_metrics",
+    "metrics_batch",
+    "ResultStore",
 ]
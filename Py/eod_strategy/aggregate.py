@@ -0,0 +1,116 @@
+"""
+aggregate.py - In-memory aggregation of per-symbol equity curves for batch runs.
+
+Curves are collected as (timestamp, cumR) arrays while each dataset is
+processed, then merged in a single k-way timeline union: every curve is
+forward-filled onto the union timeline with one searchsorted call, so the
+cost is O(total points * log) instead of a chain of outer joins.
+"""
+import os
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def cumulative_r(results: pd.DataFrame, column: str = "R_mult") -> pd.Series:
+    """Running total of a per-trade column; trades without a value (NaN R) add 0, as in compute_metrics."""
+    return results[column].astype(float).fillna(0.0).cumsum()
+
+def _to_utc_ns(timestamps) -> np.ndarray:
+    ts = pd.to_datetime(pd.Series(timestamps), utc=True, errors="coerce")
+    return ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+class EquityAggregator:
+    """
+    Collects equity curves as they are produced and merges them on demand.
+
+        agg = EquityAggregator()
+        agg.add("XAUUSD", "eod", results["timestamp"], cumulative_r(results))
+        df = agg.build()   # DatetimeIndex x ['XAUUSD_eod_cumR', ...]
+    """
+
+    def __init__(self):
+        self._curves: List[Tuple[str, np.ndarray, np.ndarray]] = []
+
+    def __len__(self):
+        return len(self._curves)
+
+    def add(self, symbol: str, name: str, timestamps, values, suffix: str = "cumR"):
+        """
+        Register one curve as column '{symbol}_{name}_{suffix}'. Duplicate
+        timestamps keep the last value (e.g. a BUY and a SELL on the same bar);
+        NaN points are dropped so the previous value carries forward.
+        """
+        ts = _to_utc_ns(timestamps)
+        vals = np.asarray(values, dtype=float)
+        if len(ts) != len(vals):
+            raise ValueError("timestamps and values must have the same length")
+        valid = (ts != np.iinfo(np.int64).min) & ~np.isnan(vals)  # NaT / NaN
+        ts, vals = ts[valid], vals[valid]
+        if len(ts) == 0:
+            return
+        order = np.argsort(ts, kind="stable")
+        ts, vals = ts[order], vals[order]
+        last = np.r_[ts[1:] != ts[:-1], True]
+        self._curves.append((f"{symbol}_{name}_{suffix}", ts[last], vals[last]))
+
+    def add_frame(self, symbol: str, curves: pd.DataFrame):
+        """Register every *_cumR column of a per-symbol equity_curves frame."""
+        for col in curves.columns:
+            if col.endswith("cumR"):
+                sub = curves[["timestamp", col]].dropna()
+                self.add(symbol, col[:-len("_cumR")], sub["timestamp"], sub[col])
+
+    def build(self) -> pd.DataFrame:
+        """Union all timelines and forward-fill each curve onto it."""
+        if not self._curves:
+            return pd.DataFrame()
+        timeline = np.unique(np.concatenate([ts for _, ts, _ in self._curves]))
+        out = np.full((len(timeline), len(self._curves)), np.nan)
+        for j, (_, ts, vals) in enumerate(self._curves):
+            pos = np.searchsorted(ts, timeline, side="right") - 1
+            have = pos >= 0
+            out[have, j] = vals[pos[have]]
+        index = pd.DatetimeIndex(timeline.view("datetime64[ns]"), name="timestamp").tz_localize("UTC")
+        return pd.DataFrame(out, index=index, columns=[name for name, _, _ in self._curves])
+
+
+# ---------------------- On-disk columnar output ----------------------
+
+def save_aggregate(df: pd.DataFrame, path: str) -> str:
+    """
+    Write an aggregate curve frame. Format follows the extension:
+      .parquet -> Parquet (needs pyarrow or fastparquet)
+      .npz     -> NumPy columnar archive (no extra dependency)
+      .csv     -> CSV
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        df.to_parquet(path)
+    elif ext == ".npz":
+        np.savez(path,
+                 timestamp=df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64),
+                 columns=np.asarray(df.columns, dtype=str),
+                 values=df.to_numpy(dtype=float))
+    elif ext == ".csv":
+        df.to_csv(path)
+    else:
+        raise ValueError(f"Unsupported aggregate output format: '{ext}'")
+    return path
+
+def load_aggregate(path: str) -> pd.DataFrame:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return pd.read_parquet(path)
+    if ext == ".npz":
+        with np.load(path) as z:
+            index = pd.DatetimeIndex(z["timestamp"].view("datetime64[ns]"), name="timestamp").tz_localize("UTC")
+            return pd.DataFrame(z["values"], index=index, columns=[str(c) for c in z["columns"]])
+    if ext == ".csv":
+        df = pd.read_csv(path)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        return df.set_index("timestamp")
+    raise ValueError(f"Unsupported aggregate output format: '{ext}'")
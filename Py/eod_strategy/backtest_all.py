@@ -6,31 +6,26 @@ Generates a batch_index.html when using YAML configs, with aggregate equity curv
 import os
 import argparse
 import pandas as pd
-import numpy as np
 import yaml
-import matplotlib.pyplot as plt
-import base64
 
-from .eod_continuation import StrategyConfig, run_strategy_on_dataframe
-from .core_strategy import run_core_strategy
-from .simulator import simulate_positions
+from .sr_strategy import SRStrategyConfig
+from .strategies import REGISTRY, run_strategies
+from .sizing import ContractSpec, load_contract_specs, size_trades
+from .costs import CostModel, check_cost_models, load_cost_models
+from .simulator import simulate_positions, stoch_cross_indices, TradePathIndex
+from .reporting import ReportPool, render_symbol_report, render_aggregate
+from .aggregate import EquityAggregator, cumulative_r, save_aggregate
+from .metrics import compute_metrics, yearly_metrics
+from .store import ResultStore, config_hash, config_params, dataset_fingerprint
+from .manifest import build_manifest, is_up_to_date, write_manifest
 
 def calc_metrics(results: pd.DataFrame) -> dict:
-    if results is None or len(results) == 0:
-        return {"trades": 0, "win_rate": 0.0, "avg_r": 0.0, "total_r": 0.0, "max_dd": 0.0}
-    n = len(results)
-    win_rate = (results["exit_reason"] == "TP").mean() if n > 0 else 0.0
-    avg_r = float(results["R_mult"].mean())
-    total_r = float(results["R_mult"].sum())
-    cum_r = results["R_mult"].cumsum()
-    max_dd = float((cum_r.cummax() - cum_r).max())
-    return {
-        "trades": int(n),
-        "win_rate": round(win_rate * 100, 2),
-        "avg_r": round(avg_r, 3),
-        "total_r": round(total_r, 3),
-        "max_dd": round(max_dd, 3)
-    }
+    """
+    Trade metrics for one result set. Keeps the original keys
+    (trades, win_rate, avg_r, total_r, max_dd) and adds the extended
+    risk statistics from eod_strategy.metrics.
+    """
+    return compute_metrics(results)
 
 def load_prices(csv_path: str) -> pd.DataFrame:
     df = pd.read_csv(csv_path)
@@ -43,151 +38,214 @@ def load_prices(csv_path: str) -> pd.DataFrame:
     df.columns = [c.lower() for c in df.columns]
     return df
 
-def _embed_image(path):
-    if not os.path.exists(path):
-        return "<p>No image available</p>"
-    with open(path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode("utf-8")
-    return f'<img src="{os.path.basename(path)}" style="max-width:800px;">'
-
-def write_html_report(symbol, outdir, metrics_df):
-    html_path = os.path.join(outdir, f"{symbol}_report.html")
-    equity_img = os.path.join(outdir, f"{symbol}_equity_curve.png")
-    metrics_img = os.path.join(outdir, f"{symbol}_metrics.png")
-
-    html = f"""
-    <html>
-    <head><title>{symbol} Strategy Report</title></head>
-    <body>
-    <h1>{symbol} Strategy Report</h1>
-    <h2>Metrics</h2>
-    {metrics_df.to_html()}
-    <h2>Equity Curve</h2>
-    {_embed_image(equity_img)}
-    <h2>Metrics Chart</h2>
-    {_embed_image(metrics_img)}
-    <h2>Downloads</h2>
-    <ul>
-        <li><a href="metrics_summary.csv">metrics_summary.csv</a></li>
-        <li><a href="equity_curves.csv">equity_curves.csv</a></li>
-        <li><a href="core_results.csv">core_results.csv</a></li>
-        <li><a href="eod_results.csv">eod_results.csv</a></li>
-    </ul>
-    </body>
-    </html>
+def run_all(csv_path: str, symbol: str, outdir: str, plots: bool = True,
+            report_pool: ReportPool = None, aggregator: EquityAggregator = None,
+            configs: dict = None, strategies=None, contract: ContractSpec = None,
+            equity: float = 10_000.0, risk_percent: float = 1.0,
+            costs: CostModel = None, store: ResultStore = None, batch_id: str = None) -> str:
     """
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
-    return html_path
-
-def run_all(csv_path: str, symbol: str, outdir: str) -> str:
+    Run every strategy on one dataset and write CSVs + report into outdir.
+    plots=False skips chart rendering (metrics-only runs).
+    report_pool: optional ReportPool to render the report asynchronously.
+    aggregator: optional EquityAggregator that receives this symbol's curves in memory.
+    configs: {strategy name: config} overrides (e.g. {"SR": SRStrategyConfig(...)}).
+    strategies: registered strategy names to run (default: all).
+    contract: optional ContractSpec; trades are then sized at risk_percent of
+              equity and results/metrics gain lots and money PnL columns.
+    costs: optional CostModel (spread / commission / slippage / swap) netted
+           into fills, PnL and R multiples.
+    store: optional ResultStore; every strategy (and its _cross exit variant)
+           is appended to the run catalogue with signals, trades and metrics.
+    Strategies with a Stochastic (registry exit_stoch) also get a `{name}_cross`
+    row that exits on the first opposite cross of their own %K/%D.
+    """
+    if costs is not None:
+        check_cost_models({symbol: costs}, {symbol: contract} if contract is not None else {}, [symbol])
     os.makedirs(outdir, exist_ok=True)
     prices = load_prices(csv_path)
 
-    # --- EOD Strategy ---
-    eod_cfg = StrategyConfig(symbol=symbol)
-    eod_signals = run_strategy_on_dataframe(prices, eod_cfg)
-    eod_results = simulate_positions(eod_signals, prices)
-    eod_metrics = calc_metrics(eod_results)
-    eod_signals.to_csv(os.path.join(outdir, "eod_signals.csv"), index=False)
-    eod_results.to_csv(os.path.join(outdir, "eod_results.csv"), index=False)
-
-    # --- Core Strategy ---
-    core_signals = run_core_strategy(prices)
-    core_results = simulate_positions(core_signals, prices)
-    core_metrics = calc_metrics(core_results)
-    core_signals.to_csv(os.path.join(outdir, "core_signals.csv"), index=False)
-    core_results.to_csv(os.path.join(outdir, "core_results.csv"), index=False)
+    path_index = TradePathIndex(prices)
+
+    # Signals for every registered strategy over one shared indicator graph
+    signals, graph = run_strategies(prices, configs, names=strategies, symbol=symbol)
+
+    cfgs = {name: (configs or {}).get(name) or REGISTRY[name].default_config(symbol=symbol) for name in signals}
+
+    dataset_hash = dataset_fingerprint(prices) if store is not None else None
+
+    def _record(name, cfg, sig, res, exit_on_cross):
+        store.record_run(symbol, name, _run_params(cfg, exit_on_cross), prices, sig, res, rows[name],
+                         batch_id=batch_id, dataset_hash=dataset_hash)
+
+    results, rows = {}, {}
+    for name, sig in signals.items():
+        res = simulate_positions(sig, prices, path_index, costs=costs, contract=contract)
+        if contract is not None:
+            res = size_trades(res, contract, equity=equity, risk_percent=risk_percent)
+        results[name] = res
+        rows[name] = calc_metrics(res)
+        sig.to_csv(os.path.join(outdir, f"{name.lower()}_signals.csv"), index=False)
+        res.to_csv(os.path.join(outdir, f"{name.lower()}_results.csv"), index=False)
+
+    # Exits on the first opposite cross of each strategy's own Stoch, compared against SL/TP only
+    cross_idx = {}
+    for name, sig in signals.items():
+        if store is not None:
+            _record(name, cfgs[name], sig, results[name], False)
+        exit_stoch = REGISTRY[name].exit_stoch
+        if exit_stoch is None:
+            continue
+        triple = tuple(exit_stoch(cfgs[name]))
+        if triple not in cross_idx:
+            cross_idx[triple] = stoch_cross_indices(*graph.stoch(*triple))
+        cross = simulate_positions(sig, prices, path_index, exit_on_cross=True, cross_idx=cross_idx[triple],
+                                   costs=costs, contract=contract)
+        if contract is not None:
+            cross = size_trades(cross, contract, equity=equity, risk_percent=risk_percent)
+        rows[f"{name}_cross"] = calc_metrics(cross)
+        if store is not None:
+            _record(f"{name}_cross", cfgs[name], sig, cross, True)
 
     # Consolidated metrics
-    metrics_df = pd.DataFrame([core_metrics, eod_metrics], index=["Core", "EOD"])
+    metrics_df = pd.DataFrame(list(rows.values()), index=list(rows.keys()))
     metrics_path = os.path.join(outdir, "metrics_summary.csv")
     metrics_df.to_csv(metrics_path)
+    yearly = pd.concat({name: yearly_metrics(res) for name, res in results.items()}, names=["strategy"])
+    yearly.to_csv(os.path.join(outdir, "metrics_by_year.csv"))
 
     # Equity curves
     curves = pd.DataFrame()
-    if len(core_results) > 0:
-        core_curve = core_results[["timestamp", "R_mult"]].copy()
-        core_curve["core_cumR"] = core_curve["R_mult"].cumsum()
-        curves = pd.merge(curves, core_curve[["timestamp","core_cumR"]], on="timestamp", how="outer") if not curves.empty else core_curve
-    if len(eod_results) > 0:
-        eod_curve = eod_results[["timestamp", "R_mult"]].copy()
-        eod_curve["eod_cumR"] = eod_curve["R_mult"].cumsum()
-        curves = pd.merge(curves, eod_curve[["timestamp","eod_cumR"]], on="timestamp", how="outer") if not curves.empty else eod_curve
+    for name, res in results.items():
+        if len(res) == 0:
+            continue
+        curve = res[["timestamp"]].copy()
+        curve[f"{name.lower()}_cumR"] = cumulative_r(res)
+        curves = pd.merge(curves, curve, on="timestamp", how="outer") if not curves.empty else curve
 
     if not curves.empty:
         curves = curves.sort_values("timestamp")
         curves.to_csv(os.path.join(outdir, "equity_curves.csv"), index=False)
 
-        # Plot equity curves
-        plt.figure(figsize=(10,5))
-        if "core_cumR" in curves:
-            plt.plot(curves["timestamp"], curves["core_cumR"], label="Core")
-        if "eod_cumR" in curves:
-            plt.plot(curves["timestamp"], curves["eod_cumR"], label="EOD")
-        plt.title(f"Cumulative R - {symbol}")
-        plt.xlabel("Time")
-        plt.ylabel("Cumulative R")
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig(os.path.join(outdir, f"{symbol}_equity_curve.png"))
-        plt.close()
-
-        # Plot metrics bar chart
-        metrics_df.T.plot(kind="bar", figsize=(8,4), title=f"Metrics - {symbol}")
-        plt.tight_layout()
-        plt.savefig(os.path.join(outdir, f"{symbol}_metrics.png"))
-        plt.close()
-
-    # HTML report
-    write_html_report(symbol, outdir, metrics_df)
+    if aggregator is not None:
+        _add_curves(aggregator, symbol, results)
+
+    # Charts + HTML report (skipped when inputs are unchanged)
+    if report_pool is not None:
+        report_pool.submit(symbol, outdir, metrics_df, curves, strategies=list(results))
+    else:
+        render_symbol_report(symbol, outdir, metrics_df, curves, plots=plots, strategies=list(results))
 
     return metrics_path
 
-def run_from_config(config_path: str):
+def _run_params(cfg, exit_on_cross: bool) -> dict:
+    """Parameters a strategy run is recorded under in the result store."""
+    return dict(config_params(cfg), exit_on_cross=exit_on_cross)
+
+def _in_store(store: ResultStore, csv_path: str, symbol: str, configs: dict = None, strategies=None) -> bool:
+    """True when `store` already holds every strategy's run of this dataset and config."""
+    dataset_hash = dataset_fingerprint(load_prices(csv_path))
+    for name in strategies if strategies is not None else REGISTRY:
+        cfg = (configs or {}).get(name) or REGISTRY[name].default_config(symbol=symbol)
+        if store.runs(symbol=symbol, strategy=name, dataset_hash=dataset_hash,
+                      config_hash=config_hash(_run_params(cfg, False))).empty:
+            return False
+    return True
+
+def _add_curves(aggregator: EquityAggregator, symbol: str, results: dict):
+    for name, res in results.items():
+        if len(res) > 0:
+            aggregator.add(symbol, name.lower(), res["timestamp"], cumulative_r(res))
+            if "pnl_money" in res:
+                aggregator.add(symbol, name.lower(), res["timestamp"],
+                               cumulative_r(res, "pnl_money"), suffix="money")
+
+def _load_results(outdir: str, names) -> dict:
+    """Re-read the per-strategy results a previous run_all wrote into outdir."""
+    return {name: pd.read_csv(os.path.join(outdir, f"{name.lower()}_results.csv")) for name in names}
+
+def _sr_kwargs(opts: dict) -> dict:
+    opts = dict(opts or {})
+    if "sr_levels" in opts:
+        opts["sr_levels"] = tuple(float(x) for x in opts["sr_levels"])
+    return opts
+
+def run_from_config(config_path: str, plots: bool = True, workers: int = None, store_path: str = None,
+                    force: bool = False):
+    """
+    Batch run over the YAML `datasets` list. Datasets whose outdir manifest
+    (input hash, config hash, package version, source hash) still matches are
+    skipped and only feed their saved curves into the aggregate, unless the
+    result store is missing their runs; force=True reruns all.
+    Optional top-level keys:
+      aggregate_output: path for the merged equity curves (.parquet / .npz / .csv)
+      strategies: registered strategy names to run (default: all)
+      contracts: contract spec table (CSV/YAML, see sizing.load_contract_specs)
+      account: {equity: 10000, risk_percent: 1.0} used with `contracts`
+      costs: per-symbol cost table (CSV/YAML, see costs.load_cost_models)
+      store: SQLite result store path (see store.ResultStore); store_path overrides it
+    Optional per-dataset keys:
+      sr: SRStrategyConfig fields, e.g. {sr_levels: [1900, 1950], near_sr_tolerance_pct: 0.5}
+      strategies: overrides the top-level list
+    """
     with open(config_path, "r") as f:
         cfg = yaml.safe_load(f)
 
     index_entries = []
     root_outdir = None
+    aggregator = EquityAggregator()
+    specs = load_contract_specs(cfg["contracts"]) if cfg.get("contracts") else {}
+    account = cfg.get("account", {})
+    cost_models = load_cost_models(cfg["costs"]) if cfg.get("costs") else {}
+    check_cost_models(cost_models, specs, [item.get("symbol", "XAUUSD") for item in cfg.get("datasets", [])])
+    store_path = store_path or cfg.get("store")
+    store = ResultStore(store_path) if store_path else None
+    batch_id = pd.Timestamp.now(tz="UTC").strftime("%Y%m%dT%H%M%S%f")
+    completed = []
 
-    for item in cfg.get("datasets", []):
-        file = item["file"]
-        symbol = item.get("symbol", "XAUUSD")
-        outdir = item.get("outdir", f"reports/{symbol.lower()}")
-        if root_outdir is None:
-            root_outdir = os.path.dirname(outdir) if "/" in outdir else outdir
-        print(f"Running backtest for {symbol} on {file}...")
-        run_all(file, symbol, outdir)
-        index_entries.append((symbol, outdir, f"{symbol}_report.html"))
-
-    # Aggregate equity curves
-    agg_df = None
-    for symbol, outdir, _ in index_entries:
-        curve_path = os.path.join(outdir, "equity_curves.csv")
-        if os.path.exists(curve_path):
-            df = pd.read_csv(curve_path, parse_dates=["timestamp"])
-            df = df.set_index("timestamp")
-            if agg_df is None:
-                agg_df = df
+    with ReportPool(workers=workers if plots else 0, plots=plots) as pool:
+        for item in cfg.get("datasets", []):
+            file = item["file"]
+            symbol = item.get("symbol", "XAUUSD")
+            outdir = item.get("outdir", f"reports/{symbol.lower()}")
+            if root_outdir is None:
+                root_outdir = os.path.dirname(outdir) if "/" in outdir else outdir
+            configs = {"SR": SRStrategyConfig(symbol=symbol, **_sr_kwargs(item.get("sr", {})))}
+            kwargs = dict(configs=configs, strategies=item.get("strategies", cfg.get("strategies")),
+                          contract=specs.get(symbol),
+                          equity=float(account.get("equity", 10_000.0)),
+                          risk_percent=float(account.get("risk_percent", 1.0)),
+                          costs=cost_models.get(symbol))
+            manifest = build_manifest(file, symbol, plots=plots, **kwargs)
+            # A store that lacks these runs (new, or first used now) needs the rerun
+            if not force and is_up_to_date(outdir, manifest) and (
+                    store is None or _in_store(store, file, symbol, configs, manifest["strategies"])):
+                print(f"Skipping {symbol}: {outdir} is up to date")
+                _add_curves(aggregator, symbol, _load_results(outdir, manifest["strategies"]))
             else:
-                agg_df = agg_df.join(df, how="outer")
+                print(f"Running backtest for {symbol} on {file}...")
+                run_all(file, symbol, outdir, plots=plots, report_pool=pool, aggregator=aggregator,
+                        store=store, batch_id=batch_id, **kwargs)
+                completed.append((outdir, manifest))
+            index_entries.append((symbol, outdir, f"{symbol}_report.html"))
+
+    if store is not None:
+        store.close()
+    # Manifests go last so a failed run or report is recomputed next time
+    for outdir, manifest in completed:
+        write_manifest(outdir, manifest)
 
+    # Aggregate equity curves (single k-way merge of the in-memory curves)
+    agg_df = aggregator.build()
     all_curve_path = None
-    if agg_df is not None and not agg_df.empty:
-        agg_df = agg_df.sort_index().fillna(method="ffill")
-        plt.figure(figsize=(10,6))
-        for col in agg_df.columns:
-            if col.endswith("cumR"):
-                plt.plot(agg_df.index, agg_df[col], label=col)
-        plt.title("Aggregate Equity Curves Across Symbols")
-        plt.xlabel("Time")
-        plt.ylabel("Cumulative R")
-        plt.legend()
-        all_curve_path = os.path.join(root_outdir, "all_equity_curves.png")
-        plt.savefig(all_curve_path)
-        plt.close()
+    money_cols = [c for c in agg_df.columns if c.endswith("_money")]
+    if money_cols:
+        agg_df["portfolio_money"] = agg_df[money_cols].fillna(0).sum(axis=1)
+    if not agg_df.empty:
+        if cfg.get("aggregate_output"):
+            save_aggregate(agg_df, cfg["aggregate_output"])
+        if plots:
+            os.makedirs(root_outdir, exist_ok=True)
+            all_curve_path = render_aggregate(agg_df, root_outdir)
 
     # Build master index
     if root_outdir:
@@ -212,16 +270,29 @@ def _parse_args():
     p.add_argument("--symbol", default="XAUUSD")
     p.add_argument("--outdir", default="reports")
     p.add_argument("--config", help="YAML config for batch runs")
+    p.add_argument("--no-plots", dest="plots", action="store_false",
+                   help="Skip chart rendering (metrics/CSV only)")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Report rendering processes for --config runs (0 = inline; default: CPU count)")
+    p.add_argument("--store", help="SQLite result store to append runs to (e.g. results.sqlite)")
+    p.add_argument("--force", action="store_true",
+                   help="Rerun every dataset in --config even when its run manifest is unchanged")
     return p.parse_args()
 
 def main():
     args = _parse_args()
     if args.config:
-        run_from_config(args.config)
+        run_from_config(args.config, plots=args.plots, workers=args.workers, store_path=args.store,
+                        force=args.force)
     else:
         if not args.csv:
             raise ValueError("CSV file required unless --config is specified.")
-        run_all(args.csv, args.symbol, args.outdir)
+        store = ResultStore(args.store) if args.store else None
+        try:
+            run_all(args.csv, args.symbol, args.outdir, plots=args.plots, store=store)
+        finally:
+            if store is not None:
+                store.close()
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,52 @@
 """
 core_strategy.py - Core Strategy (Financial Markets Online)
-Daily chart, EMA stack + RSI confirmation.
+Daily chart, EMA stack + RSI confirmation, optional weekly/monthly bias.
 """
 
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
 import pandas as pd
 import numpy as np
 
+from .indicators import IndicatorGraph, ema_bank, htf_bias, rsi_bank
+
+
+@dataclass
+class CoreStrategyConfig:
+    symbol: str = "XAUUSD"
+    rsi_len: int = 14
+    ema_periods: Tuple[int, int, int] = (20, 50, 100)
+    tp_r_multiple: float = 2.0
+    rsi_smoothing: str = "wilder"  # "wilder" (MT5/TradingView), "ema" (legacy) or "sma"
+    # Higher-timeframe bias filter (optional): "W" or "M", None = off
+    htf_timeframe: Optional[str] = None
+    htf_mode: str = "ema"  # "ema": fast vs slow EMA, "stoch": %K vs %D
+    htf_ema_fast: int = 5
+    htf_ema_slow: int = 10
+    htf_stoch_k_len: int = 14
+    htf_stoch_k_smooth: int = 3
+    htf_stoch_d_smooth: int = 3
+
+
 def run_core_strategy(df: pd.DataFrame,
                       rsi_len: int = 14,
                       ema_periods=(20, 50, 100),
-                      tp_r_multiple: float = 2.0) -> pd.DataFrame:
+                      tp_r_multiple: float = 2.0,
+                      cache=None,
+                      rsi_smoothing: str = "wilder",
+                      htf_timeframe: Optional[str] = None,
+                      htf_mode: str = "ema",
+                      htf_ema: Tuple[int, int] = (5, 10),
+                      htf_stoch: Tuple[int, int, int] = (14, 3, 3)) -> pd.DataFrame:
     """
     Core Strategy logic.
+    cache: optional indicators.IndicatorGraph built on the same dataframe.
+    rsi_smoothing: "wilder" (platform RSI), "ema" (ewm(span) as in earlier
+                   versions) or "sma"; see indicators.rsi_bank.
+    htf_timeframe: "W"/"M" to also require the bias of the last completed
+                   weekly/monthly bar (htf_mode "ema": htf_ema fast vs slow,
+                   "stoch": %K vs %D of htf_stoch); see indicators.htf_bias.
     Returns a DataFrame of signals:
       ['timestamp','side','entry','stop','tp','rsi','ema20','ema50','ema100']
     """
@@ -26,17 +61,24 @@ def run_core_strategy(df: pd.DataFrame,
             raise ValueError("DataFrame must have datetime index or 'timestamp' column.")
 
     # EMAs
-    ema20, ema50, ema100 = [df["close"].ewm(span=p, adjust=False).mean() for p in ema_periods]
+    if cache is not None:
+        ema20, ema50, ema100 = [cache.ema(p) for p in ema_periods]
+    else:
+        ema20, ema50, ema100 = ema_bank(df["close"].to_numpy(dtype=float), ema_periods)
     df["ema20"], df["ema50"], df["ema100"] = ema20, ema50, ema100
 
     # RSI
-    delta = df["close"].diff()
-    up = delta.clip(lower=0)
-    down = -1*delta.clip(upper=0)
-    roll_up = up.ewm(span=rsi_len, adjust=False).mean()
-    roll_down = down.ewm(span=rsi_len, adjust=False).mean()
-    rs = roll_up / roll_down.replace(0, np.nan)
-    df["rsi"] = 100 - (100 / (1 + rs))
+    if cache is not None:
+        df["rsi"] = cache.rsi(rsi_len, rsi_smoothing)
+    else:
+        df["rsi"] = rsi_bank(df["close"].to_numpy(dtype=float), [rsi_len], rsi_smoothing)[0]
+
+    # Higher-timeframe bias
+    if htf_timeframe:
+        htf_long, htf_short = htf_bias(cache if cache is not None else IndicatorGraph(df),
+                                       htf_timeframe, htf_mode, htf_ema, htf_stoch)
+    else:
+        htf_long = htf_short = np.ones(len(df), dtype=bool)
 
     rows = []
     for i in range(1, len(df)):
@@ -46,8 +88,8 @@ def run_core_strategy(df: pd.DataFrame,
         rsi_i = df["rsi"].iloc[i]
 
         # Bias check
-        long_bias = ema20_i > ema50_i > ema100_i
-        short_bias = ema20_i < ema50_i < ema100_i
+        long_bias = ema20_i > ema50_i > ema100_i and htf_long[i]
+        short_bias = ema20_i < ema50_i < ema100_i and htf_short[i]
 
         # Signal
         if long_bias and rsi_i > 50:
@@ -0,0 +1,152 @@
+"""
+costs.py - Transaction cost model: spread, commission, slippage and swap.
+
+Costs are applied after exits are resolved, as vectorized adjustments to
+the fills and PnL, so the simulator's exit scan is unchanged:
+- spread: half the spread is paid on entry and half on exit
+- slippage: on stop/market fills (entry, SL, Open, Cross); TP limit fills
+  are not slipped. Fixed price units plus an optional fraction of ATR at entry
+- commission_per_lot: round-turn account currency per lot, turned into price
+  units with the symbol's ContractSpec, so it scales with lots like PnL does
+- swap_long / swap_short: price units charged per night held (negative = credit)
+
+R multiples stay relative to the original signal risk, so net R is directly
+comparable with the gross numbers calc_metrics reported before.
+"""
+import os
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+
+@dataclass
+class CostModel:
+    spread: float = 0.0
+    commission_per_lot: float = 0.0
+    slippage: float = 0.0
+    slippage_atr_frac: float = 0.0
+    atr_len: int = 14
+    swap_long: float = 0.0
+    swap_short: float = 0.0
+
+
+def load_cost_models(path: str) -> Dict[str, CostModel]:
+    """
+    Load {symbol: CostModel} from a CSV (symbol column + CostModel fields)
+    or a YAML mapping {SYMBOL: {spread: ..., ...}}.
+    """
+    names = {f.name for f in fields(CostModel)}
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".yaml", ".yml"):
+        with open(path, "r") as f:
+            table = yaml.safe_load(f) or {}
+        rows = {str(k): dict(v or {}) for k, v in table.items()}
+    else:
+        df = pd.read_csv(path)
+        df.columns = [c.lower() for c in df.columns]
+        if "symbol" not in df.columns:
+            raise ValueError("Cost table missing required column: 'symbol'")
+        rows = {str(r.pop("symbol")): r for r in df.to_dict("records")}
+    return {sym: CostModel(**{k: v for k, v in row.items() if k in names and not pd.isna(v)})
+            for sym, row in rows.items()}
+
+
+def check_cost_models(models: Dict[str, CostModel], contracts: Dict[str, object], symbols) -> None:
+    """
+    Fail before a batch starts when a symbol's commission cannot be applied:
+    commission_per_lot is converted to price units with the symbol's
+    ContractSpec, so every such symbol needs an entry in the contract table.
+    """
+    missing = sorted({sym for sym in symbols
+                      if sym in models and models[sym].commission_per_lot and sym not in contracts})
+    if missing:
+        raise ValueError(f"commission_per_lot is set for {missing} but the contract table has no spec "
+                         "for them; add them to `contracts` or drop their commission")
+
+
+def average_true_range(prices: pd.DataFrame, n: int = 14) -> np.ndarray:
+    """Simple moving average of the true range (NaN during warm-up)."""
+    high = prices["high"].to_numpy(dtype=float)
+    low = prices["low"].to_numpy(dtype=float)
+    close = prices["close"].to_numpy(dtype=float)
+    prev_close = np.r_[np.nan, close[:-1]]
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return pd.Series(tr).rolling(n, min_periods=n).mean().to_numpy()
+
+
+def apply_costs(
+    results: pd.DataFrame,
+    model: CostModel,
+    contract=None,
+    atr: Optional[np.ndarray] = None,
+    start: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Net simulated results of trading costs.
+
+    results : simulate_positions output
+    contract: sizing.ContractSpec, required when commission_per_lot != 0
+    atr, start: per-bar ATR array and each trade's entry bar index,
+                required when slippage_atr_frac != 0
+
+    Adds ['entry_fill','exit_fill','PnL_gross','R_mult_gross','cost'] and
+    replaces PnL / R_mult (and pnl_money when sized) with net values.
+    """
+    out = results.copy()
+    if len(results) == 0:
+        for col in ("entry_fill", "exit_fill", "PnL_gross", "R_mult_gross", "cost"):
+            out[col] = pd.Series(dtype=float)
+        return out
+
+    is_buy = out["side"].str.upper().to_numpy() == "BUY"
+    direction = np.where(is_buy, 1.0, -1.0)
+    entry = out["entry"].to_numpy(dtype=float)
+    exit_price = out["exit_price"].to_numpy(dtype=float)
+    reason = out["exit_reason"].to_numpy()
+
+    slip = np.full(len(out), float(model.slippage))
+    if model.slippage_atr_frac:
+        if atr is None or start is None:
+            raise ValueError("ATR-based slippage needs the ATR array and entry bar indices")
+        prev = np.asarray(start) - 1  # ATR known when the order is placed
+        ok = (prev >= 0) & (prev < len(atr))
+        atr_at = np.where(ok, np.asarray(atr)[np.where(ok, prev, 0)], np.nan)
+        slip += model.slippage_atr_frac * np.nan_to_num(atr_at)
+
+    half_spread = model.spread / 2.0
+    exit_slip = np.where(reason == "TP", 0.0, slip)
+    entry_fill = entry + direction * (half_spread + slip)
+    exit_fill = exit_price - direction * (half_spread + exit_slip)
+
+    commission = 0.0
+    if model.commission_per_lot:
+        if contract is None:
+            raise ValueError("commission_per_lot needs a ContractSpec to convert to price units")
+        commission = model.commission_per_lot / contract.value_per_price
+
+    nights = np.zeros(len(out))
+    if "exit_time" in out.columns:
+        held = (pd.to_datetime(out["exit_time"], utc=True).dt.normalize()
+                - pd.to_datetime(out["timestamp"], utc=True).dt.normalize())
+        nights = np.nan_to_num(held.dt.days.to_numpy(dtype=float))
+    swap = nights * np.where(is_buy, model.swap_long, model.swap_short)
+
+    gross = out["PnL"].to_numpy(dtype=float)
+    net = (exit_fill - entry_fill) * direction - commission - swap
+    # same risk definition as the simulator (signal R, else |entry - stop|)
+    risk = out["R"].to_numpy(dtype=float) if "R" in out.columns else np.abs(entry - out["stop"].to_numpy(dtype=float))
+    risk = np.where(risk == 0, np.nan, risk)
+
+    out["entry_fill"] = entry_fill
+    out["exit_fill"] = exit_fill
+    out["PnL_gross"] = gross
+    out["R_mult_gross"] = out["R_mult"]
+    out["cost"] = gross - net
+    out["PnL"] = net
+    out["R_mult"] = net / risk
+    if "pnl_money" in out.columns and contract is not None:
+        out["pnl_money"] = net * contract.value_per_price * out["lots"].to_numpy(dtype=float)
+    return out
@@ -14,6 +14,8 @@ Features
     * Short: entry = low_prev - buffer,  stop = high_prev + buffer
 - Exit hint (manual): opposite Stochastic %K/%D crossover.
 - Optional EMA(5/10) trend filter (default off).
+- Optional weekly/monthly bias filter (EMA fast/slow or %K/%D of the last
+  completed higher-timeframe bar; default off).
 - Modular API + CLI to read CSV and emit signals CSV.
 
 Usage
@@ -48,6 +50,12 @@ except ImportError:
     # Fallback; if not available, we skip tz enforcement
     ZoneInfo = None  # type: ignore
 
+try:
+    from .indicators import IndicatorGraph, ema_bank, htf_bias
+except ImportError:
+    # Run as a script (python eod_strategy/eod_continuation.py ...)
+    from indicators import IndicatorGraph, ema_bank, htf_bias
+
 
 # --------------------------- Config ---------------------------
 
@@ -68,6 +76,14 @@ class StrategyConfig:
     use_ema_filter: bool = False
     ema_fast: int = 5
     ema_slow: int = 10
+    # Higher-timeframe bias filter (optional): "W" or "M", None = off
+    htf_timeframe: Optional[str] = None
+    htf_mode: str = "ema"  # "ema": fast vs slow EMA, "stoch": %K vs %D
+    htf_ema_fast: int = 5
+    htf_ema_slow: int = 10
+    htf_stoch_k_len: int = 14
+    htf_stoch_k_smooth: int = 3
+    htf_stoch_d_smooth: int = 3
     # TP as R multiple (optional guidance column)
     tp_r_multiple: float = 2.0
     # Evaluation gate
@@ -80,7 +96,7 @@ class StrategyConfig:
 # ---------------------- Indicator utils ----------------------
 
 def ema(series: pd.Series, span: int) -> pd.Series:
-    return series.ewm(span=span, adjust=False).mean()
+    return pd.Series(ema_bank(series.to_numpy(dtype=float), [span])[0], index=series.index, name=series.name)
 
 def stochastic_kd(
     highs: pd.Series,
@@ -153,9 +169,10 @@ def past_cutoff_now(london_hhmm: Tuple[int, int], tz_name: str) -> bool:
 
 # ---------------------- Core strategy ----------------------
 
-def run_strategy_on_dataframe(df: pd.DataFrame, cfg: StrategyConfig) -> pd.DataFrame:
+def run_strategy_on_dataframe(df: pd.DataFrame, cfg: StrategyConfig, cache=None) -> pd.DataFrame:
     """
     EOD Continuation Strategy on a daily OHLCV dataframe.
+    cache: optional indicators.IndicatorGraph built on the same dataframe.
     Returns a dataframe of signals (one row per bar) with:
       ['timestamp','symbol','side','entry','stop','tp','body_pct','k','d','exit_hint']
     Notes:
@@ -176,21 +193,36 @@ def run_strategy_on_dataframe(df: pd.DataFrame, cfg: StrategyConfig) -> pd.DataF
 
     # Indicators
     if cfg.use_ema_filter:
-        df["ema_fast"] = ema(df["close"], cfg.ema_fast)
-        df["ema_slow"] = ema(df["close"], cfg.ema_slow)
-
-    df["k"], df["d"] = stochastic_kd(
-        df["high"], df["low"], df["close"],
-        k_len=cfg.stoch_k_len,
-        k_smooth=cfg.stoch_k_smooth,
-        d_smooth=cfg.stoch_d_smooth,
-    )
+        if cache is not None:
+            df["ema_fast"] = cache.ema(cfg.ema_fast)
+            df["ema_slow"] = cache.ema(cfg.ema_slow)
+        else:
+            df["ema_fast"], df["ema_slow"] = ema_bank(df["close"].to_numpy(dtype=float),
+                                                      [cfg.ema_fast, cfg.ema_slow])
+
+    if cache is not None:
+        k, d = cache.stoch(cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth)
+        df["k"], df["d"] = k, d
+    else:
+        df["k"], df["d"] = stochastic_kd(
+            df["high"], df["low"], df["close"],
+            k_len=cfg.stoch_k_len,
+            k_smooth=cfg.stoch_k_smooth,
+            d_smooth=cfg.stoch_d_smooth,
+        )
 
     strong_bull, strong_bear, body_pct = strong_candle_mask(
         df["open"], df["high"], df["low"], df["close"], cfg.body_min_pct
     )
     df["body_pct"] = body_pct
 
+    if cfg.htf_timeframe:
+        htf_long, htf_short = htf_bias(
+            cache if cache is not None else IndicatorGraph(df), cfg.htf_timeframe, cfg.htf_mode,
+            (cfg.htf_ema_fast, cfg.htf_ema_slow),
+            (cfg.htf_stoch_k_len, cfg.htf_stoch_k_smooth, cfg.htf_stoch_d_smooth),
+        )
+
     # Prepare result rows
     rows = []
 
@@ -225,6 +257,10 @@ def run_strategy_on_dataframe(df: pd.DataFrame, cfg: StrategyConfig) -> pd.DataF
             ema_ok_long = bool(ema_fast_prev > ema_slow_prev)
             ema_ok_short = bool(ema_fast_prev < ema_slow_prev)
 
+        # Optional higher-timeframe bias (last HTF bar completed before the closed bar's period)
+        htf_ok_long = bool(htf_long[i - 1]) if cfg.htf_timeframe else True
+        htf_ok_short = bool(htf_short[i - 1]) if cfg.htf_timeframe else True
+
         # Construct entry/stop from prior bar range + buffer
         entry_long = h_prev + cfg.buffer
         stop_long  = l_prev - cfg.buffer
@@ -232,8 +268,8 @@ def run_strategy_on_dataframe(df: pd.DataFrame, cfg: StrategyConfig) -> pd.DataF
         stop_short  = h_prev + cfg.buffer
 
         # Long & Short setup conditions (at prior close)
-        long_setup  = bull_ok  and k_ok_long  and ema_ok_long
-        short_setup = bear_ok  and k_ok_short and ema_ok_short
+        long_setup  = bull_ok  and k_ok_long  and ema_ok_long  and htf_ok_long
+        short_setup = bear_ok  and k_ok_short and ema_ok_short and htf_ok_short
 
         # Exit hints (for an open position managed manually):
         # If in long, exit when %K crosses *below* %D. If in short, exit when %K crosses *above* %D.
@@ -301,6 +337,9 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("--ema_filter", action="store_true", help="Enable EMA(5/10) trend filter")
     p.add_argument("--ema_fast", type=int, default=5)
     p.add_argument("--ema_slow", type=int, default=10)
+    p.add_argument("--htf", choices=["W", "M"], help="Weekly/monthly bias filter (last completed bar)")
+    p.add_argument("--htf_mode", choices=["ema", "stoch"], default="ema",
+                   help="HTF bias: EMA fast>slow or %%K>%%D")
     p.add_argument("--tp_r", type=float, default=2.0)
     p.add_argument("--cutoff", default="22:30", help="London cutoff HH:MM")
     p.add_argument("--no_cutoff_gate", action="store_true", help="Do not enforce cutoff gate")
@@ -333,6 +372,8 @@ def main():
         use_ema_filter=args.ema_filter,
         ema_fast=args.ema_fast,
         ema_slow=args.ema_slow,
+        htf_timeframe=args.htf,
+        htf_mode=args.htf_mode,
         tp_r_multiple=args.tp_r,
         london_cutoff_hhmm=(hh, mm),
         require_cutoff=not args.no_cutoff_gate,
@@ -0,0 +1,536 @@
+"""
+indicators.py - Shared indicator dependency graph for one dataset.
+
+Strategies declare the indicators they need as IndicatorSpec values
+(EMA(5), STOCH(14, 3, 3), RSI(14), ...). The graph expands each spec into
+its dependency nodes (e.g. Stoch %D -> %K -> raw %K -> rolling low/high),
+deduplicates them across strategies, computes every node once in
+dependency order and hands out read-only NumPy views.
+
+Usage:
+    graph = IndicatorGraph(prices)
+    graph.require(EMA(5), EMA(10), STOCH(14, 3, 3))
+    graph.compute()
+    ema5 = graph[EMA(5)]                   # read-only ndarray aligned to prices
+    k, d = graph.stoch(14, 3, 3)           # convenience accessors (computed lazily)
+
+The EMA, RSI and stochastic kernels (ema_bank, rsi_bank, stoch_bank) are
+also usable on their own for sweeps over many lengths at once. Pending EMA
+and rolling low/high nodes are computed together in one batched call.
+
+Higher-timeframe nodes (HTF_EMA("W", 5), HTF_STOCH("M", 14, 3, 3)) are
+computed on weekly/monthly bars resampled once per graph and mapped back to
+the daily bars without lookahead: each daily bar sees the value of the last
+*completed* higher-timeframe bar, i.e. the period before its own.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sparse_table import SparseTable
+except ImportError:
+    # Imported by eod_continuation.py run as a script
+    from sparse_table import SparseTable
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    kind: str
+    params: Tuple = ()
+
+    def __repr__(self):
+        return f"{self.kind.upper()}({', '.join(map(str, self.params))})"
+
+
+# Public constructors for the indicators strategies can declare
+def EMA(span: int) -> IndicatorSpec:
+    return IndicatorSpec("ema", (int(span),))
+
+def STOCH_K(k_len: int = 14, k_smooth: int = 3) -> IndicatorSpec:
+    return IndicatorSpec("stoch_k", (int(k_len), int(k_smooth)))
+
+def STOCH_D(k_len: int = 14, k_smooth: int = 3, d_smooth: int = 3) -> IndicatorSpec:
+    return IndicatorSpec("stoch_d", (int(k_len), int(k_smooth), int(d_smooth)))
+
+def STOCH(k_len: int = 14, k_smooth: int = 3, d_smooth: int = 3) -> List[IndicatorSpec]:
+    return [STOCH_K(k_len, k_smooth), STOCH_D(k_len, k_smooth, d_smooth)]
+
+def RSI(length: int = 14, smoothing: str = "wilder") -> IndicatorSpec:
+    return IndicatorSpec("rsi", (int(length), _check_smoothing(smoothing)))
+
+def HTF_EMA(timeframe: str, span: int) -> IndicatorSpec:
+    return IndicatorSpec("htf_ema", (_check_timeframe(timeframe), int(span)))
+
+def HTF_STOCH(timeframe: str, k_len: int = 14, k_smooth: int = 3, d_smooth: int = 3) -> List[IndicatorSpec]:
+    tf = _check_timeframe(timeframe)
+    return [IndicatorSpec("htf_stoch_k", (tf, int(k_len), int(k_smooth))),
+            IndicatorSpec("htf_stoch_d", (tf, int(k_len), int(k_smooth), int(d_smooth)))]
+
+def _col(name: str) -> IndicatorSpec:
+    return IndicatorSpec("col", (name,))
+
+
+# ---------------------- Node kinds ----------------------
+# kind -> (dependencies(params), compute(dep_arrays, params))
+
+def _rolling(a: np.ndarray, n: int, how: str) -> np.ndarray:
+    s = pd.Series(a).rolling(n, min_periods=n)
+    return getattr(s, how)().to_numpy()
+
+def _stoch_raw(close, ll, hh):
+    rng = hh - ll
+    rng = np.where(rng == 0, np.nan, rng)
+    return (close - ll) / rng * 100.0
+
+# ---------------------- Kernels ----------------------
+
+RSI_SMOOTHING = ("wilder", "ema", "sma")
+
+def _check_smoothing(smoothing: str) -> str:
+    if smoothing not in RSI_SMOOTHING:
+        raise ValueError(f"Unknown RSI smoothing: '{smoothing}' (expected one of {RSI_SMOOTHING})")
+    return smoothing
+
+# Higher timeframes -> pandas period frequency (weeks run Sunday..Saturday so a
+# Sunday session opens the new week, as on the FX platforms)
+HTF_FREQ = {"W": "W-SAT", "M": "M"}
+HTF_MODES = ("ema", "stoch")
+
+def _check_timeframe(timeframe: str) -> str:
+    if timeframe not in HTF_FREQ:
+        raise ValueError(f"Unknown higher timeframe: '{timeframe}' (expected one of {tuple(HTF_FREQ)})")
+    return timeframe
+
+_SCAN_BLOCK = 32
+
+def _linear_scan(x: np.ndarray, decay: np.ndarray) -> np.ndarray:
+    """
+    y[:, t] = decay * y[:, t-1] + x[:, t] with y[:, -1] = 0, for (rows x n) x.
+
+    Inside a block of B steps every output is a fixed lower-triangular
+    combination of the block's inputs (one batched matmul for all rows and
+    blocks). The true block-end states obey the same recurrence with decay**B,
+    so they are solved by recursing on the n / B block ends - no Python loop
+    over time.
+    """
+    m, n = x.shape
+    width = min(n, _SCAN_BLOCK)
+    lag = np.arange(width)[:, None] - np.arange(width)[None, :]
+    powers = decay[:, None] ** np.arange(width + 1, dtype=x.dtype)[None, :]
+    kernel = np.where(lag >= 0, powers[:, np.clip(lag, 0, None)], 0.0).astype(x.dtype)
+    if n <= width:
+        return np.matmul(x[:, None, :], kernel.transpose(0, 2, 1))[:, 0, :]
+    nblocks = -(-n // width)
+    padded = np.zeros((m, nblocks * width), dtype=x.dtype)
+    padded[:, :n] = x
+    y = np.matmul(padded.reshape(m, nblocks, width), kernel.transpose(0, 2, 1))
+    ends = _linear_scan(y[:, :, -1].copy(), powers[:, -1])
+    y[:, 1:, :] += powers[:, None, 1:] * ends[:, :-1, None]
+    return y.reshape(m, -1)[:, :n]
+
+def _ewm_recurrence(drive: np.ndarray, alpha: np.ndarray, start: np.ndarray, init: np.ndarray,
+                    dtype=np.float64) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * drive[t] for t > start, y[start] = init,
+    NaN before start. One row per alpha; drive is (rows x n) or a shared 1-D array.
+    Rows with non-finite inputs after their seed fall back to pandas ewm.
+    """
+    alpha = np.asarray(alpha, dtype=dtype).reshape(-1)
+    m = len(alpha)
+    raw = np.asarray(drive, dtype=dtype)
+    n = raw.shape[-1]
+    start = np.broadcast_to(np.asarray(start, dtype=np.int64), (m,))
+    init = np.broadcast_to(np.asarray(init, dtype=dtype), (m,))
+    if n == 0:
+        return np.empty((m, 0), dtype=dtype)
+    seeded = start < n
+    head = int(min(start.max(), n))
+    before = np.arange(head)[None, :] < start[:, None]  # only the first `head` bars can precede a seed
+
+    x = np.multiply(raw, alpha[:, None], dtype=dtype) if raw.ndim == 1 else (raw * alpha[:, None]).astype(dtype)
+    x[:, :head][before] = 0.0
+    x[np.flatnonzero(seeded), start[seeded]] = init[seeded]
+    with np.errstate(invalid="ignore"):  # NaN/inf rows are redone below
+        out = _linear_scan(x, 1.0 - alpha)
+    out[:, :head][before] = np.nan
+
+    # last non-finite input per row; a row is bad when it falls after the seed
+    rows_raw = np.broadcast_to(raw, (m, n)) if raw.ndim == 1 else raw
+    nonfinite = ~np.isfinite(raw if raw.ndim == 1 else rows_raw)
+    last_bad = n - 1 - np.argmax(nonfinite[..., ::-1], axis=-1)
+    last_bad = np.where(nonfinite.any(axis=-1), last_bad, -1)
+    bad = (np.broadcast_to(last_bad, (m,)) > start) | ~np.isfinite(init)
+    for r in np.flatnonzero(bad & seeded):
+        s = rows_raw[r].astype(float)
+        s[:start[r]] = np.nan
+        s[start[r]] = init[r]
+        out[r] = pd.Series(s).ewm(alpha=float(alpha[r]), adjust=False).mean().to_numpy()
+    return out
+
+def ema_bank(close, spans: Sequence[int], dtype=np.float64) -> np.ndarray:
+    """
+    EMAs of `close` for several spans at once -> (len(spans) x n) array.
+    Same values as Series.ewm(span=s, adjust=False).mean() (seeded with the
+    first valid close). dtype=np.float32 halves memory for large sweeps; the
+    recurrence is then evaluated in float32 as well.
+    """
+    close = np.asarray(close, dtype=float)
+    spans = np.asarray(spans, dtype=float).reshape(-1)
+    if (spans < 1).any():
+        raise ValueError("EMA spans must be >= 1")
+    n = len(close)
+    if n == 0:
+        return np.empty((len(spans), 0), dtype=dtype)
+    finite = np.flatnonzero(np.isfinite(close))
+    first = finite[0] if len(finite) else n
+    return _ewm_recurrence(close, 2.0 / (spans + 1.0), np.full(len(spans), first),
+                           np.full(len(spans), close[first] if first < n else np.nan), dtype=dtype)
+
+def _ema(close, span):
+    return ema_bank(close, [span])[0]
+
+def rsi_bank(close, lengths: Sequence[int], smoothing: str = "wilder") -> np.ndarray:
+    """
+    RSI for several lengths at once -> (len(lengths) x n) array.
+
+    smoothing:
+      "wilder": SMA seed over the first `length` changes, then alpha = 1/length
+                (MT5 / TradingView ta.rsi); first value at bar `length`
+      "ema"   : alpha = 2/(length+1) seeded with the first change (the original
+                ewm(span=length) implementation); first value at bar 1
+      "sma"   : simple moving average of gains / losses (Cutler); first value at bar `length`
+    Average loss of zero gives 100, as on the platforms.
+    """
+    _check_smoothing(smoothing)
+    close = np.asarray(close, dtype=float)
+    lengths = np.asarray(lengths, dtype=np.int64).reshape(-1)
+    if (lengths < 1).any():
+        raise ValueError("RSI lengths must be >= 1")
+    m, n = len(lengths), len(close)
+    if n == 0:
+        return np.empty((m, 0))
+
+    # gains (row 0) and losses (row 1) in one preallocated buffer
+    moves = np.zeros((2, n))
+    if n > 1:
+        np.subtract(close[1:], close[:-1], out=moves[0, 1:])
+        np.negative(moves[0, 1:], out=moves[1, 1:])
+        np.maximum(moves, 0.0, out=moves)
+    moves[:, 0] = np.nan
+
+    if smoothing == "sma":
+        csum = np.zeros((2, n + 1))
+        np.cumsum(np.nan_to_num(moves), axis=1, out=csum[:, 1:])
+        avg = np.full((2 * m, n), np.nan)
+        for i, L in enumerate(lengths):
+            if L < n:
+                avg[[i, m + i], L:] = (csum[:, L + 1:] - csum[:, 1:n + 1 - L]) / L
+    else:
+        if smoothing == "wilder":
+            alpha = 1.0 / lengths
+            start = lengths
+            csum = np.cumsum(np.nan_to_num(moves), axis=1)
+            seed = np.where(lengths < n, csum[:, np.minimum(lengths, n - 1)] / lengths, np.nan)
+        else:
+            alpha = 2.0 / (lengths + 1.0)
+            start = np.ones(m, dtype=np.int64)
+            seed = np.broadcast_to(moves[:, min(1, n - 1)][:, None], (2, m))
+        avg = _ewm_recurrence(np.repeat(moves, m, axis=0), np.tile(alpha, 2), np.tile(start, 2),
+                              np.concatenate([seed[0], seed[1]]))
+
+    up, down = avg[:m], avg[m:]
+    total = up + down
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(down == 0, 100.0, 100.0 * up / total)
+    out[np.isnan(total)] = np.nan
+    return out
+
+def _rsi(close, length, smoothing="wilder"):
+    return rsi_bank(close, [length], smoothing)[0]
+
+def rolling_extrema(values, windows: Sequence[int], op: str = "min") -> np.ndarray:
+    """
+    Trailing min/max for several window lengths -> (len(windows) x n) array,
+    equal to Series.rolling(w, min_periods=w).min()/max(). One sparse table
+    serves every window; windows containing a NaN are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    table = SparseTable(values, op)
+    nan_count = np.r_[0, np.cumsum(np.isnan(values))]
+    out = np.empty((len(windows), len(values)))
+    for row, w in enumerate(windows):
+        out[row] = table.rolling(w)
+        if nan_count[-1] and w <= len(values):
+            has_nan = nan_count[w:] - nan_count[:-w] > 0
+            out[row, w - 1:][has_nan] = np.nan
+    return out
+
+def _rolling_mean_rows(rows: np.ndarray, window: int) -> np.ndarray:
+    return pd.DataFrame(rows.T).rolling(window, min_periods=window).mean().to_numpy().T
+
+def stoch_bank(high, low, close, triples: Sequence[Tuple[int, int, int]]) -> np.ndarray:
+    """
+    Stochastic %K/%D for many (k_len, k_smooth, d_smooth) triples at once.
+
+    Returns a (len(triples) x 2 x n) array: [:, 0] = %K, [:, 1] = %D, with the
+    same values as stochastic_kd for each triple. Work is shared across the
+    sweep: one sparse table per price column answers every k_len, raw %K is
+    computed once per k_len and %K once per (k_len, k_smooth); the smoothing
+    runs as one multi-column rolling mean per window length.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    triples = [tuple(int(v) for v in t) for t in triples]
+    if any(min(t) < 1 for t in triples):
+        raise ValueError("Stochastic lengths must be >= 1")
+
+    k_lens = sorted({t[0] for t in triples})
+    ll = rolling_extrema(low, k_lens, "min")
+    hh = rolling_extrema(high, k_lens, "max")
+    raw = {k: _stoch_raw(close, ll[i], hh[i]) for i, k in enumerate(k_lens)}
+
+    def _smooth(sources: Dict[tuple, np.ndarray], keys, window_of) -> Dict[tuple, np.ndarray]:
+        out = {}
+        for w in sorted({window_of(key) for key in keys}):
+            group = [key for key in keys if window_of(key) == w]
+            rows = _rolling_mean_rows(np.vstack([sources[key] for key in group]), w)
+            out.update(zip(group, rows))
+        return out
+
+    k_keys = sorted({t[:2] for t in triples})
+    k_vals = _smooth({key: raw[key[0]] for key in k_keys}, k_keys, lambda key: key[1])
+    d_keys = sorted(set(triples))
+    d_vals = _smooth({key: k_vals[key[:2]] for key in d_keys}, d_keys, lambda key: key[2])
+
+    out = np.empty((len(triples), 2, len(close)))
+    for i, t in enumerate(triples):
+        out[i, 0] = k_vals[t[:2]]
+        out[i, 1] = d_vals[t]
+    return out
+
+# ---------------------- Higher timeframes ----------------------
+
+def htf_periods(index: pd.Index, timeframe: str) -> np.ndarray:
+    """
+    Higher-timeframe period number of each bar (0, 1, 2, ... in bar order).
+    The index must be a sorted DatetimeIndex; tz-aware stamps are bucketed
+    by their UTC calendar date.
+    """
+    freq = HTF_FREQ[_check_timeframe(timeframe)]
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError("Higher-timeframe indicators need a DatetimeIndex")
+    if not index.is_monotonic_increasing:
+        raise ValueError("Higher-timeframe indicators need a sorted index")
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    stamp = index.to_period(freq).asi8
+    new = np.r_[len(stamp) > 0, stamp[1:] != stamp[:-1]]
+    return np.cumsum(new) - 1
+
+def resample_htf(df: pd.DataFrame, timeframe: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Weekly ("W") or monthly ("M") OHLC bars from daily bars.
+    Returns (bars, periods): one row per period that has data, and the
+    period number of each daily bar (see htf_periods). The last period may
+    still be in progress.
+    """
+    df = df.rename(columns=str.lower)
+    periods = htf_periods(df.index, timeframe)
+    if len(periods) == 0:
+        return pd.DataFrame(columns=["open", "high", "low", "close"], dtype=float), periods
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:], len(periods)] - 1
+    bars = pd.DataFrame({
+        "open": df["open"].to_numpy(dtype=float)[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts),
+        "close": df["close"].to_numpy(dtype=float)[ends],
+    }, index=df.index[starts])
+    return bars, periods
+
+def align_htf(values: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Forward-fill higher-timeframe values onto bars without lookahead: bar t
+    gets the value of period periods[t] - 1, the last one completed before
+    its own period started (NaN during the first period).
+    """
+    out = np.full(len(periods), np.nan)
+    done = periods > 0
+    out[done] = np.asarray(values, dtype=float)[periods[done] - 1]
+    return out
+
+def htf_bias_specs(timeframe: str, mode: str = "ema", ema: Tuple[int, int] = (5, 10),
+                   stoch: Tuple[int, int, int] = (14, 3, 3)) -> List[IndicatorSpec]:
+    """Graph nodes behind htf_bias()."""
+    if mode not in HTF_MODES:
+        raise ValueError(f"Unknown higher-timeframe bias mode: '{mode}' (expected one of {HTF_MODES})")
+    if mode == "ema":
+        return [HTF_EMA(timeframe, ema[0]), HTF_EMA(timeframe, ema[1])]
+    return HTF_STOCH(timeframe, *stoch)
+
+def htf_bias(graph: "IndicatorGraph", timeframe: str, mode: str = "ema", ema: Tuple[int, int] = (5, 10),
+             stoch: Tuple[int, int, int] = (14, 3, 3)) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (long_ok, short_ok) masks from the last completed weekly/monthly bar:
+      "ema"  : EMA fast above / below EMA slow
+      "stoch": %K above / below %D
+    Bars without a completed higher-timeframe value allow neither side.
+    """
+    fast, slow = (graph[spec] for spec in htf_bias_specs(timeframe, mode, ema, stoch))
+    with np.errstate(invalid="ignore"):
+        return fast > slow, fast < slow
+
+def _htf_bank(bars: pd.DataFrame, specs: List[IndicatorSpec]) -> List[np.ndarray]:
+    """Values on the higher-timeframe bars for same-timeframe specs, batched like _BANKS."""
+    out = {}
+    emas = [s for s in specs if s.kind == "htf_ema"]
+    if emas:
+        out.update(zip(emas, ema_bank(bars["close"].to_numpy(), [s.params[1] for s in emas])))
+    stochs = [s for s in specs if s.kind != "htf_ema"]
+    if stochs:
+        triples = [s.params[1:] if s.kind == "htf_stoch_d" else s.params[1:] + (1,) for s in stochs]
+        kd = stoch_bank(bars["high"].to_numpy(), bars["low"].to_numpy(), bars["close"].to_numpy(), triples)
+        out.update((s, kd[i, 1 if s.kind == "htf_stoch_d" else 0]) for i, s in enumerate(stochs))
+    return [out[s] for s in specs]
+
+_HTF_KINDS = ("htf_ema", "htf_stoch_k", "htf_stoch_d")
+
+_NODES: Dict[str, Tuple[Callable, Callable]] = {
+    "col": (lambda p: [], None),
+    "ema": (lambda p: [_col("close")], lambda deps, p: _ema(deps[0], p[0])),
+    "lowest": (lambda p: [_col("low")], lambda deps, p: _rolling(deps[0], p[0], "min")),
+    "highest": (lambda p: [_col("high")], lambda deps, p: _rolling(deps[0], p[0], "max")),
+    "stoch_raw": (
+        lambda p: [_col("close"), IndicatorSpec("lowest", p), IndicatorSpec("highest", p)],
+        lambda deps, p: _stoch_raw(*deps),
+    ),
+    "stoch_k": (
+        lambda p: [IndicatorSpec("stoch_raw", (p[0],))],
+        lambda deps, p: _rolling(deps[0], p[1], "mean"),
+    ),
+    "stoch_d": (
+        lambda p: [STOCH_K(p[0], p[1])],
+        lambda deps, p: _rolling(deps[0], p[2], "mean"),
+    ),
+    "rsi": (lambda p: [_col("close")], lambda deps, p: _rsi(deps[0], p[0], p[1])),
+    # computed by IndicatorGraph from its cached higher-timeframe bars
+    **{kind: (lambda p: [], None) for kind in _HTF_KINDS},
+}
+
+
+# Kinds whose pending nodes are computed together: kind -> (input column, bank(values, lengths))
+_BANKS: Dict[str, Tuple[str, Callable]] = {
+    "ema": ("close", ema_bank),
+    "lowest": ("low", lambda v, w: rolling_extrema(v, w, "min")),
+    "highest": ("high", lambda v, w: rolling_extrema(v, w, "max")),
+}
+
+
+class IndicatorGraph:
+    """
+    Deduplicated indicator DAG over one OHLC dataframe.
+    Every node is computed at most once; results are read-only arrays.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.rename(columns=str.lower)
+        self.index = self.df.index
+        self._order: List[IndicatorSpec] = []
+        self._values: Dict[IndicatorSpec, np.ndarray] = {}
+        self._htf: Dict[str, Tuple[pd.DataFrame, np.ndarray]] = {}
+
+    @classmethod
+    def from_arrays(cls, df: pd.DataFrame, arrays: Dict[IndicatorSpec, np.ndarray]) -> "IndicatorGraph":
+        """Graph over df with nodes already computed elsewhere (e.g. shared-memory views)."""
+        graph = cls(df)
+        for spec, arr in arrays.items():
+            graph._store(spec, arr)
+        graph.require(*arrays)
+        return graph
+
+    def require(self, *specs) -> "IndicatorGraph":
+        """Add specs (or lists of specs) and their dependencies, in topological order."""
+        for spec in specs:
+            if isinstance(spec, (list, tuple)):
+                self.require(*spec)
+                continue
+            if spec in self._order:
+                continue
+            if spec.kind not in _NODES:
+                raise ValueError(f"Unknown indicator: {spec!r}")
+            deps, _ = _NODES[spec.kind]
+            self.require(*deps(spec.params))
+            self._order.append(spec)
+        return self
+
+    @property
+    def nodes(self) -> List[IndicatorSpec]:
+        return list(self._order)
+
+    def _store(self, spec: IndicatorSpec, arr):
+        arr = np.asarray(arr, dtype=float)
+        arr.setflags(write=False)
+        self._values[spec] = arr
+
+    def htf_bars(self, timeframe: str) -> Tuple[pd.DataFrame, np.ndarray]:
+        """(bars, periods) from resample_htf, resampled once per timeframe."""
+        if timeframe not in self._htf:
+            self._htf[timeframe] = resample_htf(self.df, timeframe)
+        return self._htf[timeframe]
+
+    def compute(self) -> "IndicatorGraph":
+        pending = [s for s in self._order if s.kind in _HTF_KINDS and s not in self._values]
+        for tf in sorted({s.params[0] for s in pending}):
+            bars, periods = self.htf_bars(tf)
+            group = [s for s in pending if s.params[0] == tf]
+            for spec, values in zip(group, _htf_bank(bars, group)):
+                self._store(spec, align_htf(values, periods))
+        for kind, (column, bank) in _BANKS.items():
+            pending = [s for s in self._order if s.kind == kind and s not in self._values]
+            if not pending:
+                continue
+            if _col(column) not in self._values:
+                self._store(_col(column), self.df[column].to_numpy(dtype=float))
+            rows = bank(self._values[_col(column)], [s.params[0] for s in pending])
+            for spec, row in zip(pending, rows):
+                self._store(spec, row)
+        for spec in self._order:
+            if spec in self._values:
+                continue
+            if spec.kind == "col":
+                arr = self.df[spec.params[0]].to_numpy(dtype=float)
+            else:
+                deps, fn = _NODES[spec.kind]
+                arr = fn([self._values[d] for d in deps(spec.params)], spec.params)
+            self._store(spec, arr)
+        return self
+
+    def __getitem__(self, spec: IndicatorSpec) -> np.ndarray:
+        if spec not in self._values:
+            self.require(spec).compute()
+        return self._values[spec]
+
+    def __contains__(self, spec: IndicatorSpec) -> bool:
+        return spec in self._values
+
+    # Convenience accessors used by the strategy functions
+    def ema(self, span: int) -> np.ndarray:
+        return self[EMA(span)]
+
+    def stoch(self, k_len: int = 14, k_smooth: int = 3, d_smooth: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        return self[STOCH_K(k_len, k_smooth)], self[STOCH_D(k_len, k_smooth, d_smooth)]
+
+    def rsi(self, length: int = 14, smoothing: str = "wilder") -> np.ndarray:
+        return self[RSI(length, smoothing)]
+
+    def htf_ema(self, timeframe: str, span: int) -> np.ndarray:
+        return self[HTF_EMA(timeframe, span)]
+
+    def htf_stoch(self, timeframe: str, k_len: int = 14, k_smooth: int = 3,
+                  d_smooth: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        k, d = HTF_STOCH(timeframe, k_len, k_smooth, d_smooth)
+        return self[k], self[d]
@@ -0,0 +1,109 @@
+"""
+manifest.py - Deterministic per-dataset run manifests for incremental batches.
+
+Each output directory carries a run_manifest.json with the input file hash,
+a hash of every setting that shapes the outputs (strategies and their
+resolved configs, contract, costs, account, plots), the package version and
+a hash of the package source, so editing any strategy, simulator or
+metrics module makes every manifest stale.
+The manifest is written last, so an interrupted run never looks complete,
+and contains no timestamps, so identical inputs always produce identical
+manifests. run_from_config skips datasets whose manifest still matches.
+"""
+import hashlib
+import json
+import os
+from dataclasses import asdict, is_dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from . import __version__
+from .store import config_hash, config_params
+from .strategies import REGISTRY
+
+MANIFEST_FILE = "run_manifest.json"
+MANIFEST_VERSION = 2
+
+# Files every completed dataset run leaves behind (besides per-strategy CSVs)
+_REQUIRED_OUTPUTS = ("metrics_summary.csv", "metrics_by_year.csv")
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_hash() -> str:
+    """Hash of every module in the package (file names and contents)."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for name in sorted(f for f in os.listdir(root) if f.endswith(".py")):
+        h.update(name.encode())
+        h.update(bytes.fromhex(file_hash(os.path.join(root, name))))
+    return h.hexdigest()
+
+
+def build_manifest(
+    csv_path: str,
+    symbol: str,
+    configs: Optional[dict] = None,
+    strategies: Optional[Iterable[str]] = None,
+    contract=None,
+    costs=None,
+    equity: float = 10_000.0,
+    risk_percent: float = 1.0,
+    plots: bool = True,
+) -> dict:
+    """Manifest for one run_all invocation (configs resolved like run_strategies)."""
+    names = list(strategies) if strategies is not None else list(REGISTRY)
+    configs = configs or {}
+    settings = {
+        "symbol": symbol,
+        "strategies": {
+            name: config_params(configs.get(name) or REGISTRY[name].default_config(symbol=symbol))
+            for name in names
+        },
+        "contract": asdict(contract) if is_dataclass(contract) else None,
+        "costs": asdict(costs) if is_dataclass(costs) else None,
+        "equity": float(equity),
+        "risk_percent": float(risk_percent),
+        "plots": bool(plots),
+    }
+    return {
+        "manifest_version": MANIFEST_VERSION,
+        "package_version": __version__,
+        "code_hash": code_hash(),
+        "input_file": os.path.basename(csv_path),
+        "input_hash": file_hash(csv_path),
+        "config_hash": config_hash(settings),
+        "strategies": names,
+    }
+
+
+def read_manifest(outdir: str) -> Optional[dict]:
+    path = os.path.join(outdir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_manifest(outdir: str, manifest: dict) -> str:
+    path = os.path.join(outdir, MANIFEST_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return path
+
+
+def is_up_to_date(outdir: str, manifest: dict) -> bool:
+    """True when outdir holds a matching manifest and every expected output."""
+    if read_manifest(outdir) != manifest:
+        return False
+    expected = list(_REQUIRED_OUTPUTS) + [f"{name.lower()}_results.csv" for name in manifest["strategies"]]
+    return all(os.path.exists(os.path.join(outdir, name)) for name in expected)
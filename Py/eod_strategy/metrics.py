@@ -0,0 +1,235 @@
+"""
+metrics.py - Columnar metrics engine for simulated trades.
+
+All statistics are derived from one set of array passes over R multiples
+(cumsum / running peak / run lengths) and work on 2-D inputs, so a whole
+sweep (variants x trades, NaN padded) is evaluated in one call.
+
+Usage:
+    from eod_strategy.metrics import compute_metrics, metrics_batch
+    stats = compute_metrics(results)             # dict, superset of calc_metrics keys
+    table = metrics_batch(r_matrix)              # dict of 1-D arrays, one value per row
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Keys reported by the original calc_metrics (order preserved)
+CORE_METRICS = ["trades", "win_rate", "avg_r", "total_r", "max_dd"]
+
+EXTENDED_METRICS = [
+    "avg_win", "avg_loss", "profit_factor", "expectancy",
+    "sharpe_r", "sortino_r", "max_win_streak", "max_loss_streak",
+    "max_underwater_trades", "max_underwater_days", "avg_mae_r", "avg_mfe_r",
+]
+
+_ROUNDING = {"win_rate": 2, "max_underwater_days": 1}
+
+
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """Length of the current run of True values at every position (along axis 1)."""
+    c = np.cumsum(mask, axis=1)
+    reset = np.maximum.accumulate(np.where(mask, 0, c), axis=1)
+    return c - reset
+
+def _as_2d(a, dtype=float) -> Optional[np.ndarray]:
+    if a is None:
+        return None
+    a = np.asarray(a, dtype=dtype)
+    return a[None, :] if a.ndim == 1 else a
+
+
+def metrics_batch(
+    r,
+    wins=None,
+    timestamps=None,
+    mae_r=None,
+    mfe_r=None,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every metric for each row of a (variants x trades) R-multiple array.
+
+    r         : 1-D or 2-D float array, NaN = no trade / padding
+    wins      : optional bool array (same shape) counted by win_rate only (e.g. TP
+                exits, as calc_metrics did); default R > 0. Streaks and the
+                win/loss averages always use R > 0 / R < 0.
+    timestamps: optional datetime64 / int64-ns array (same shape or 1-D shared)
+    mae_r/mfe_r: optional excursion arrays in R units (same shape)
+
+    Returns a dict of 1-D arrays (unrounded), keys CORE_METRICS + EXTENDED_METRICS.
+    """
+    r = _as_2d(r)
+    m, n = r.shape
+    valid = ~np.isnan(r)
+    trades = valid.sum(axis=1)
+    has = trades > 0
+    denom = np.where(has, trades, 1)
+    r0 = np.where(valid, r, 0.0)
+
+    pos = valid & (r0 > 0)
+    loss = valid & (r0 < 0)
+    win = pos if wins is None else (_as_2d(wins, bool) & valid)
+
+    total_r = r0.sum(axis=1)
+    avg_r = np.where(has, total_r / denom, 0.0)
+    win_rate = win.sum(axis=1) / denom * 100.0
+
+    gross_win = np.where(pos, r0, 0.0).sum(axis=1)
+    gross_loss = -np.where(loss, r0, 0.0).sum(axis=1)
+    n_pos = pos.sum(axis=1)
+    n_neg = loss.sum(axis=1)
+    avg_win = np.where(n_pos > 0, gross_win / np.maximum(n_pos, 1), 0.0)
+    avg_loss = np.where(n_neg > 0, -gross_loss / np.maximum(n_neg, 1), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_factor = np.where(gross_loss > 0, gross_win / gross_loss,
+                                 np.where(gross_win > 0, np.inf, 0.0))
+    expectancy = (n_pos / denom) * avg_win + (n_neg / denom) * avg_loss
+
+    # Dispersion (per-trade Sharpe / Sortino on R)
+    dev = np.where(valid, r0 - avg_r[:, None], 0.0)
+    var = (dev ** 2).sum(axis=1) / np.maximum(trades - 1, 1)
+    std = np.sqrt(var)
+    downside = np.sqrt((np.minimum(r0, 0.0) ** 2).sum(axis=1) / denom)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe_r = np.where((trades > 1) & (std > 0), avg_r / std, 0.0)
+        sortino_r = np.where(downside > 0, avg_r / downside, 0.0)
+
+    # Drawdown / time under water from one cumulative pass
+    cum = np.cumsum(r0, axis=1)
+    peak = np.maximum.accumulate(cum, axis=1)
+    dd = peak - cum
+    max_dd = np.where(has, dd.max(axis=1, initial=0.0), 0.0)
+    under = (dd > 0) & valid
+    max_underwater_trades = _run_lengths(under).max(axis=1, initial=0)
+
+    max_win_streak = _run_lengths(pos).max(axis=1, initial=0)
+    max_loss_streak = _run_lengths(loss).max(axis=1, initial=0)
+
+    max_underwater_days = np.zeros(m)
+    if timestamps is not None and n > 0:
+        ts = np.asarray(timestamps)
+        if np.issubdtype(ts.dtype, np.datetime64):
+            ts = ts.astype("datetime64[ns]").astype(np.int64)
+        ts = np.broadcast_to(_as_2d(ts, np.int64), (m, n))
+        idx = np.broadcast_to(np.arange(n), (m, n))
+        # index of the most recent equity peak at each trade
+        peak_idx = np.maximum.accumulate(np.where(under, 0, idx), axis=1)
+        elapsed = ts - np.take_along_axis(ts, peak_idx, axis=1)
+        elapsed = np.where(under, elapsed, 0)
+        max_underwater_days = elapsed.max(axis=1, initial=0) / 86_400e9
+
+    def _nanmean_rows(a):
+        if a is None:
+            return np.full(m, np.nan)
+        a = _as_2d(a)
+        cnt = (~np.isnan(a)).sum(axis=1)
+        return np.where(cnt > 0, np.nansum(a, axis=1) / np.maximum(cnt, 1), np.nan)
+
+    return {
+        "trades": trades,
+        "win_rate": win_rate,
+        "avg_r": avg_r,
+        "total_r": total_r,
+        "max_dd": max_dd,
+        "avg_win": avg_win,
+        "avg_loss": avg_loss,
+        "profit_factor": profit_factor,
+        "expectancy": expectancy,
+        "sharpe_r": sharpe_r,
+        "sortino_r": sortino_r,
+        "max_win_streak": max_win_streak,
+        "max_loss_streak": max_loss_streak,
+        "max_underwater_trades": max_underwater_trades,
+        "max_underwater_days": max_underwater_days,
+        "avg_mae_r": _nanmean_rows(mae_r),
+        "avg_mfe_r": _nanmean_rows(mfe_r),
+    }
+
+
+def _row(stats: Dict[str, np.ndarray], i: int = 0) -> dict:
+    out = {}
+    for key in CORE_METRICS + EXTENDED_METRICS:
+        v = stats[key][i]
+        if key in ("trades", "max_win_streak", "max_loss_streak", "max_underwater_trades"):
+            out[key] = int(v)
+        else:
+            out[key] = round(float(v), _ROUNDING.get(key, 3))
+    return out
+
+def _timestamps_ns(results: pd.DataFrame) -> Optional[np.ndarray]:
+    if "timestamp" not in results.columns:
+        return None
+    ts = pd.to_datetime(results["timestamp"], utc=True, errors="coerce")
+    if ts.isna().any():
+        return None
+    return ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+def compute_metrics(results: pd.DataFrame) -> dict:
+    """
+    Metrics for one simulated result set (output of simulate_positions).
+    Keys: CORE_METRICS (same definitions/rounding as calc_metrics) + EXTENDED_METRICS.
+    win_rate counts exit_reason 'TP' when that column exists (as calc_metrics
+    did); streaks and win/loss averages use R > 0 / R < 0.
+    Sized results (sizing.size_trades) also report net_money / max_dd_money.
+    """
+    if results is None or len(results) == 0:
+        out = {k: 0 if k == "trades" else 0.0 for k in CORE_METRICS + EXTENDED_METRICS}
+        return out
+    r = results["R_mult"].to_numpy(dtype=float)
+    wins = (results["exit_reason"] == "TP").to_numpy() if "exit_reason" in results else None
+    stats = metrics_batch(
+        r,
+        wins=wins,
+        timestamps=_timestamps_ns(results),
+        mae_r=results["mae_r"].to_numpy(dtype=float) if "mae_r" in results else None,
+        mfe_r=results["mfe_r"].to_numpy(dtype=float) if "mfe_r" in results else None,
+    )
+    out = _row(stats)
+    # calc_metrics counted every row (including trades with undefined R)
+    out["trades"] = int(len(results))
+    out["win_rate"] = round(float(wins.mean() * 100) if wins is not None else out["win_rate"], 2)
+    if "pnl_money" in results:
+        money = metrics_batch(results["pnl_money"].to_numpy(dtype=float))
+        out["net_money"] = round(float(money["total_r"][0]), 2)
+        out["max_dd_money"] = round(float(money["max_dd"][0]), 2)
+    return out
+
+def yearly_metrics(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-calendar-year breakdown: one batched evaluation over a (years x trades) matrix.
+    """
+    if results is None or len(results) == 0 or "timestamp" not in results:
+        return pd.DataFrame(columns=CORE_METRICS + EXTENDED_METRICS)
+    ts = pd.to_datetime(results["timestamp"], utc=True, errors="coerce")
+    order = np.argsort(ts.to_numpy(), kind="stable")
+    ts = ts.iloc[order]
+    years = ts.dt.year.to_numpy()
+    uniq, start, counts = np.unique(years, return_index=True, return_counts=True)
+    width = counts.max()
+    col = np.arange(len(years)) - np.repeat(start, counts)
+    row = np.repeat(np.arange(len(uniq)), counts)
+
+    def _pad(values, fill, dtype=float):
+        a = np.full((len(uniq), width), fill, dtype=dtype)
+        a[row, col] = values
+        return a
+
+    r = _pad(results["R_mult"].to_numpy(dtype=float)[order], np.nan)
+    wins = None
+    if "exit_reason" in results:
+        wins = _pad((results["exit_reason"] == "TP").to_numpy()[order], False, bool)
+    ts_ns = ts.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    stats = metrics_batch(
+        r,
+        wins=wins,
+        timestamps=_pad(ts_ns, 0, np.int64) if not ts.isna().any() else None,
+        mae_r=_pad(results["mae_r"].to_numpy(dtype=float)[order], np.nan) if "mae_r" in results else None,
+        mfe_r=_pad(results["mfe_r"].to_numpy(dtype=float)[order], np.nan) if "mfe_r" in results else None,
+    )
+    rows = [_row(stats, i) for i in range(len(uniq))]
+    for i, rw in enumerate(rows):
+        rw["trades"] = int(counts[i])
+        if wins is not None:
+            rw["win_rate"] = round(float(wins[i, :counts[i]].mean() * 100), 2)
+    return pd.DataFrame(rows, index=pd.Index(uniq, name="year"))
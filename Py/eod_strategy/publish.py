@@ -0,0 +1,429 @@
+"""
+publish.py - Nightly alert publishing for a whole universe.
+
+Evaluates each dataset's newest closed bar, formats its setups in the
+platform alert format (symbol, side, price, SL, TP, R:R, nearest S/R) and
+fans them out concurrently to pluggable sinks:
+
+  stdout            print each message
+  file:PATH         append messages to a file
+  tcp://HOST:PORT   newline-delimited messages over a socket (local stand-in)
+  http(s)://URL     POST one batch per request (text/plain, one message per line)
+
+Every sink has its own bounded queue (back-pressure: producers wait when a
+sink falls behind) and worker task that sends batches, retrying failed
+batches with exponential backoff. Signal computation runs in a process pool
+and alerts are queued as each dataset finishes, so hundreds of alerts go
+out within seconds of the cutoff.
+
+Usage:
+    python -m eod_strategy.publish --config batch.yaml --sink stdout --sink file:alerts.csv
+    python -m eod_strategy.publish data/XAUUSD.csv --format csv --sink http://127.0.0.1:8080/alerts
+"""
+import argparse
+import asyncio
+import os
+import sys
+import urllib.request
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .backtest_all import load_prices, _sr_kwargs
+from .eod_continuation import StrategyConfig, past_cutoff_now
+from .sr_strategy import SRStrategyConfig, nearest_sr, sr_level_matrix
+from .strategies import REGISTRY, run_strategies
+
+CSV_HEADER = "timestamp,symbol,strategy,side,price,sl,tp,rr,nearest_sr"
+
+
+# ---------------------- Alerts ----------------------
+
+@dataclass(frozen=True)
+class Alert:
+    timestamp: pd.Timestamp
+    symbol: str
+    strategy: str
+    side: str
+    price: float
+    sl: float
+    tp: float
+    rr: float
+    nearest_sr: float
+
+
+def format_alert(alert: Alert, style: str = "text", digits: int = 5) -> str:
+    """
+    text: the EA message extended with TP, R:R and S/R
+          'BUY Signal XAUUSD price=1950.12000 SL=1930.00000 TP=1990.24000 R:R=2.00 SR=1930.00000 [EOD]'
+    csv : one CSV_HEADER row (the Pine alert's CSV-style message)
+    """
+    def num(v, d=digits):
+        return "" if v is None or np.isnan(v) else f"{v:.{d}f}"
+    if style == "csv":
+        return ",".join([alert.timestamp.strftime("%Y-%m-%d"), alert.symbol, alert.strategy, alert.side,
+                         num(alert.price), num(alert.sl), num(alert.tp), num(alert.rr, 2), num(alert.nearest_sr)])
+    if style != "text":
+        raise ValueError(f"Unknown alert format: '{style}'")
+    sr = f" SR={num(alert.nearest_sr)}" if not np.isnan(alert.nearest_sr) else ""
+    rr = num(alert.rr, 2) or "n/a"
+    return (f"{alert.side} Signal {alert.symbol} price={num(alert.price)} SL={num(alert.sl)} "
+            f"TP={num(alert.tp) or 'n/a'} R:R={rr}{sr} [{alert.strategy}]")
+
+
+def _with_next_bar(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    prices plus a flat placeholder bar after the newest one, so strategies
+    that stamp signals on the bar after the evaluated one (signal_lag=1)
+    evaluate the newest closed bar. Nothing of the placeholder feeds the
+    entry, stop or TP of those rows.
+    """
+    last = prices.iloc[-1]
+    nxt = pd.DataFrame({c: [last["close"]] if c in ("open", "high", "low", "close") else [last[c]]
+                        for c in prices.columns},
+                       index=[prices.index[-1] + pd.Timedelta(days=1)])
+    nxt.index.name = prices.index.name
+    return pd.concat([prices, nxt])
+
+def nightly_alerts(
+    prices: pd.DataFrame,
+    symbol: str,
+    configs: Optional[dict] = None,
+    strategies: Optional[Iterable[str]] = None,
+    bar: Optional[pd.Timestamp] = None,
+) -> List[Alert]:
+    """
+    Alerts for the setups evaluated on the closed bar `bar` (default: the
+    newest bar), labelled with that bar - what the platform EA reports at
+    that bar's close. Nearest S/R is the protective-side level (GetNearestSR)
+    known at the evaluated bar, from the SR strategy's manual + pivot levels.
+    """
+    prices = prices.rename(columns=str.lower)
+    if bar is not None:
+        prices = prices.loc[:pd.Timestamp(bar)]
+    if len(prices) < 2:
+        return []
+    bar = prices.index[-1]
+    names = list(strategies) if strategies is not None else list(REGISTRY)
+    extended = _with_next_bar(prices)
+    signals, _ = run_strategies(extended, configs, names=names, symbol=symbol)
+
+    sr_cfg = (configs or {}).get("SR") or SRStrategyConfig(symbol=symbol)
+    levels = sr_level_matrix(prices["high"].to_numpy(dtype=float), prices["low"].to_numpy(dtype=float),
+                             sr_cfg)[-1:]
+
+    alerts = []
+    for name in names:
+        sig = signals[name]
+        if len(sig) == 0:
+            continue
+        stamp = extended.index[len(prices) - 1 + REGISTRY[name].signal_lag]
+        tonight = sig[pd.to_datetime(sig["timestamp"], utc=True) == stamp]
+        for row in tonight.itertuples(index=False):
+            entry, stop, tp = float(row.entry), float(row.stop), float(row.tp)
+            risk = abs(entry - stop)
+            rr = abs(tp - entry) / risk if risk > 0 and not np.isnan(tp) else np.nan
+            is_buy = str(row.side).upper() == "BUY"
+            sr = float(nearest_sr(np.array([entry]), levels, is_buy)[0]) if levels.shape[1] else np.nan
+            alerts.append(Alert(bar, symbol, name, str(row.side).upper(), entry, stop, tp, rr, sr))
+    return alerts
+
+
+# ---------------------- Sinks ----------------------
+
+class Sink(ABC):
+    """A destination for batches of formatted messages; send() raises to trigger a retry."""
+    name = "sink"
+
+    @abstractmethod
+    async def send(self, batch: List[str]):
+        ...
+
+    async def close(self):
+        pass
+
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    async def send(self, batch: List[str]):
+        sys.stdout.write("\n".join(batch) + "\n")
+        sys.stdout.flush()
+
+
+class FileSink(Sink):
+    def __init__(self, path: str, header: Optional[str] = None):
+        self.name = f"file:{path}"
+        self.path = path
+        self.header = header
+
+    def _write(self, batch: List[str]):
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", encoding="utf-8") as f:
+            if new and self.header:
+                f.write(self.header + "\n")
+            f.write("\n".join(batch) + "\n")
+
+    async def send(self, batch: List[str]):
+        await asyncio.to_thread(self._write, batch)
+
+
+class SocketSink(Sink):
+    """Newline-delimited messages over one TCP connection (reconnects after errors)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self.name = f"tcp://{host}:{port}"
+        self.host, self.port, self.timeout = host, port, timeout
+        self._writer = None
+
+    async def send(self, batch: List[str]):
+        try:
+            if self._writer is None:
+                _, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout)
+            self._writer.write(("\n".join(batch) + "\n").encode())
+            await asyncio.wait_for(self._writer.drain(), self.timeout)
+        except Exception:
+            await self.close()
+            raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+
+
+class HttpSink(Sink):
+    """POSTs each batch as text/plain (one message per line)."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.name = url
+        self.url, self.timeout = url, timeout
+
+    def _post(self, batch: List[str]):
+        req = urllib.request.Request(self.url, data=("\n".join(batch) + "\n").encode(), method="POST",
+                                     headers={"Content-Type": "text/plain; charset=utf-8"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            if resp.status >= 300:
+                raise OSError(f"HTTP {resp.status} from {self.url}")
+
+    async def send(self, batch: List[str]):
+        await asyncio.to_thread(self._post, batch)
+
+
+def make_sink(spec: str, header: Optional[str] = None) -> Sink:
+    """Build a sink from 'stdout', 'file:PATH', 'tcp://HOST:PORT' or an http(s) URL."""
+    if spec == "stdout":
+        return StdoutSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):], header=header)
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return SocketSink(host or "127.0.0.1", int(port))
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    raise ValueError(f"Unknown sink: '{spec}'")
+
+
+# ---------------------- Publisher ----------------------
+
+@dataclass
+class SinkStats:
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    retries: int = 0
+
+
+class AlertPublisher:
+    """
+    Fan messages out to every sink concurrently.
+
+        async with AlertPublisher([StdoutSink(), FileSink("alerts.txt")]) as pub:
+            await pub.publish("BUY Signal ...")
+
+    Each sink gets a bounded queue (max_queue) and one worker that sends up to
+    batch_size messages at a time, waiting at most linger seconds to fill a
+    batch. A failed batch is retried `retries` times with exponential backoff
+    (backoff, 2*backoff, ...) before its messages are counted as failed.
+    """
+
+    def __init__(self, sinks: List[Sink], batch_size: int = 100, max_queue: int = 1000,
+                 linger: float = 0.05, retries: int = 3, backoff: float = 0.5):
+        if not sinks:
+            raise ValueError("At least one sink is required")
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.linger = linger
+        self.retries = retries
+        self.backoff = backoff
+        self.stats: Dict[str, SinkStats] = {s.name: SinkStats() for s in sinks}
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        self._queues = [asyncio.Queue(maxsize=self.max_queue) for _ in self.sinks]
+        self._workers = [asyncio.create_task(self._run(s, q)) for s, q in zip(self.sinks, self._queues)]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def publish(self, message: str):
+        """Queue one message for every sink (waits while a sink's queue is full)."""
+        for q in self._queues:
+            await q.put(message)
+
+    async def publish_many(self, messages: Iterable[str]):
+        for m in messages:
+            await self.publish(m)
+
+    async def close(self):
+        """Flush every queue, stop the workers and close the sinks."""
+        for q in self._queues:
+            await q.put(None)
+        await asyncio.gather(*self._workers)
+        for s in self.sinks:
+            await s.close()
+
+    async def _next_batch(self, q: asyncio.Queue) -> Tuple[List[str], bool]:
+        first = await q.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                item = q.get_nowait() if q.qsize() else await asyncio.wait_for(
+                    q.get(), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self, sink: Sink, q: asyncio.Queue):
+        stats = self.stats[sink.name]
+        done = False
+        while not done:
+            batch, done = await self._next_batch(q)
+            if not batch:
+                continue
+            for attempt in range(self.retries + 1):
+                try:
+                    await sink.send(batch)
+                    stats.sent += len(batch)
+                    stats.batches += 1
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        stats.failed += len(batch)
+                        print(f"[publish] {sink.name}: dropped {len(batch)} alert(s) after "
+                              f"{self.retries + 1} attempts: {e}", file=sys.stderr)
+                    else:
+                        stats.retries += 1
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+
+
+# ---------------------- Universe run ----------------------
+
+def _dataset_alerts(job: dict) -> List[Alert]:
+    prices = load_prices(job["file"])
+    configs = {"SR": SRStrategyConfig(symbol=job["symbol"], **_sr_kwargs(job.get("sr", {})))}
+    return nightly_alerts(prices, job["symbol"], configs, job.get("strategies"), job.get("bar"))
+
+async def publish_universe(jobs: List[dict], publisher: AlertPublisher, style: str = "text",
+                           workers: Optional[int] = None) -> int:
+    """
+    Compute every dataset's nightly alerts in a process pool (workers=0: inline)
+    and queue them as each dataset completes. Returns the number of alerts.
+    """
+    count = 0
+    if workers == 0:
+        for job in jobs:
+            alerts = _dataset_alerts(job)
+            await publisher.publish_many(format_alert(a, style) for a in alerts)
+            count += len(alerts)
+        return count
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = [loop.run_in_executor(pool, _dataset_alerts, job) for job in jobs]
+        for fut in asyncio.as_completed(pending):
+            alerts = await fut
+            await publisher.publish_many(format_alert(a, style) for a in alerts)
+            count += len(alerts)
+    return count
+
+
+# ---------------------------- CLI ----------------------------
+
+def _jobs(args) -> List[dict]:
+    jobs = []
+    if args.config:
+        with open(args.config, "r") as f:
+            cfg = yaml.safe_load(f) or {}
+        for item in cfg.get("datasets", []):
+            jobs.append({"file": item["file"], "symbol": item.get("symbol", "XAUUSD"), "sr": item.get("sr", {}),
+                         "strategies": args.strategies or item.get("strategies", cfg.get("strategies"))})
+    for path in args.csv:
+        jobs.append({"file": path, "symbol": os.path.splitext(os.path.basename(path))[0].upper(),
+                     "strategies": args.strategies})
+    if args.date:
+        for job in jobs:
+            job["bar"] = pd.Timestamp(args.date, tz="UTC")
+    return jobs
+
+def _parse_args():
+    p = argparse.ArgumentParser(description="Publish the nightly signals of a universe as platform alerts.")
+    p.add_argument("csv", nargs="*", help="Input OHLC CSVs (symbol taken from the file name)")
+    p.add_argument("--config", help="Batch YAML (datasets: [{file, symbol, sr, strategies}, ...])")
+    p.add_argument("--strategies", nargs="+", help="Registered strategies to alert on (default: all)")
+    p.add_argument("--sink", action="append", default=[],
+                   help="stdout | file:PATH | tcp://HOST:PORT | http(s)://URL (repeatable; default stdout)")
+    p.add_argument("--format", dest="style", choices=["text", "csv"], default="text")
+    p.add_argument("--date", help="Publish the setups of this closed bar (YYYY-MM-DD) instead of the newest")
+    p.add_argument("--batch-size", type=int, default=100)
+    p.add_argument("--max-queue", type=int, default=1000, help="Per-sink queue bound (back-pressure)")
+    p.add_argument("--retries", type=int, default=3)
+    p.add_argument("--backoff", type=float, default=0.5, help="Initial retry delay in seconds")
+    p.add_argument("--workers", type=int, default=None, help="Signal processes (0 = inline; default: CPU count)")
+    p.add_argument("--no-cutoff-gate", action="store_true", help="Publish even before the London cutoff")
+    return p.parse_args()
+
+async def _amain(args) -> int:
+    header = CSV_HEADER if args.style == "csv" else None
+    sinks = [make_sink(s, header) for s in (args.sink or ["stdout"])]
+    async with AlertPublisher(sinks, batch_size=args.batch_size, max_queue=args.max_queue,
+                              retries=args.retries, backoff=args.backoff) as pub:
+        count = await publish_universe(_jobs(args), pub, style=args.style, workers=args.workers)
+    failed = sum(s.failed for s in pub.stats.values())
+    summary = ", ".join(f"{name}: {s.sent} sent/{s.failed} failed" for name, s in pub.stats.items())
+    print(f"[publish] {count} alert(s) -> {summary}", file=sys.stderr)
+    return 1 if failed else 0
+
+def main():
+    args = _parse_args()
+    if not args.csv and not args.config:
+        raise ValueError("Give CSV files and/or --config.")
+    cfg = StrategyConfig()
+    if not args.no_cutoff_gate and not args.date and not past_cutoff_now(cfg.london_cutoff_hhmm, cfg.london_tz):
+        print(f"[publish] before the {cfg.london_cutoff_hhmm[0]:02d}:{cfg.london_cutoff_hhmm[1]:02d} "
+              f"{cfg.london_tz} cutoff; nothing published (use --no-cutoff-gate to override)", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(asyncio.run(_amain(args)))
+
+if __name__ == "__main__":
+    main()
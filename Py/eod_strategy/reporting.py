@@ -0,0 +1,244 @@
+"""
+reporting.py - Chart and HTML report rendering for backtest runs.
+
+Charts are drawn on standalone Agg figures (no pyplot state), so they can be
+rendered inline or in a process pool. Every artifact is fingerprinted from its
+inputs and only regenerated when those inputs change.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from .metrics import CORE_METRICS
+
+FINGERPRINT_FILE = ".report_fingerprints.json"
+# Bump when the rendering code changes so stale artifacts are redrawn.
+RENDER_VERSION = "3"
+
+
+# ---------------------- Fingerprints ----------------------
+
+def fingerprint(*parts) -> str:
+    """
+    Stable hash of DataFrames / Series / plain values.
+    DataFrames are hashed row-wise with pandas' hash_pandas_object (no CSV round-trip).
+    """
+    h = hashlib.sha256(RENDER_VERSION.encode())
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            h.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+            h.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+        else:
+            h.update(repr(part).encode())
+    return h.hexdigest()
+
+def _load_fingerprints(outdir: str) -> dict:
+    path = os.path.join(outdir, FINGERPRINT_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_fingerprints(outdir: str, fps: dict):
+    with open(os.path.join(outdir, FINGERPRINT_FILE), "w", encoding="utf-8") as f:
+        json.dump(fps, f, indent=1, sort_keys=True)
+
+def _up_to_date(fps: dict, path: str, fp: str) -> bool:
+    return fps.get(os.path.basename(path)) == fp and os.path.exists(path)
+
+
+# ---------------------- Charts ----------------------
+
+def plot_equity_curve(curves: pd.DataFrame, symbol: str, path: str):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    for col, label in (("core_cumR", "Core"), ("eod_cumR", "EOD"), ("sr_cumR", "SR")):
+        if col in curves:
+            ax.plot(curves["timestamp"], curves[col], label=label)
+    ax.set_title(f"Cumulative R - {symbol}")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Cumulative R")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+def plot_metrics(metrics_df: pd.DataFrame, symbol: str, path: str):
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    cols = [c for c in CORE_METRICS if c in metrics_df.columns]
+    metrics_df[cols].T.plot(kind="bar", ax=ax, title=f"Metrics - {symbol}")
+    fig.tight_layout()
+    fig.savefig(path)
+
+def plot_aggregate_curves(agg_df: pd.DataFrame, path: str):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    for col in agg_df.columns:
+        if col.endswith("cumR"):
+            ax.plot(agg_df.index, agg_df[col], label=col)
+    ax.set_title("Aggregate Equity Curves Across Symbols")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Cumulative R")
+    ax.legend()
+    fig.savefig(path)
+
+
+# ---------------------- HTML ----------------------
+
+def _img_tag(path, max_width=800):
+    if path is None or not os.path.exists(path):
+        return "<p>No image available</p>"
+    return f'<img src="{os.path.basename(path)}" style="max-width:{max_width}px;">'
+
+def write_html_report(symbol, outdir, metrics_df, plots: bool = True, strategies=None):
+    """
+    strategies: names whose {name}_results.csv / _signals.csv run_all wrote
+                (default: the rows of metrics_df).
+    """
+    names = list(metrics_df.index) if strategies is None else list(strategies)
+    downloads = ["metrics_summary.csv", "metrics_by_year.csv", "equity_curves.csv"]
+    downloads += [f"{name.lower()}_{kind}.csv" for name in names for kind in ("results", "signals")]
+    links = "\n".join(f'        <li><a href="{f}">{f}</a></li>' for f in downloads)
+    html_path = os.path.join(outdir, f"{symbol}_report.html")
+    equity_img = os.path.join(outdir, f"{symbol}_equity_curve.png") if plots else None
+    metrics_img = os.path.join(outdir, f"{symbol}_metrics.png") if plots else None
+
+    html = f"""
+    <html>
+    <head><title>{symbol} Strategy Report</title></head>
+    <body>
+    <h1>{symbol} Strategy Report</h1>
+    <h2>Metrics</h2>
+    {metrics_df.to_html()}
+    <h2>Equity Curve</h2>
+    {_img_tag(equity_img)}
+    <h2>Metrics Chart</h2>
+    {_img_tag(metrics_img)}
+    <h2>Downloads</h2>
+    <ul>
+{links}
+    </ul>
+    </body>
+    </html>
+    """
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return html_path
+
+
+# ---------------------- Symbol report ----------------------
+
+def render_symbol_report(symbol: str, outdir: str, metrics_df: pd.DataFrame,
+                         curves: Optional[pd.DataFrame], plots: bool = True,
+                         strategies: Optional[List[str]] = None) -> dict:
+    """
+    Render the equity/metrics charts and the HTML report for one symbol,
+    skipping any artifact whose input fingerprint is unchanged.
+    strategies: names with per-strategy CSVs to link (see write_html_report).
+    Returns {artifact_name: "written" | "skipped"}.
+    """
+    fps = _load_fingerprints(outdir)
+    status = {}
+    have_curves = curves is not None and not curves.empty
+
+    if plots and have_curves:
+        equity_path = os.path.join(outdir, f"{symbol}_equity_curve.png")
+        fp = fingerprint(symbol, curves)
+        if _up_to_date(fps, equity_path, fp):
+            status[os.path.basename(equity_path)] = "skipped"
+        else:
+            plot_equity_curve(curves, symbol, equity_path)
+            fps[os.path.basename(equity_path)] = fp
+            status[os.path.basename(equity_path)] = "written"
+
+        metrics_path = os.path.join(outdir, f"{symbol}_metrics.png")
+        fp = fingerprint(symbol, metrics_df)
+        if _up_to_date(fps, metrics_path, fp):
+            status[os.path.basename(metrics_path)] = "skipped"
+        else:
+            plot_metrics(metrics_df, symbol, metrics_path)
+            fps[os.path.basename(metrics_path)] = fp
+            status[os.path.basename(metrics_path)] = "written"
+
+    html_path = os.path.join(outdir, f"{symbol}_report.html")
+    fp = fingerprint(symbol, metrics_df, plots and have_curves, strategies)
+    if _up_to_date(fps, html_path, fp):
+        status[os.path.basename(html_path)] = "skipped"
+    else:
+        write_html_report(symbol, outdir, metrics_df, plots=plots and have_curves, strategies=strategies)
+        fps[os.path.basename(html_path)] = fp
+        status[os.path.basename(html_path)] = "written"
+
+    _save_fingerprints(outdir, fps)
+    return status
+
+def render_aggregate(agg_df: pd.DataFrame, outdir: str) -> str:
+    path = os.path.join(outdir, "all_equity_curves.png")
+    fps = _load_fingerprints(outdir)
+    fp = fingerprint(agg_df)
+    if not _up_to_date(fps, path, fp):
+        plot_aggregate_curves(agg_df, path)
+        fps[os.path.basename(path)] = fp
+        _save_fingerprints(outdir, fps)
+    return path
+
+
+# ---------------------- Worker pool ----------------------
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+class ReportPool:
+    """
+    Renders symbol reports in a process pool (Agg backend).
+    workers=0 renders inline in the calling process.
+
+        with ReportPool(workers=4) as pool:
+            pool.submit("XAUUSD", outdir, metrics_df, curves)
+    """
+
+    def __init__(self, workers: Optional[int] = None, plots: bool = True):
+        self.plots = plots
+        self.workers = os.cpu_count() if workers is None else workers
+        self._executor = None
+        self._futures = []
+
+    def __enter__(self):
+        if self.workers and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def submit(self, symbol, outdir, metrics_df, curves, strategies=None):
+        if self._executor is None:
+            return render_symbol_report(symbol, outdir, metrics_df, curves, plots=self.plots,
+                                        strategies=strategies)
+        fut = self._executor.submit(render_symbol_report, symbol, outdir, metrics_df, curves, self.plots,
+                                    strategies)
+        self._futures.append(fut)
+        return fut
+
+    def wait(self):
+        """Block until all submitted reports are written; re-raises worker errors."""
+        futures, self._futures = self._futures, []
+        return [f.result() for f in futures]
+
+    def close(self):
+        if self._executor is not None:
+            try:
+                self.wait()
+            finally:
+                self._executor.shutdown()
+                self._executor = None
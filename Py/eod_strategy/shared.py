@@ -0,0 +1,200 @@
+"""
+shared.py - Shared-memory datasets for multi-process sweeps and batches.
+
+The parent process loads each dataset once and publishes its timestamps,
+OHLC columns and any precomputed indicator arrays into one
+multiprocessing.shared_memory block. Workers receive a small picklable
+SharedDataset descriptor, attach by block name and get read-only NumPy
+views over the same pages: no CSV re-reads, no pickled DataFrames, and
+memory stays at one copy per dataset however many workers run. The
+publishing SharedDatasetStore unlinks every block when it is closed.
+
+Usage:
+    with SharedDatasetStore() as store:
+        graph = IndicatorGraph(prices).require(EMA(5), EMA(10), STOCH()).compute()
+        desc = store.publish(prices, symbol="XAUUSD", indicators=graph)
+        with ProcessPoolExecutor() as pool:
+            pool.map(work, [desc, ...])
+
+    def work(desc):
+        with attach(desc) as ds:
+            signals, _ = run_strategies(ds.prices(), graph=ds.graph(), symbol=ds.symbol)
+"""
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorGraph, IndicatorSpec
+
+_INDEX = "__index__"
+_ALIGN = 64
+
+# Serializes the resource_tracker.register patch in _open_block with every
+# other block open/create in this process (Python < 3.13)
+_TRACKER_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SharedColumn:
+    key: Union[str, IndicatorSpec]  # price column name, the index, or an indicator spec
+    offset: int
+    dtype: str
+    length: int
+
+
+@dataclass(frozen=True)
+class SharedDataset:
+    """Picklable handle to one published dataset."""
+    block: str
+    symbol: str
+    rows: int
+    columns: Tuple[SharedColumn, ...]
+    tz: Optional[str] = "UTC"
+
+
+def _open_block(name: str) -> shared_memory.SharedMemory:
+    """Attach without registering the block with this process' resource tracker."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the block, so a tracker that is not the
+    # publisher's would unlink it when this process exits (bpo-39959).
+    # Unregistering after the fact is not an option: fork-started workers
+    # share the publisher's tracker and would drop its registration instead.
+    # The patch is process-wide, so it is held under _TRACKER_LOCK.
+    from multiprocessing import resource_tracker
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedDatasetStore:
+    """Owner of published blocks; close() (or leaving the with-block) unlinks them."""
+
+    def __init__(self):
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def publish(
+        self,
+        prices: pd.DataFrame,
+        symbol: str = "XAUUSD",
+        indicators: Union[IndicatorGraph, Dict[IndicatorSpec, np.ndarray], None] = None,
+        columns=("open", "high", "low", "close"),
+    ) -> SharedDataset:
+        """
+        Copy the index, price columns and indicator arrays of one dataset into
+        a new shared block (the only copy made) and return its descriptor.
+        indicators: an IndicatorGraph (every computed node) or {spec: array}.
+        """
+        prices = prices.rename(columns=str.lower)
+        missing = [c for c in columns if c not in prices.columns]
+        if missing:
+            raise ValueError(f"Input DataFrame missing required column(s): {missing}")
+        if isinstance(indicators, IndicatorGraph):
+            indicators = {spec: indicators[spec] for spec in indicators.nodes
+                          if spec in indicators and spec.kind != "col"}
+        n = len(prices)
+
+        arrays = {}
+        tz = None
+        if isinstance(prices.index, pd.DatetimeIndex):
+            tz = str(prices.index.tz) if prices.index.tz is not None else None
+            arrays[_INDEX] = prices.index.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        for col in columns:
+            arrays[col] = prices[col].to_numpy(dtype=float)
+        for spec, arr in (indicators or {}).items():
+            arr = np.asarray(arr)
+            if arr.shape != (n,):
+                raise ValueError(f"Indicator {spec!r} has shape {arr.shape}, expected ({n},)")
+            arrays[spec] = arr
+
+        layout, offset = [], 0
+        for key, arr in arrays.items():
+            layout.append(SharedColumn(key, offset, arr.dtype.str, n))
+            offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+        with _TRACKER_LOCK:
+            shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self._blocks[shm.name] = shm
+        for col, arr in zip(layout, arrays.values()):
+            np.ndarray(n, dtype=col.dtype, buffer=shm.buf, offset=col.offset)[:] = arr
+        return SharedDataset(shm.name, symbol, n, tuple(layout), tz)
+
+    def close(self):
+        for shm in self._blocks.values():
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+
+class AttachedDataset:
+    """Read-only, zero-copy views over a published dataset (see attach())."""
+
+    def __init__(self, desc: SharedDataset):
+        self.desc = desc
+        self.symbol = desc.symbol
+        self._shm = _open_block(desc.block)
+        self.arrays: Dict[Union[str, IndicatorSpec], np.ndarray] = {}
+        for col in desc.columns:
+            view = np.ndarray(col.length, dtype=col.dtype, buffer=self._shm.buf, offset=col.offset)
+            view.setflags(write=False)
+            self.arrays[col.key] = view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def index(self) -> pd.Index:
+        if _INDEX not in self.arrays:
+            return pd.RangeIndex(self.desc.rows)
+        index = pd.DatetimeIndex(self.arrays[_INDEX].view("datetime64[ns]"), name="timestamp")
+        return index.tz_localize(self.desc.tz) if self.desc.tz else index
+
+    def prices(self) -> pd.DataFrame:
+        """OHLC frame backed by the shared block (no copy)."""
+        cols = {k: v for k, v in self.arrays.items() if isinstance(k, str) and k != _INDEX}
+        return pd.DataFrame(cols, index=self.index, copy=False)
+
+    def indicators(self) -> Dict[IndicatorSpec, np.ndarray]:
+        return {k: v for k, v in self.arrays.items() if isinstance(k, IndicatorSpec)}
+
+    def graph(self) -> IndicatorGraph:
+        """IndicatorGraph pre-filled with the shared indicator arrays."""
+        return IndicatorGraph.from_arrays(self.prices(), self.indicators())
+
+    def close(self):
+        """
+        Drop the views and detach; the publisher owns (and unlinks) the block.
+        Frames/graphs built from this dataset must be released first, otherwise
+        the mapping stays open until they are garbage collected.
+        """
+        self.arrays = {}
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+
+
+def attach(desc: SharedDataset) -> AttachedDataset:
+    return AttachedDataset(desc)
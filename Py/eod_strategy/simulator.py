@@ -1,20 +1,26 @@
 """
 simulator.py - Trade simulator for multiple strategies (EOD, Core, etc.)
+
+Exits are resolved without walking bars: sparse tables over lows/highs
+answer "first bar at/after entry that touches the stop/target" by binary
+lifting, and the same tables give each trade's max adverse/favourable
+excursion (MAE/MFE) in O(1). The tables are kept on a TradePathIndex so
+alternative TP/SL multiples can be re-evaluated without another scan.
+
+With exit_on_cross=True a trade also closes at the first opposite %K/%D
+crossover after entry, looked up with searchsorted on precomputed
+crossover indices (see stoch_cross_indices).
 """
+from typing import Optional, Sequence, Tuple, Union
+
 import pandas as pd
 import numpy as np
 
-def simulate_positions(signals: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
-    """
-    Simulate trades given signals + OHLCV price data.
-
-    signals: DataFrame with at least ['timestamp','side','entry','stop','tp']
-    prices : OHLCV DataFrame (DatetimeIndex, cols: open, high, low, close)
+from .sparse_table import SparseTable
+from .costs import CostModel, apply_costs, average_true_range
 
-    Returns: signals with outcome columns:
-      ['exit_price','exit_reason','PnL','R_mult']
-    """
 
+def _normalize_prices(prices: pd.DataFrame) -> pd.DataFrame:
     if not isinstance(prices.index, pd.DatetimeIndex):
         if "timestamp" in prices.columns:
             prices = prices.copy()
@@ -22,44 +28,229 @@ def simulate_positions(signals: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFr
             prices = prices.set_index("timestamp").sort_index()
         else:
             raise ValueError("prices must have a DatetimeIndex or a 'timestamp' column")
+    if prices.index.tz is None:
+        prices = prices.tz_localize("UTC")
+    prices = prices.rename(columns=str.lower)
+    return prices
+
+
+class TradePathIndex:
+    """
+    Range min/max index over one price series (lows/highs + bar times).
+    Build once per dataset and reuse across simulations / re-evaluations.
+    """
+
+    def __init__(self, prices: pd.DataFrame):
+        prices = _normalize_prices(prices)
+        self.times = prices.index.to_numpy(dtype="datetime64[ns]")
+        self.close = prices["close"].to_numpy(dtype=float)
+        self.low_min = SparseTable(prices["low"].to_numpy(dtype=float), "min")
+        self.high_max = SparseTable(prices["high"].to_numpy(dtype=float), "max")
+        self.n = len(self.close)
+
+    def locate(self, timestamps) -> np.ndarray:
+        """Index of the first bar at/after each timestamp (n if past the data)."""
+        ts = pd.to_datetime(pd.Series(timestamps), utc=True).to_numpy(dtype="datetime64[ns]")
+        return np.searchsorted(self.times, ts, side="left")
+
+    def resolve_exits(self, start, is_buy, stop, tp):
+        """
+        First SL / TP touch per trade. The stop is checked first on a bar that
+        touches both (same rule as the original bar-by-bar loop).
+        Returns (exit_idx, reason_code) with codes 0=SL, 1=TP, 2=Open.
+        """
+        n = self.n
+        is_sell = ~is_buy
+        sl_idx = np.full(len(start), n, dtype=np.int64)
+        tp_idx = np.full(len(start), n, dtype=np.int64)
+        if is_buy.any():
+            sl_idx[is_buy] = self.low_min.first_cross(start[is_buy], stop[is_buy])
+            tp_idx[is_buy] = self.high_max.first_cross(start[is_buy], tp[is_buy])
+        if is_sell.any():
+            sl_idx[is_sell] = self.high_max.first_cross(start[is_sell], stop[is_sell])
+            tp_idx[is_sell] = self.low_min.first_cross(start[is_sell], tp[is_sell])
+        reason = np.where(sl_idx <= tp_idx, 0, 1)
+        exit_idx = np.minimum(sl_idx, tp_idx)
+        open_ = exit_idx >= n
+        reason[open_] = 2
+        exit_idx[open_] = n - 1
+        return exit_idx, reason
+
+    def excursions(self, start, exit_idx, is_buy, entry):
+        """(MAE, MFE) in price units over bars [start, exit_idx], both >= 0."""
+        valid = start <= exit_idx
+        lo = np.where(valid, start, 0)
+        hi = np.where(valid, exit_idx, 0)
+        low = self.low_min.query(lo, hi)
+        high = self.high_max.query(lo, hi)
+        mae = np.where(is_buy, entry - low, high - entry)
+        mfe = np.where(is_buy, high - entry, entry - low)
+        mae = np.where(valid, np.maximum(mae, 0.0), np.nan)
+        mfe = np.where(valid, np.maximum(mfe, 0.0), np.nan)
+        return mae, mfe
+
+
+_REASONS = np.array(["SL", "TP", "Open", "Cross"], dtype=object)
+
+
+def stoch_cross_indices(k, d) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bar indices of %K/%D crossovers, same rule as eod_continuation.stoch_cross.
+    Returns (cross_up_idx, cross_down_idx), both sorted.
+    """
+    k = np.asarray(k, dtype=float)
+    d = np.asarray(d, dtype=float)
+    kp, dp, kn, dn = k[:-1], d[:-1], k[1:], d[1:]
+    with np.errstate(invalid="ignore"):
+        up = (kp < dp) & (kn > dn)
+        down = (kp > dp) & (kn < dn)
+    return np.flatnonzero(up) + 1, np.flatnonzero(down) + 1
+
+
+def _apply_cross_exits(start, exit_idx, reason, is_buy, is_sell, cross_idx, n):
+    """
+    Move exits earlier to the first opposite crossover at/after entry.
+    SL/TP on the crossover bar itself take precedence (intrabar before close).
+    """
+    up, down = cross_idx
+    nxt = np.full(len(start), n, dtype=np.int64)
+    for mask, idx in ((is_buy, down), (is_sell, up)):
+        if mask.any() and len(idx):
+            pos = np.searchsorted(idx, start[mask], side="left")
+            nxt[mask] = np.where(pos < len(idx), idx[np.minimum(pos, len(idx) - 1)], n)
+    take = (nxt < n) & ((nxt < exit_idx) | (reason == 2))
+    exit_idx = np.where(take, nxt, exit_idx)
+    reason = np.where(take, 3, reason)
+    return exit_idx, reason
+
+
+def _risk(signals: pd.DataFrame, entry, stop) -> np.ndarray:
+    # Strategies without an explicit 'R' column (e.g. Core) risk the entry-stop distance
+    if "R" in signals.columns:
+        R = signals["R"].to_numpy(dtype=float)
+    else:
+        R = np.abs(entry - stop)
+    return np.where(R == 0, np.nan, R)
+
+
+def simulate_positions(signals: pd.DataFrame, prices: pd.DataFrame,
+                       path_index: TradePathIndex = None,
+                       exit_on_cross: bool = False,
+                       cross_idx: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                       costs: Optional[CostModel] = None,
+                       contract=None) -> pd.DataFrame:
+    """
+    Simulate trades given signals + OHLCV price data.
+
+    signals: DataFrame with at least ['timestamp','side','entry','stop','tp']
+    prices : OHLCV DataFrame (DatetimeIndex, cols: open, high, low, close)
+    path_index: optional prebuilt TradePathIndex for `prices`
+    exit_on_cross: also exit at the close of the first opposite Stoch crossover
+                   (exit_reason 'Cross'); longs exit on a cross down, shorts on a cross up
+    cross_idx: (up_idx, down_idx) from stoch_cross_indices; computed from
+               prices with the default Stoch(14,3,3) when omitted
+    costs: optional CostModel; fills/PnL/R_mult are netted after the exit scan
+           (see costs.apply_costs), contract: ContractSpec for commission
+
+    Returns: signals with outcome columns:
+      ['exit_price','exit_reason','PnL','R_mult',
+       'mae','mfe','mae_r','mfe_r','bars_held','exit_time','time_to_exit']
+    MAE/MFE cover the bars from entry to exit; adverse excursion is capped at
+    the stop and favourable excursion at the target on SL/TP exits.
+    """
+    idx = path_index if path_index is not None else TradePathIndex(prices)
+
+    out = signals.copy()
+    if len(signals) == 0:
+        for col in ["exit_price", "exit_reason", "PnL", "R_mult", "mae", "mfe",
+                    "mae_r", "mfe_r", "bars_held", "exit_time", "time_to_exit"]:
+            out[col] = pd.Series(dtype=object)
+        return out
+
+    is_buy = signals["side"].str.upper().to_numpy() == "BUY"
+    is_sell = signals["side"].str.upper().to_numpy() == "SELL"
+    entry = signals["entry"].to_numpy(dtype=float)
+    stop = signals["stop"].to_numpy(dtype=float)
+    tp = signals["tp"].to_numpy(dtype=float) if "tp" in signals.columns else np.full(len(signals), np.nan)
+    # Unknown sides never touch SL/TP
+    stop = np.where(is_buy | is_sell, stop, np.nan)
+    tp = np.where(is_buy | is_sell, tp, np.nan)
+
+    start = idx.locate(signals["timestamp"])
+    exit_idx, reason = idx.resolve_exits(start, is_buy, stop, tp)
+    if exit_on_cross:
+        if cross_idx is None:
+            from .eod_continuation import stochastic_kd
+            p = _normalize_prices(prices)
+            k, d = stochastic_kd(p["high"], p["low"], p["close"])
+            cross_idx = stoch_cross_indices(k, d)
+        exit_idx, reason = _apply_cross_exits(start, exit_idx, reason, is_buy, is_sell, cross_idx, idx.n)
+    no_data = start >= idx.n
+
+    exit_price = np.select([reason == 0, reason == 1], [stop, tp], idx.close[exit_idx] if idx.n else np.nan)
+    exit_price = np.where(no_data, np.nan, exit_price)
+    direction = np.where(is_buy, 1.0, -1.0)
+    pl = (exit_price - entry) * direction
+    R = _risk(signals, entry, stop)
+    r_mult = pl / R
+
+    mae, mfe = idx.excursions(start, exit_idx, ~is_sell, entry)
+    risk_dist = np.abs(entry - stop)
+    reward_dist = np.abs(tp - entry)
+    mae = np.where(reason == 0, np.minimum(mae, risk_dist), mae)
+    mfe = np.where(reason == 1, np.minimum(mfe, reward_dist), mfe)
+
+    exit_time = pd.to_datetime(np.where(no_data, np.datetime64("NaT"), idx.times[exit_idx]), utc=True)
+    entry_time = pd.to_datetime(signals["timestamp"], utc=True).to_numpy()
+
+    out["exit_price"] = exit_price
+    out["exit_reason"] = _REASONS[reason]
+    out["PnL"] = pl
+    out["R_mult"] = r_mult
+    out["mae"] = mae
+    out["mfe"] = mfe
+    out["mae_r"] = mae / R
+    out["mfe_r"] = mfe / R
+    out["bars_held"] = np.where(no_data, -1, exit_idx - start)
+    out["exit_time"] = exit_time
+    out["time_to_exit"] = exit_time - pd.DatetimeIndex(entry_time)
+
+    if costs is not None:
+        atr = None
+        if costs.slippage_atr_frac:
+            atr = average_true_range(_normalize_prices(prices), costs.atr_len)
+        out = apply_costs(out, costs, contract=contract, atr=atr, start=start)
+    return out
+
+
+def reevaluate_exits(results: pd.DataFrame, path_index: TradePathIndex,
+                     tp_r: Union[float, Sequence[float]] = 2.0,
+                     sl_r: Union[float, Sequence[float]] = 1.0) -> np.ndarray:
+    """
+    R multiples of the same trades under alternative TP/SL multiples of the
+    original risk, resolved from the path index (no bar scan).
+
+    tp_r, sl_r: scalars or equal-length sequences of variants.
+    Returns a (variants x trades) array, ready for metrics.metrics_batch.
+    """
+    tp_r = np.atleast_1d(np.asarray(tp_r, dtype=float))
+    sl_r = np.atleast_1d(np.asarray(sl_r, dtype=float))
+    tp_r, sl_r = np.broadcast_arrays(tp_r, sl_r)
+
+    is_buy = results["side"].str.upper().to_numpy() == "BUY"
+    is_sell = results["side"].str.upper().to_numpy() == "SELL"
+    entry = results["entry"].to_numpy(dtype=float)
+    R = _risk(results, entry, results["stop"].to_numpy(dtype=float))
+    direction = np.where(is_buy, 1.0, -1.0)
+    start = path_index.locate(results["timestamp"])
+    no_data = start >= path_index.n
+    valid_side = is_buy | is_sell
 
-    results = []
-    for _, s in signals.iterrows():
-        side = s["side"].upper()
-        entry = float(s["entry"])
-        stop  = float(s["stop"])
-        tp    = float(s.get("tp", np.nan))
-        ts    = pd.to_datetime(s["timestamp"], utc=True)
-
-        # Price data from entry timestamp onwards
-        future = prices.loc[ts:]
-        exit_price, exit_reason = None, None
-
-        for t, row in future.iterrows():
-            hi, lo = float(row["high"]), float(row["low"])
-            if side == "BUY":
-                if lo <= stop:
-                    exit_price, exit_reason = stop, "SL"; break
-                if not np.isnan(tp) and hi >= tp:
-                    exit_price, exit_reason = tp, "TP"; break
-            elif side == "SELL":
-                if hi >= stop:
-                    exit_price, exit_reason = stop, "SL"; break
-                if not np.isnan(tp) and lo <= tp:
-                    exit_price, exit_reason = tp, "TP"; break
-
-        if exit_price is None:
-            exit_price, exit_reason = float(future.iloc[-1]["close"]), "Open"
-
-        pl = (exit_price - entry) * (1 if side == "BUY" else -1)
-        R  = float(s.get("R", np.nan))
-        r_mult = pl / R if R and not np.isnan(R) else np.nan
-
-        res = s.to_dict()
-        res.update({"exit_price": exit_price,
-                    "exit_reason": exit_reason,
-                    "PnL": pl,
-                    "R_mult": r_mult})
-        results.append(res)
-
-    return pd.DataFrame(results)
+    out = np.full((len(tp_r), len(results)), np.nan)
+    for v, (t, s) in enumerate(zip(tp_r, sl_r)):
+        stop = np.where(valid_side, entry - direction * s * R, np.nan)
+        tp = np.where(valid_side, entry + direction * t * R, np.nan)
+        exit_idx, reason = path_index.resolve_exits(start, is_buy, stop, tp)
+        exit_price = np.select([reason == 0, reason == 1], [stop, tp], path_index.close[exit_idx])
+        out[v] = np.where(no_data, np.nan, (exit_price - entry) * direction / R)
+    return out
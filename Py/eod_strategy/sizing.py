@@ -0,0 +1,124 @@
+"""
+sizing.py - Risk-based position sizing (Python side of the EA's ComputeLotSize).
+
+Lots are sized so that a stop-out loses RiskPercent of equity:
+    value_per_price = tick_value / tick_size        (per 1 lot)
+    lots = risk_money / (|entry - stop| * value_per_price)
+rounded down to the lot step and clamped to [min_lot, max_lot]. As in the
+EA/cBot, min_lot is used when the risk budget is smaller than one step.
+
+Contract specs come from a per-symbol table (CSV or YAML) and every trade
+of every symbol is sized in one vectorized pass.
+
+Usage:
+    specs = load_contract_specs("contracts.csv")
+    sized = size_trades(results, specs, equity=10_000, risk_percent=1.0)
+    sized[["lots", "pnl_money"]]
+"""
+import os
+from dataclasses import dataclass, fields
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+
+@dataclass
+class ContractSpec:
+    symbol: str
+    tick_size: float = 0.01
+    tick_value: float = 1.0  # account currency per tick for 1 lot
+    min_lot: float = 0.01
+    lot_step: float = 0.01
+    max_lot: float = 100.0
+
+    @property
+    def value_per_price(self) -> float:
+        return self.tick_value / self.tick_size
+
+
+def load_contract_specs(path: str) -> Dict[str, ContractSpec]:
+    """
+    Load {symbol: ContractSpec} from
+      - CSV with columns symbol,tick_size,tick_value,min_lot,lot_step[,max_lot], or
+      - YAML mapping {SYMBOL: {tick_size: ..., tick_value: ..., ...}}.
+    """
+    names = {f.name for f in fields(ContractSpec)}
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".yaml", ".yml"):
+        with open(path, "r") as f:
+            table = yaml.safe_load(f) or {}
+        rows = [dict(v or {}, symbol=k) for k, v in table.items()]
+    else:
+        df = pd.read_csv(path)
+        df.columns = [c.lower() for c in df.columns]
+        if "symbol" not in df.columns:
+            raise ValueError("Contract table missing required column: 'symbol'")
+        rows = df.to_dict("records")
+    specs = {}
+    for row in rows:
+        spec = ContractSpec(**{k: v for k, v in row.items() if k in names and not pd.isna(v)})
+        if spec.tick_size <= 0 or spec.lot_step <= 0:
+            raise ValueError(f"Invalid contract spec for {spec.symbol}: tick_size and lot_step must be > 0")
+        specs[str(spec.symbol)] = spec
+    return specs
+
+
+def _spec_columns(results: pd.DataFrame, specs: Union[ContractSpec, Dict[str, ContractSpec]]) -> pd.DataFrame:
+    """Per-trade contract columns (broadcast from one spec or mapped by 'symbol')."""
+    cols = ["tick_size", "tick_value", "min_lot", "lot_step", "max_lot"]
+    if isinstance(specs, ContractSpec):
+        return pd.DataFrame({c: np.full(len(results), getattr(specs, c), dtype=float) for c in cols},
+                            index=results.index)
+    if "symbol" not in results.columns:
+        raise ValueError("results need a 'symbol' column to look up contract specs")
+    table = pd.DataFrame([{c: getattr(s, c) for c in cols} for s in specs.values()],
+                         index=list(specs.keys()), columns=cols, dtype=float)
+    missing = set(results["symbol"].astype(str)) - set(table.index)
+    if missing:
+        raise ValueError(f"No contract spec for symbol(s): {sorted(missing)}")
+    out = table.reindex(results["symbol"].astype(str).to_numpy())
+    out.index = results.index
+    return out
+
+
+def round_lots(lots, min_lot, lot_step, max_lot) -> np.ndarray:
+    """Floor to lot_step, then clamp to [min_lot, max_lot]."""
+    steps = np.floor(np.asarray(lots, dtype=float) / lot_step + 1e-9)
+    rounded = np.maximum(min_lot, steps * lot_step)
+    rounded = np.minimum(rounded, max_lot)
+    # snap away float noise from the step multiplication (e.g. 0.30000000000000004)
+    decimals = np.clip(np.ceil(-np.log10(lot_step)).astype(int), 0, 8)
+    return np.round(rounded * 10.0 ** decimals) / 10.0 ** decimals
+
+
+def size_trades(
+    results: pd.DataFrame,
+    specs: Union[ContractSpec, Dict[str, ContractSpec]],
+    equity: float = 10_000.0,
+    risk_percent: float = 1.0,
+) -> pd.DataFrame:
+    """
+    Add ['lots','risk_money','pnl_money'] to simulated results.
+    Risk is a fixed fraction of `equity` (no compounding), so every trade is
+    sized independently in one vectorized pass. Trades without a usable stop
+    distance get NaN lots.
+    """
+    out = results.copy()
+    if len(results) == 0:
+        for col in ("lots", "risk_money", "pnl_money"):
+            out[col] = pd.Series(dtype=float)
+        return out
+    spec = _spec_columns(results, specs)
+    value_per_price = (spec["tick_value"] / spec["tick_size"]).to_numpy()
+    sl_dist = np.abs(out["entry"].to_numpy(dtype=float) - out["stop"].to_numpy(dtype=float))
+    risk_money = equity * (risk_percent / 100.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = risk_money / (sl_dist * value_per_price)
+    lots = round_lots(raw, spec["min_lot"].to_numpy(), spec["lot_step"].to_numpy(), spec["max_lot"].to_numpy())
+    lots = np.where(np.isfinite(raw) & (sl_dist > 0), lots, np.nan)
+    out["lots"] = lots
+    out["risk_money"] = sl_dist * value_per_price * lots
+    out["pnl_money"] = out["PnL"].to_numpy(dtype=float) * value_per_price * lots
+    return out
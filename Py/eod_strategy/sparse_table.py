@@ -0,0 +1,92 @@
+"""
+sparse_table.py - Sparse tables for O(1) range min/max queries.
+
+Built once per price column in O(n log n); after that any inclusive range
+[lo, hi] is answered with two lookups, and "first bar at/after `start`
+whose value crosses `level`" is answered in O(log n) by binary lifting.
+Every query is vectorized over arrays of ranges / starts.
+"""
+import numpy as np
+
+
+class SparseTable:
+    """
+    Range-min or range-max table over a 1-D array.
+
+        st = SparseTable(lows, "min")
+        st.query(lo_idx, hi_idx)        # min(lows[lo:hi+1]) per pair
+        st.rolling(14)                  # trailing 14-bar min at every bar
+        st.first_cross(start, stops)    # first i >= start with lows[i] <= stop (n if none)
+
+    NaNs are ignored (treated as +inf for "min", -inf for "max").
+    """
+
+    def __init__(self, values, op: str = "min"):
+        if op not in ("min", "max"):
+            raise ValueError("op must be 'min' or 'max'")
+        self.op = op
+        self._fn = np.fmin if op == "min" else np.fmax
+        fill = np.inf if op == "min" else -np.inf
+        base = np.asarray(values, dtype=float)
+        base = np.where(np.isnan(base), fill, base)
+        self.n = len(base)
+        self.levels = [base]
+        k = 1
+        while (1 << k) <= self.n:
+            prev = self.levels[-1]
+            half = 1 << (k - 1)
+            self.levels.append(self._fn(prev[:-half], prev[half:]))
+            k += 1
+
+    def query(self, lo, hi) -> np.ndarray:
+        """Min/max over inclusive ranges [lo, hi] (arrays or scalars, lo <= hi)."""
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        length = hi - lo + 1
+        k = np.floor(np.log2(np.maximum(length, 1))).astype(np.int64)
+        out = np.empty(np.broadcast(lo, hi).shape, dtype=float)
+        for lvl in np.unique(k):
+            m = k == lvl
+            table = self.levels[lvl]
+            out[m] = self._fn(table[lo[m]], table[hi[m] - (1 << lvl) + 1])
+        return out
+
+    def rolling(self, window: int) -> np.ndarray:
+        """
+        Trailing min/max over `window` bars ending at every index (NaN for the
+        first window-1 bars). Both halves of every window come from the same
+        table level, so this is two contiguous slices and one fmin/fmax.
+        """
+        window = int(window)
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        out = np.full(self.n, np.nan)
+        if window > self.n:
+            return out
+        lvl = window.bit_length() - 1
+        table = self.levels[lvl]
+        span = 1 << lvl
+        out[window - 1:] = self._fn(table[:self.n - window + 1], table[window - span:self.n - span + 1])
+        return out
+
+    def first_cross(self, start, level) -> np.ndarray:
+        """
+        First index i >= start where values[i] <= level ("min" table) or
+        values[i] >= level ("max" table); returns n where no such bar exists.
+        NaN levels never cross.
+        """
+        start = np.asarray(start, dtype=np.int64)
+        level = np.asarray(level, dtype=float)
+        never = np.inf if self.op == "max" else -np.inf
+        level = np.where(np.isnan(level), never, level)
+        pos = np.minimum(start, self.n).copy()
+        for k in range(len(self.levels) - 1, -1, -1):
+            step = 1 << k
+            table = self.levels[k]
+            ok = pos + step <= self.n
+            if not ok.any():
+                continue
+            vals = table[np.where(ok, pos, 0)]
+            clear = vals > level if self.op == "min" else vals < level
+            pos = np.where(ok & clear, pos + step, pos)
+        return pos
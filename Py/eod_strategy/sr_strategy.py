@@ -0,0 +1,199 @@
+"""
+sr_strategy.py - EMA5/10 + Stochastic cross + near S/R strategy.
+
+Python port of the platform scripts (EMA5_10_Stoch_SR_EOD.mq5,
+EMA5_10_Stoch_SR_Signal.cs / .pine):
+- Bias: EMA fast > EMA slow -> buys only, < -> sells only (AllowCounterTrend lifts it)
+- Trigger: %K crosses %D (up for buys, down for sells) on the closed daily bar
+- Location: close within NearSRTolerancePct % of an S/R level
+    * manual levels SR1..SR4 (<= 0 ignored), plus
+    * optional pivot highs/lows confirmed within the last pivot_lookback bars
+- Stop at the nearest S/R on the protective side (GetNearestSR), TP = TP_R * R
+- Optional strong-candle confirmation (Pine / signal indicator variant)
+
+As in run_strategy_on_dataframe, a signal row is stamped with the bar after
+the evaluated (closed) bar, so the simulator starts on the next bar.
+The whole signal path is vectorized; there is no per-bar loop.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from .eod_continuation import stochastic_kd, strong_candle_mask
+from .indicators import ema_bank
+
+
+@dataclass
+class SRStrategyConfig:
+    symbol: str = "XAUUSD"
+    ema_fast: int = 5
+    ema_slow: int = 10
+    stoch_k_len: int = 14
+    stoch_k_smooth: int = 3
+    stoch_d_smooth: int = 3
+    # Manual S/R levels (SR1..SR4); values <= 0 are ignored
+    sr_levels: Tuple[float, ...] = ()
+    near_sr_tolerance_pct: float = 0.5
+    # Pivot-based S/R (Pine: UsePivotSR / PivotLeft / PivotRight, MQ5: PivotLookback)
+    use_pivot_sr: bool = True
+    pivot_left: int = 5
+    pivot_right: int = 5
+    pivot_lookback: int = 60
+    allow_counter_trend: bool = False
+    use_candle_strength: bool = False
+    body_min_pct: float = 50.0
+    tp_r_multiple: float = 2.0
+
+
+# ---------------------- S/R levels ----------------------
+
+def pivot_levels(highs: np.ndarray, lows: np.ndarray, left: int, right: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pivot highs/lows placed on the bar that confirms them (pivot bar + right).
+    A pivot high is a bar whose high is the max of the [left, right] window
+    around it (lows: min). Returns (pivot_high, pivot_low), NaN elsewhere.
+    """
+    n = len(highs)
+    w = left + right + 1
+    ph = np.full(n, np.nan)
+    pl = np.full(n, np.nan)
+    if n < w:
+        return ph, pl
+    hw = np.lib.stride_tricks.sliding_window_view(highs, w)
+    lw = np.lib.stride_tricks.sliding_window_view(lows, w)
+    center = np.arange(left, n - right)
+    is_ph = highs[center] >= hw.max(axis=1)
+    is_pl = lows[center] <= lw.min(axis=1)
+    confirm = center + right
+    ph[confirm[is_ph]] = highs[center[is_ph]]
+    pl[confirm[is_pl]] = lows[center[is_pl]]
+    return ph, pl
+
+def sr_level_matrix(highs: np.ndarray, lows: np.ndarray, cfg: SRStrategyConfig) -> np.ndarray:
+    """
+    (n_bars x n_levels) matrix of S/R levels known at each bar's close;
+    unused slots are NaN.
+    """
+    n = len(highs)
+    manual = np.array([lv for lv in cfg.sr_levels if lv and lv > 0], dtype=float)
+    blocks = [np.broadcast_to(manual, (n, len(manual)))]
+    if cfg.use_pivot_sr and cfg.pivot_lookback > 0:
+        ph, pl = pivot_levels(highs, lows, cfg.pivot_left, cfg.pivot_right)
+        lb = cfg.pivot_lookback
+        pad = np.full(lb - 1, np.nan)
+        for piv in (ph, pl):
+            blocks.append(np.lib.stride_tricks.sliding_window_view(np.r_[pad, piv], lb))
+    return np.concatenate(blocks, axis=1) if blocks else np.empty((n, 0))
+
+def near_sr_mask(price: np.ndarray, levels: np.ndarray, tol_pct: float) -> np.ndarray:
+    """IsNearSR: any level within tol_pct % of price."""
+    tol = (price * (tol_pct / 100.0))[:, None]
+    with np.errstate(invalid="ignore"):
+        return (np.abs(price[:, None] - levels) <= tol).any(axis=1)
+
+def nearest_sr(price: np.ndarray, levels: np.ndarray, is_buy: bool) -> np.ndarray:
+    """
+    GetNearestSR: nearest level to price; for buys, if that level is at/above
+    price, prefer the nearest level below (sells: above). NaN if no levels.
+    """
+    with np.errstate(invalid="ignore"):
+        dist = np.abs(price[:, None] - levels)
+        dist = np.where(np.isnan(dist), np.inf, dist)
+        best_i = dist.argmin(axis=1) if levels.shape[1] else np.zeros(len(price), dtype=int)
+        has_any = np.isfinite(dist).any(axis=1)
+        best = np.where(has_any, levels[np.arange(len(price)), best_i] if levels.shape[1] else np.nan, np.nan)
+        if is_buy:
+            side = np.where(levels < price[:, None], levels, -np.inf).max(axis=1, initial=-np.inf)
+            swap = (best >= price) & np.isfinite(side)
+        else:
+            side = np.where(levels > price[:, None], levels, np.inf).min(axis=1, initial=np.inf)
+            swap = (best <= price) & np.isfinite(side)
+    return np.where(swap, side, best)
+
+
+# ---------------------- Strategy ----------------------
+
+def run_sr_strategy(df: pd.DataFrame, cfg: SRStrategyConfig, cache=None) -> pd.DataFrame:
+    """
+    EMA5/10 + Stoch cross + near S/R on a daily OHLC dataframe.
+    Returns signals:
+      ['timestamp','symbol','side','ref_bar_close','entry','stop','tp','R',
+       'sr_level','body_pct','k','d','ema_fast','ema_slow']
+    cache: optional indicators.IndicatorGraph built on the same dataframe.
+    """
+    df = df.rename(columns=str.lower)
+    for col in ("open", "high", "low", "close"):
+        if col not in df.columns:
+            raise ValueError(f"Input DataFrame missing required column: '{col}'")
+
+    if cache is not None:
+        ef, es = cache.ema(cfg.ema_fast), cache.ema(cfg.ema_slow)
+        k, d = cache.stoch(cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth)
+    else:
+        ef, es = ema_bank(df["close"].to_numpy(dtype=float), [cfg.ema_fast, cfg.ema_slow])
+        k, d = stochastic_kd(df["high"], df["low"], df["close"],
+                             cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth)
+    ef, es = np.asarray(ef, dtype=float), np.asarray(es, dtype=float)
+    k, d = np.asarray(k, dtype=float), np.asarray(d, dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+
+    n = len(df)
+    if n < 3:
+        return pd.DataFrame()
+
+    # Evaluate on closed bar t = i-1 (crossover between t-1 and t); emit on bar i
+    t = np.arange(1, n - 1)
+    k_prev, d_prev, k_now, d_now = k[t - 1], d[t - 1], k[t], d[t]
+    with np.errstate(invalid="ignore"):
+        cross_up = (k_prev < d_prev) & (k_now > d_now)
+        cross_down = (k_prev > d_prev) & (k_now < d_now)
+        bull = ef[t] > es[t]
+        bear = ef[t] < es[t]
+
+    price = close[t]
+    levels = sr_level_matrix(high, low, cfg)[t]
+    near = near_sr_mask(price, levels, cfg.near_sr_tolerance_pct)
+
+    buy = (cfg.allow_counter_trend | bull) & cross_up & near
+    sell = (cfg.allow_counter_trend | bear) & cross_down & near
+
+    strong_bull, strong_bear, body_pct = strong_candle_mask(
+        df["open"], df["high"], df["low"], df["close"], cfg.body_min_pct
+    )
+    body_pct = body_pct.to_numpy(dtype=float)[t]
+    if cfg.use_candle_strength:
+        buy &= strong_bull.to_numpy(dtype=bool)[t]
+        sell &= strong_bear.to_numpy(dtype=bool)[t]
+
+    ts = df.index[t + 1] if isinstance(df.index, pd.DatetimeIndex) else pd.to_datetime(t + 1)
+
+    frames = []
+    for side, mask, is_buy in (("BUY", buy, True), ("SELL", sell, False)):
+        sr = nearest_sr(price, levels, is_buy)
+        R = (price - sr) if is_buy else (sr - price)
+        with np.errstate(invalid="ignore"):
+            ok = mask & (R > 0)  # "No valid SL -> skip"
+        tp = price + cfg.tp_r_multiple * R if is_buy else price - cfg.tp_r_multiple * R
+        frames.append(pd.DataFrame({
+            "order": np.flatnonzero(ok) * 2 + (0 if is_buy else 1),
+            "timestamp": ts[ok],
+            "symbol": cfg.symbol,
+            "side": side,
+            "ref_bar_close": price[ok],
+            "entry": price[ok],
+            "stop": sr[ok],
+            "tp": tp[ok],
+            "R": R[ok],
+            "sr_level": sr[ok],
+            "body_pct": body_pct[ok],
+            "k": k_now[ok],
+            "d": d_now[ok],
+            "ema_fast": ef[t][ok],
+            "ema_slow": es[t][ok],
+        }))
+    out = pd.concat(frames, ignore_index=True).sort_values("order", kind="stable")
+    return out.drop(columns="order").reset_index(drop=True)
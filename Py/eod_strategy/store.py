@@ -0,0 +1,308 @@
+"""
+store.py - Embedded SQLite result store with an append-only run catalogue.
+
+Every (dataset, strategy) backtest is recorded as one run carrying its
+config hash, dataset fingerprint and flattened parameters, together with
+its signals, simulated trades and metrics. Runs are never overwritten, and
+the catalogue is indexed by symbol, strategy, date range, parameter and
+metric so queries such as "top 20 configs by total_r for XAUUSD" stay
+interactive across thousands of runs.
+
+Usage:
+    store = ResultStore("results.sqlite")
+    run_id = store.record_run("XAUUSD", "EOD", cfg, prices, signals, results, metrics)
+    store.top_configs("total_r", n=20, symbol="XAUUSD", params={"stoch_k_len": 14})
+    store.trades(symbol="XAUUSD", strategy="EOD", start="2020-01-01")
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    created      TEXT NOT NULL,
+    batch_id     TEXT,
+    symbol       TEXT NOT NULL,
+    strategy     TEXT NOT NULL,
+    config_hash  TEXT NOT NULL,
+    dataset_hash TEXT NOT NULL,
+    params       TEXT NOT NULL,
+    data_start   TEXT,
+    data_end     TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_runs_symbol_strategy ON runs(symbol, strategy);
+CREATE INDEX IF NOT EXISTS ix_runs_config ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS ix_runs_dataset ON runs(dataset_hash);
+CREATE INDEX IF NOT EXISTS ix_runs_dates ON runs(data_start, data_end);
+
+CREATE TABLE IF NOT EXISTS run_params (
+    run_id     INTEGER NOT NULL REFERENCES runs(run_id),
+    key        TEXT NOT NULL,
+    value_num  REAL,
+    value_text TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_params_num ON run_params(key, value_num, run_id);
+CREATE INDEX IF NOT EXISTS ix_params_text ON run_params(key, value_text, run_id);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name   TEXT NOT NULL,
+    value  REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS ix_metrics_name_value ON metrics(name, value);
+
+CREATE TABLE IF NOT EXISTS signals (
+    run_id    INTEGER NOT NULL REFERENCES runs(run_id),
+    timestamp TEXT,
+    side      TEXT,
+    entry     REAL,
+    stop      REAL,
+    tp        REAL
+);
+CREATE INDEX IF NOT EXISTS ix_signals_run_ts ON signals(run_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS trades (
+    run_id      INTEGER NOT NULL REFERENCES runs(run_id),
+    timestamp   TEXT,
+    side        TEXT,
+    entry       REAL,
+    stop        REAL,
+    tp          REAL,
+    exit_price  REAL,
+    exit_reason TEXT,
+    exit_time   TEXT,
+    pnl         REAL,
+    r_mult      REAL,
+    mae_r       REAL,
+    mfe_r       REAL,
+    bars_held   INTEGER,
+    pnl_money   REAL
+);
+CREATE INDEX IF NOT EXISTS ix_trades_run_ts ON trades(run_id, timestamp);
+CREATE INDEX IF NOT EXISTS ix_trades_ts ON trades(timestamp);
+"""
+
+_TRADE_COLS = [
+    ("timestamp", "timestamp"), ("side", "side"), ("entry", "entry"), ("stop", "stop"), ("tp", "tp"),
+    ("exit_price", "exit_price"), ("exit_reason", "exit_reason"), ("exit_time", "exit_time"),
+    ("pnl", "PnL"), ("r_mult", "R_mult"), ("mae_r", "mae_r"), ("mfe_r", "mfe_r"),
+    ("bars_held", "bars_held"), ("pnl_money", "pnl_money"),
+]
+_SIGNAL_COLS = [("timestamp", "timestamp"), ("side", "side"), ("entry", "entry"), ("stop", "stop"), ("tp", "tp")]
+
+
+# ---------------------- Hashing ----------------------
+
+def config_params(cfg) -> dict:
+    """Flatten a strategy config (dataclass or dict) into JSON-safe values."""
+    if cfg is None:
+        return {}
+    d = asdict(cfg) if is_dataclass(cfg) else dict(cfg)
+    return {k: (list(v) if isinstance(v, tuple) else v) for k, v in d.items()}
+
+def config_hash(cfg) -> str:
+    payload = json.dumps(config_params(cfg), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def dataset_fingerprint(prices: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    h.update(repr(list(prices.columns)).encode())
+    h.update(pd.util.hash_pandas_object(prices, index=True).values.tobytes())
+    return h.hexdigest()
+
+
+def _iso(ts) -> pd.Series:
+    s = pd.to_datetime(pd.Series(ts), utc=True, errors="coerce")
+    return s.dt.strftime("%Y-%m-%d %H:%M:%S").where(s.notna(), None)
+
+def _iso_bound(value) -> Optional[str]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
+
+def _column_rows(df: pd.DataFrame, cols) -> list:
+    data = []
+    for _, src in cols:
+        if src not in df.columns:
+            data.append([None] * len(df))
+        elif src in ("timestamp", "exit_time"):
+            data.append(_iso(df[src]).tolist())
+        else:
+            col = df[src]
+            data.append([None if pd.isna(v) else (v.item() if isinstance(v, np.generic) else v)
+                         for v in col.tolist()])
+    return list(zip(*data)) if data else []
+
+
+class ResultStore:
+    def __init__(self, path: str = "results.sqlite"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ---------------------- Writes (append-only) ----------------------
+
+    def record_run(
+        self,
+        symbol: str,
+        strategy: str,
+        cfg,
+        prices: pd.DataFrame,
+        signals: pd.DataFrame,
+        results: pd.DataFrame,
+        metrics: Dict[str, float],
+        batch_id: Optional[str] = None,
+        dataset_hash: Optional[str] = None,
+    ) -> int:
+        """Append one run with its signals, trades and metrics; returns run_id."""
+        params = config_params(cfg)
+        start = end = None
+        if len(prices) and isinstance(prices.index, pd.DatetimeIndex):
+            start, end = _iso([prices.index[0], prices.index[-1]]).tolist()
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (created, batch_id, symbol, strategy, config_hash, dataset_hash, params,"
+                " data_start, data_end) VALUES (?,?,?,?,?,?,?,?,?)",
+                (datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), batch_id, symbol, strategy,
+                 config_hash(cfg), dataset_hash or dataset_fingerprint(prices),
+                 json.dumps(params, sort_keys=True, default=str), start, end),
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_params (run_id, key, value_num, value_text) VALUES (?,?,?,?)",
+                [(run_id, k, float(v) if isinstance(v, (int, float)) else None,
+                  None if isinstance(v, (int, float)) else json.dumps(v, default=str) if not isinstance(v, str) else v)
+                 for k, v in params.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO metrics (run_id, name, value) VALUES (?,?,?)",
+                [(run_id, k, float(v)) for k, v in metrics.items()
+                 if isinstance(v, (int, float, np.number)) and not pd.isna(v)],
+            )
+            if signals is not None and len(signals):
+                self.conn.executemany(
+                    f"INSERT INTO signals (run_id, {', '.join(c for c, _ in _SIGNAL_COLS)}) "
+                    f"VALUES (?{',?' * len(_SIGNAL_COLS)})",
+                    [(run_id,) + row for row in _column_rows(signals, _SIGNAL_COLS)],
+                )
+            if results is not None and len(results):
+                self.conn.executemany(
+                    f"INSERT INTO trades (run_id, {', '.join(c for c, _ in _TRADE_COLS)}) "
+                    f"VALUES (?{',?' * len(_TRADE_COLS)})",
+                    [(run_id,) + row for row in _column_rows(results, _TRADE_COLS)],
+                )
+        return run_id
+
+    # ---------------------- Queries ----------------------
+
+    def _run_filter(self, symbol=None, strategy=None, start=None, end=None, params=None,
+                    config_hash=None, dataset_hash=None, alias="r"):
+        where, args = [], []
+        if symbol is not None:
+            where.append(f"{alias}.symbol = ?"); args.append(symbol)
+        if strategy is not None:
+            where.append(f"{alias}.strategy = ?"); args.append(strategy)
+        if config_hash is not None:
+            where.append(f"{alias}.config_hash = ?"); args.append(config_hash)
+        if dataset_hash is not None:
+            where.append(f"{alias}.dataset_hash = ?"); args.append(dataset_hash)
+        # runs whose data overlaps [start, end]
+        if start is not None:
+            where.append(f"{alias}.data_end >= ?"); args.append(_iso_bound(start))
+        if end is not None:
+            where.append(f"{alias}.data_start <= ?"); args.append(_iso_bound(end))
+        for key, value in (params or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                where.append(f"EXISTS (SELECT 1 FROM run_params p WHERE p.run_id = {alias}.run_id"
+                             " AND p.key = ? AND p.value_num = ?)")
+                args += [key, float(value)]
+            else:
+                where.append(f"EXISTS (SELECT 1 FROM run_params p WHERE p.run_id = {alias}.run_id"
+                             " AND p.key = ? AND (p.value_text = ? OR p.value_num = ?))")
+                args += [key, value if isinstance(value, str) else json.dumps(value, default=str),
+                         float(value) if isinstance(value, bool) else None]
+        return (" AND ".join(where) or "1=1"), args
+
+    def runs(self, **filters) -> pd.DataFrame:
+        """Run catalogue filtered by symbol/strategy/start/end/params/config_hash/dataset_hash."""
+        where, args = self._run_filter(**filters)
+        return pd.read_sql_query(f"SELECT * FROM runs r WHERE {where} ORDER BY r.run_id", self.conn, params=args)
+
+    def metrics(self, run_ids=None, **filters) -> pd.DataFrame:
+        """Wide metrics table (one row per run)."""
+        where, args = self._run_filter(**filters)
+        if run_ids is not None:
+            run_ids = list(run_ids)
+            where += f" AND r.run_id IN ({','.join('?' * len(run_ids))})"
+            args += run_ids
+        long = pd.read_sql_query(
+            f"SELECT m.run_id, m.name, m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id WHERE {where}",
+            self.conn, params=args)
+        return long.pivot(index="run_id", columns="name", values="value")
+
+    def top_configs(self, metric: str = "total_r", n: int = 10, ascending: bool = False,
+                    latest_only: bool = True, **filters) -> pd.DataFrame:
+        """
+        Best runs by one metric, with their symbol/strategy/params.
+        latest_only keeps the newest run per (symbol, strategy, config, dataset).
+        """
+        where, args = self._run_filter(**filters)
+        if latest_only:
+            where += (" AND r.run_id = (SELECT MAX(r2.run_id) FROM runs r2 WHERE r2.symbol = r.symbol"
+                      " AND r2.strategy = r.strategy AND r2.config_hash = r.config_hash"
+                      " AND r2.dataset_hash = r.dataset_hash)")
+        order = "ASC" if ascending else "DESC"
+        df = pd.read_sql_query(
+            "SELECT r.run_id, r.symbol, r.strategy, r.config_hash, r.params, m.value AS value "
+            "FROM metrics m JOIN runs r ON r.run_id = m.run_id "
+            f"WHERE m.name = ? AND {where} ORDER BY m.value {order} LIMIT ?",
+            self.conn, params=[metric] + args + [int(n)])
+        # metric names are bound, never spliced into the SQL
+        return df.rename(columns={"value": metric})
+
+    def _rows(self, table: str, run_id=None, start=None, end=None, **filters) -> pd.DataFrame:
+        where, args = self._run_filter(**filters)
+        if run_id is not None:
+            where += " AND t.run_id = ?"; args.append(int(run_id))
+        if start is not None:
+            where += " AND t.timestamp >= ?"; args.append(_iso_bound(start))
+        if end is not None:
+            where += " AND t.timestamp <= ?"; args.append(_iso_bound(end))
+        df = pd.read_sql_query(
+            f"SELECT r.symbol, r.strategy, t.* FROM {table} t JOIN runs r ON r.run_id = t.run_id "
+            f"WHERE {where} ORDER BY t.run_id, t.timestamp", self.conn, params=args)
+        for col in ("timestamp", "exit_time"):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], utc=True)
+        return df
+
+    def trades(self, run_id=None, start=None, end=None, **filters) -> pd.DataFrame:
+        """Trades by run and/or symbol/strategy/params, optionally within [start, end]."""
+        return self._rows("trades", run_id=run_id, start=start, end=end, **filters)
+
+    def signals(self, run_id=None, start=None, end=None, **filters) -> pd.DataFrame:
+        return self._rows("signals", run_id=run_id, start=start, end=end, **filters)
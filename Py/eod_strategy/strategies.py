@@ -0,0 +1,136 @@
+"""
+strategies.py - Strategy registry and shared-indicator runner.
+
+Each registered strategy declares the indicators it needs for a given
+config. run_strategies() resolves the union of those declarations into one
+deduplicated IndicatorGraph per dataset, computes every node once and then
+calls each strategy with read-only views of the results. Adding a strategy
+only costs its own signal logic.
+
+Usage:
+    @register_strategy("MyStrat", indicators=lambda cfg: [EMA(cfg.fast), RSI(14)],
+                       default_config=MyConfig)
+    def run_my_strategy(prices, cfg, graph): ...
+
+    signals, graph = run_strategies(prices, symbol="XAUUSD")
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .indicators import IndicatorGraph, IndicatorSpec, EMA, RSI, STOCH, htf_bias_specs
+from .eod_continuation import StrategyConfig, run_strategy_on_dataframe
+from .core_strategy import CoreStrategyConfig, run_core_strategy
+from .sr_strategy import SRStrategyConfig, run_sr_strategy
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    name: str
+    run: Callable[[pd.DataFrame, object, IndicatorGraph], pd.DataFrame]
+    indicators: Callable[[object], List[IndicatorSpec]]
+    default_config: Callable[..., object]
+    # Signals are stamped this many bars after the closed bar they evaluate
+    signal_lag: int = 1
+    # cfg -> (k_len, k_smooth, d_smooth) of the Stoch whose opposite cross
+    # exits a trade (simulator exit_on_cross); None: no cross-exit variant
+    exit_stoch: Optional[Callable[[object], Tuple[int, int, int]]] = None
+
+
+REGISTRY: Dict[str, StrategySpec] = {}
+
+
+def register_strategy(name: str, indicators: Callable[[object], Iterable], default_config: Callable[..., object],
+                      signal_lag: int = 1,
+                      exit_stoch: Optional[Callable[[object], Tuple[int, int, int]]] = None):
+    """
+    Decorator registering run(prices, cfg, graph) -> signals under `name`.
+    default_config(symbol=...) builds the config used when none is given.
+    signal_lag: bars between the evaluated (closed) bar and the signal's
+    timestamp (1: stamped on the next bar, 0: on the evaluated bar itself).
+    exit_stoch(cfg) -> (k_len, k_smooth, d_smooth): the strategy's own Stoch,
+    used for the opposite-cross exit variant (None: the strategy has none).
+    """
+    def deco(fn):
+        REGISTRY[name] = StrategySpec(name, fn, lambda cfg: list(indicators(cfg)), default_config,
+                                      signal_lag, exit_stoch)
+        return fn
+    return deco
+
+
+def run_strategies(
+    prices: pd.DataFrame,
+    configs: Optional[Dict[str, object]] = None,
+    names: Optional[Iterable[str]] = None,
+    symbol: str = "XAUUSD",
+    graph: Optional[IndicatorGraph] = None,
+) -> Tuple[Dict[str, pd.DataFrame], IndicatorGraph]:
+    """
+    Run registered strategies over one dataset with a shared indicator graph.
+    configs: {name: config}; missing entries use the strategy's default config.
+    names: subset / order of strategies (default: registration order).
+    Returns ({name: signals}, graph).
+    """
+    configs = dict(configs or {})
+    names = list(names) if names is not None else list(REGISTRY)
+    for name in names:
+        if name not in REGISTRY:
+            raise ValueError(f"Unknown strategy: '{name}'")
+        if configs.get(name) is None:
+            configs[name] = REGISTRY[name].default_config(symbol=symbol)
+
+    graph = graph if graph is not None else IndicatorGraph(prices)
+    for name in names:
+        graph.require(*REGISTRY[name].indicators(configs[name]))
+    graph.compute()
+
+    signals = {name: REGISTRY[name].run(prices, configs[name], graph) for name in names}
+    return signals, graph
+
+
+# ---------------------- Built-in strategies ----------------------
+
+def _htf_args(cfg):
+    return (cfg.htf_mode, (cfg.htf_ema_fast, cfg.htf_ema_slow),
+            (cfg.htf_stoch_k_len, cfg.htf_stoch_k_smooth, cfg.htf_stoch_d_smooth))
+
+def _htf_indicators(cfg) -> List[IndicatorSpec]:
+    return htf_bias_specs(cfg.htf_timeframe, *_htf_args(cfg)) if cfg.htf_timeframe else []
+
+def _eod_indicators(cfg: StrategyConfig):
+    specs = STOCH(cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth)
+    if cfg.use_ema_filter:
+        specs += [EMA(cfg.ema_fast), EMA(cfg.ema_slow)]
+    return specs + _htf_indicators(cfg)
+
+@register_strategy(
+    "Core",
+    indicators=lambda cfg: [EMA(p) for p in cfg.ema_periods] + [RSI(cfg.rsi_len, cfg.rsi_smoothing)]
+    + _htf_indicators(cfg),
+    default_config=CoreStrategyConfig,
+    signal_lag=0,
+)
+def _run_core(prices, cfg: CoreStrategyConfig, graph):
+    htf_mode, htf_ema, htf_stoch = _htf_args(cfg)
+    return run_core_strategy(prices, rsi_len=cfg.rsi_len, ema_periods=cfg.ema_periods,
+                             tp_r_multiple=cfg.tp_r_multiple, cache=graph, rsi_smoothing=cfg.rsi_smoothing,
+                             htf_timeframe=cfg.htf_timeframe, htf_mode=htf_mode, htf_ema=htf_ema,
+                             htf_stoch=htf_stoch)
+
+def _stoch_triple(cfg) -> Tuple[int, int, int]:
+    return cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth
+
+@register_strategy("EOD", indicators=_eod_indicators, default_config=StrategyConfig, exit_stoch=_stoch_triple)
+def _run_eod(prices, cfg: StrategyConfig, graph):
+    return run_strategy_on_dataframe(prices, cfg, cache=graph)
+
+@register_strategy(
+    "SR",
+    indicators=lambda cfg: [EMA(cfg.ema_fast), EMA(cfg.ema_slow)]
+    + STOCH(cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth),
+    default_config=SRStrategyConfig,
+    exit_stoch=_stoch_triple,
+)
+def _run_sr(prices, cfg: SRStrategyConfig, graph):
+    return run_sr_strategy(prices, cfg, cache=graph)
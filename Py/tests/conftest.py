@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_prices(n: int = 600, seed: int = 7, start: str = "2015-01-01") -> pd.DataFrame:
+    """Random-walk daily OHLC on business days at 00:00 UTC (the load_prices layout)."""
+    rng = np.random.default_rng(seed)
+    close = 1500.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0.0, 0.002, n))
+    wick = np.abs(rng.normal(0.0, 0.006, (2, n))) * close
+    index = pd.bdate_range(start, periods=n, tz="UTC", name="timestamp")
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + wick[0],
+        "low": np.minimum(open_, close) - wick[1],
+        "close": close,
+    }, index=index)
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    return make_prices()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.aggregate import EquityAggregator, cumulative_r, load_aggregate, save_aggregate
+from eod_strategy.simulator import simulate_positions
+from eod_strategy.strategies import run_strategies
+
+
+@pytest.fixture
+def curves(prices):
+    out = {}
+    for symbol, seed_prices in (("AAA", prices), ("BBB", prices.iloc[::2] * 1.01)):
+        signals, _ = run_strategies(seed_prices, names=["EOD", "Core"], symbol=symbol)
+        for name, sig in signals.items():
+            res = simulate_positions(sig, seed_prices)
+            out[f"{symbol}_{name.lower()}_cumR"] = (res["timestamp"], cumulative_r(res))
+    return out
+
+
+def test_build_matches_outer_join_and_ffill(curves):
+    agg = EquityAggregator()
+    for col, (ts, values) in curves.items():
+        symbol, name, _ = col.split("_")
+        agg.add(symbol, name, ts, values)
+    got = agg.build()
+
+    series = [pd.Series(values.to_numpy(), index=pd.DatetimeIndex(ts)).groupby(level=0).last().rename(col)
+              for col, (ts, values) in curves.items()]
+    expected = pd.concat(series, axis=1, sort=True).ffill()
+    pd.testing.assert_frame_equal(got, expected, check_names=False, check_freq=False, check_index_type=False)
+
+
+def test_nan_r_multiples_do_not_break_the_curve():
+    res = pd.DataFrame({"timestamp": pd.date_range("2020-01-01", periods=4, tz="UTC"),
+                        "R_mult": [1.0, np.nan, -0.5, 2.0]})
+    np.testing.assert_array_equal(cumulative_r(res), [1.0, 1.0, 0.5, 2.5])
+    agg = EquityAggregator()
+    agg.add("AAA", "eod", res["timestamp"], res["R_mult"].cumsum())
+    built = agg.build().iloc[:, 0]
+    assert list(built.index) == list(res["timestamp"].iloc[[0, 2, 3]])
+    np.testing.assert_array_equal(built, [1.0, 0.5, 2.5])
+
+
+@pytest.mark.parametrize("ext", [".npz", ".csv"])
+def test_save_and_load_round_trip(tmp_path, curves, ext):
+    agg = EquityAggregator()
+    for col, (ts, values) in curves.items():
+        agg.add(*col.split("_")[:2], ts, values)
+    df = agg.build()
+    back = load_aggregate(save_aggregate(df, str(tmp_path / "out" / f"aggregate{ext}")))
+    pd.testing.assert_frame_equal(back, df, check_freq=False, check_index_type=False)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.costs import CostModel, apply_costs, average_true_range, check_cost_models
+from eod_strategy.simulator import simulate_positions
+from eod_strategy.sizing import ContractSpec
+from eod_strategy.strategies import run_strategies
+
+CONTRACT = ContractSpec("TEST", tick_size=0.01, tick_value=2.0)
+
+
+@pytest.fixture
+def gross(prices):
+    sig, _ = run_strategies(prices, names=["EOD"], symbol="TEST")
+    return simulate_positions(sig["EOD"], prices)
+
+
+def test_zero_model_keeps_gross_results(prices, gross):
+    net = apply_costs(gross, CostModel())
+    np.testing.assert_array_equal(net["PnL"], gross["PnL"])
+    np.testing.assert_array_equal(net["cost"], 0.0)
+
+
+def test_costs_match_per_trade_arithmetic(prices, gross):
+    model = CostModel(spread=0.4, commission_per_lot=7.0, slippage=0.1, slippage_atr_frac=0.05,
+                      swap_long=0.02, swap_short=-0.01)
+    sig, _ = run_strategies(prices, names=["EOD"], symbol="TEST")
+    net = simulate_positions(sig["EOD"], prices, costs=model, contract=CONTRACT)
+    atr = average_true_range(prices, model.atr_len)
+    for r, g in zip(net.itertuples(), gross.itertuples()):
+        d = 1.0 if r.side == "BUY" else -1.0
+        prev = prices.index.searchsorted(r.timestamp) - 1
+        slip = model.slippage + model.slippage_atr_frac * (0.0 if prev < 0 or np.isnan(atr[prev]) else atr[prev])
+        entry_fill = r.entry + d * (model.spread / 2 + slip)
+        exit_fill = g.exit_price - d * (model.spread / 2 + (0.0 if g.exit_reason == "TP" else slip))
+        nights = (g.exit_time.normalize() - r.timestamp.normalize()).days
+        swap = nights * (model.swap_long if d > 0 else model.swap_short)
+        pnl = (exit_fill - entry_fill) * d - model.commission_per_lot / CONTRACT.value_per_price - swap
+        assert r.PnL == pytest.approx(pnl)
+        assert r.R_mult == pytest.approx(pnl / r.R)
+        assert r.PnL_gross == g.PnL
+
+
+def test_commission_needs_a_contract(gross):
+    with pytest.raises(ValueError):
+        apply_costs(gross, CostModel(commission_per_lot=7.0))
+
+
+def test_check_cost_models_lists_symbols_without_contracts():
+    models = {"AAA": CostModel(commission_per_lot=7.0), "BBB": CostModel(spread=0.2),
+              "CCC": CostModel(commission_per_lot=3.0)}
+    check_cost_models(models, {"AAA": CONTRACT}, ["AAA", "BBB"])
+    with pytest.raises(ValueError, match="CCC"):
+        check_cost_models(models, {"AAA": CONTRACT}, ["AAA", "BBB", "CCC"])
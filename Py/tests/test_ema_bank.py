@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.indicators import ema_bank
+
+SPANS = [1, 2, 5, 10, 20, 50, 200]
+
+
+def pandas_ema(close, span):
+    return pd.Series(close).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+@pytest.mark.parametrize("n", [1, 31, 32, 33, 600, 1025, 40_000])
+def test_matches_pandas_ewm_across_scan_blocks(n):
+    close = 1000.0 + np.cumsum(np.random.default_rng(n).normal(size=n))
+    got = ema_bank(close, SPANS)
+    assert got.shape == (len(SPANS), n)
+    for row, span in zip(got, SPANS):
+        np.testing.assert_allclose(row, pandas_ema(close, span), rtol=1e-10)
+
+
+def test_leading_and_inner_nans_follow_pandas(prices):
+    close = prices["close"].to_numpy().copy()
+    close[:7] = np.nan
+    np.testing.assert_allclose(ema_bank(close, SPANS)[3], pandas_ema(close, 10), rtol=1e-10)
+    close[300] = np.nan
+    close[450] = np.inf
+    for row, span in zip(ema_bank(close, SPANS), SPANS):
+        np.testing.assert_allclose(row, pandas_ema(close, span), rtol=1e-10)
+
+
+def test_float32_bank(prices):
+    close = prices["close"].to_numpy()
+    got = ema_bank(close, SPANS, dtype=np.float32)
+    assert got.dtype == np.float32
+    np.testing.assert_allclose(got, ema_bank(close, SPANS), rtol=1e-5)
+
+
+def test_degenerate_inputs():
+    assert ema_bank([], [5]).shape == (1, 0)
+    assert np.isnan(ema_bank([np.nan] * 5, [3])).all()
+    with pytest.raises(ValueError):
+        ema_bank([1.0], [0])
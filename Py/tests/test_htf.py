@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.core_strategy import run_core_strategy
+from eod_strategy.eod_continuation import stochastic_kd
+from eod_strategy.indicators import (HTF_EMA, HTF_STOCH, IndicatorGraph, align_htf, htf_bias, htf_periods,
+                                     resample_htf)
+
+PANDAS_RULE = {"W": "W-SAT", "M": "ME"}
+
+
+@pytest.mark.parametrize("tf", ["W", "M"])
+def test_resample_matches_pandas(prices, tf):
+    bars, periods = resample_htf(prices, tf)
+    expected = prices.resample(PANDAS_RULE[tf]).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last"}).dropna()
+    np.testing.assert_array_equal(bars.to_numpy(), expected.to_numpy())
+    assert len(np.unique(periods)) == len(bars)
+    assert (bars.index == prices.index[np.flatnonzero(np.r_[True, np.diff(periods) > 0])]).all()
+
+
+@pytest.mark.parametrize("tf", ["W", "M"])
+def test_htf_nodes_match_pandas_on_resampled_bars(prices, tf):
+    bars = prices.resample(PANDAS_RULE[tf]).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last"}).dropna()
+    periods = htf_periods(prices.index, tf)
+    graph = IndicatorGraph(prices)
+    ema = bars["close"].ewm(span=5, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(graph.htf_ema(tf, 5), align_htf(ema, periods), rtol=1e-12)
+    k, d = stochastic_kd(bars["high"], bars["low"], bars["close"], 5, 3, 3)
+    got_k, got_d = graph.htf_stoch(tf, 5, 3, 3)
+    np.testing.assert_allclose(got_k, align_htf(k.to_numpy(), periods), rtol=1e-12)
+    np.testing.assert_allclose(got_d, align_htf(d.to_numpy(), periods), rtol=1e-12)
+
+
+def test_align_uses_the_previous_completed_period():
+    periods = np.array([0, 0, 1, 1, 1, 2, 3])
+    np.testing.assert_array_equal(align_htf([10.0, 11.0, 12.0, 13.0], periods),
+                                  [np.nan, np.nan, 10.0, 10.0, 10.0, 11.0, 12.0])
+
+
+@pytest.mark.parametrize("tf", ["W", "M"])
+def test_no_lookahead_under_truncation(prices, tf):
+    specs = [HTF_EMA(tf, 3), *HTF_STOCH(tf, 3, 1, 2)]
+    full = IndicatorGraph(prices).require(*specs).compute()
+    for t in range(60, len(prices), 37):
+        cut = IndicatorGraph(prices.iloc[:t + 1]).require(*specs).compute()
+        for spec in specs:
+            np.testing.assert_allclose(cut[spec], full[spec][:t + 1], rtol=1e-12, equal_nan=True)
+
+
+def test_core_bias_filter_only_removes_signals(prices):
+    base = run_core_strategy(prices, ema_periods=(5, 10, 20))
+    graph = IndicatorGraph(prices)
+    filtered = run_core_strategy(prices, ema_periods=(5, 10, 20), cache=graph, htf_timeframe="W")
+    assert 0 < len(filtered) < len(base)
+    long_ok, short_ok = htf_bias(graph, "W")
+    keys = set(zip(base["timestamp"], base["side"]))
+    for ts, side in zip(filtered["timestamp"], filtered["side"]):
+        assert (ts, side) in keys
+        assert (long_ok if side == "BUY" else short_ok)[prices.index.get_loc(ts)]
+    pd.testing.assert_frame_equal(filtered, run_core_strategy(prices, ema_periods=(5, 10, 20), htf_timeframe="W"))
+
+
+def test_invalid_timeframe_and_mode(prices):
+    with pytest.raises(ValueError):
+        HTF_EMA("D", 5)
+    with pytest.raises(ValueError):
+        htf_bias(IndicatorGraph(prices), "W", mode="rsi")
+    with pytest.raises(ValueError):
+        htf_periods(prices.index[::-1], "W")
@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+import yaml
+
+from eod_strategy.backtest_all import run_from_config
+from eod_strategy.manifest import build_manifest, code_hash, is_up_to_date, read_manifest
+from eod_strategy.sr_strategy import SRStrategyConfig
+from eod_strategy.store import ResultStore
+
+
+@pytest.fixture
+def batch(tmp_path, prices):
+    csv = tmp_path / "TEST.csv"
+    prices.reset_index().to_csv(csv, index=False)
+    config = tmp_path / "batch.yaml"
+    config.write_text(yaml.safe_dump({
+        "datasets": [{"file": str(csv), "symbol": "TEST", "outdir": str(tmp_path / "reports" / "test")}],
+        "strategies": ["EOD", "Core"],
+        "aggregate_output": str(tmp_path / "aggregate.csv"),
+    }))
+    return csv, config, tmp_path / "reports" / "test"
+
+
+def test_manifest_is_deterministic_and_tracks_inputs(batch):
+    csv, _, _ = batch
+    base = build_manifest(str(csv), "TEST", strategies=["EOD"])
+    assert base == build_manifest(str(csv), "TEST", strategies=["EOD"])
+    assert base["code_hash"] == code_hash()
+    assert build_manifest(str(csv), "TEST", strategies=["EOD"], risk_percent=2.0)["config_hash"] != base["config_hash"]
+    sr = build_manifest(str(csv), "TEST", configs={"SR": SRStrategyConfig(sr_levels=(1.0,))}, strategies=["SR"])
+    assert sr["config_hash"] != build_manifest(str(csv), "TEST", strategies=["SR"])["config_hash"]
+    csv.write_text(csv.read_text() + "\n")
+    assert build_manifest(str(csv), "TEST", strategies=["EOD"])["input_hash"] != base["input_hash"]
+
+
+def test_unchanged_datasets_are_skipped(batch, capsys):
+    csv, config, outdir = batch
+    run_from_config(str(config), plots=False)
+    first = pd.read_csv(config.parent / "aggregate.csv")
+    manifest = read_manifest(str(outdir))
+    assert is_up_to_date(str(outdir), manifest)
+    capsys.readouterr()
+
+    run_from_config(str(config), plots=False)
+    assert "Skipping TEST" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(pd.read_csv(config.parent / "aggregate.csv"), first)
+
+    (outdir / "eod_results.csv").unlink()
+    assert not is_up_to_date(str(outdir), manifest)
+    run_from_config(str(config), plots=False)
+    assert "Running backtest for TEST" in capsys.readouterr().out
+
+
+def test_stale_code_hash_reruns(batch, capsys):
+    _, config, outdir = batch
+    run_from_config(str(config), plots=False)
+    path = outdir / "run_manifest.json"
+    manifest = json.loads(path.read_text())
+    manifest["code_hash"] = "0" * 64
+    path.write_text(json.dumps(manifest))
+    capsys.readouterr()
+    run_from_config(str(config), plots=False)
+    assert "Running backtest for TEST" in capsys.readouterr().out
+    assert read_manifest(str(outdir))["code_hash"] == code_hash()
+
+
+def _stored_runs(path):
+    with ResultStore(str(path)) as store:
+        return store.runs()
+
+
+def test_second_run_with_store_records_the_skipped_dataset(batch, tmp_path, capsys):
+    _, config, _ = batch
+    run_from_config(str(config), plots=False)
+    capsys.readouterr()
+
+    db = tmp_path / "results.sqlite"
+    run_from_config(str(config), plots=False, store_path=str(db))
+    assert "Running backtest for TEST" in capsys.readouterr().out
+    runs = _stored_runs(db)
+    assert set(runs["strategy"]) == {"EOD", "EOD_cross", "Core"}
+
+    # once the store has the runs the dataset is skipped again
+    run_from_config(str(config), plots=False, store_path=str(db))
+    assert "Skipping TEST" in capsys.readouterr().out
+    assert len(_stored_runs(db)) == len(runs)
+
+    # a different database goes stale too
+    other = tmp_path / "other.sqlite"
+    run_from_config(str(config), plots=False, store_path=str(other))
+    assert "Running backtest for TEST" in capsys.readouterr().out
+    assert len(_stored_runs(other)) == len(runs)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.metrics import CORE_METRICS, compute_metrics, metrics_batch, yearly_metrics
+from eod_strategy.simulator import simulate_positions
+from eod_strategy.strategies import run_strategies
+
+
+def calc_metrics(results):
+    """The original backtest_all.calc_metrics."""
+    n = len(results)
+    win_rate = (results["exit_reason"] == "TP").mean()
+    cum_r = results["R_mult"].cumsum()
+    return {"trades": int(n), "win_rate": round(win_rate * 100, 2),
+            "avg_r": round(float(results["R_mult"].mean()), 3),
+            "total_r": round(float(results["R_mult"].sum()), 3),
+            "max_dd": round(float((cum_r.cummax() - cum_r).max()), 3)}
+
+
+def _streak(mask):
+    best = run = 0
+    for m in mask:
+        run = run + 1 if m else 0
+        best = max(best, run)
+    return best
+
+
+@pytest.fixture
+def results(prices):
+    signals, _ = run_strategies(prices, symbol="TEST")
+    return {name: simulate_positions(sig, prices) for name, sig in signals.items()}
+
+
+def test_core_metrics_match_calc_metrics(results):
+    for res in results.values():
+        got = compute_metrics(res)
+        assert {k: got[k] for k in CORE_METRICS} == calc_metrics(res)
+
+
+def test_extended_metrics_match_brute_force(results):
+    r = results["EOD"]["R_mult"].to_numpy()
+    got = metrics_batch(r)
+    wins, losses = r[r > 0], r[r < 0]
+    assert got["avg_win"][0] == pytest.approx(wins.mean())
+    assert got["avg_loss"][0] == pytest.approx(losses.mean())
+    assert got["profit_factor"][0] == pytest.approx(wins.sum() / -losses.sum())
+    assert got["max_win_streak"][0] == _streak(r > 0)
+    assert got["max_loss_streak"][0] == _streak(r < 0)
+
+
+def test_streaks_and_averages_ignore_exit_reason():
+    # profitable Cross exits count as wins for the streaks and averages, a
+    # zero R trade is neither a win nor a loss; win_rate still counts TP exits
+    res = pd.DataFrame({
+        "R_mult": [2.0, 0.4, 2.0, -1.0, 0.0, -1.0, -0.3, 0.5],
+        "exit_reason": ["TP", "Cross", "TP", "SL", "Cross", "SL", "Cross", "Open"],
+    })
+    got = compute_metrics(res)
+    assert got["max_win_streak"] == 3
+    assert got["max_loss_streak"] == 2
+    assert got["win_rate"] == 25.0
+    assert got["avg_win"] == pytest.approx(4.9 / 4, abs=1e-3)
+    assert got["avg_loss"] == pytest.approx(-2.3 / 3, abs=1e-3)
+    assert got["profit_factor"] == pytest.approx(4.9 / 2.3, abs=1e-3)
+    assert got["expectancy"] == pytest.approx(2.6 / 8, abs=1e-3)
+
+
+def test_batch_rows_match_single_evaluations(results):
+    rows = [res["R_mult"].to_numpy() for res in results.values()]
+    width = max(map(len, rows))
+    matrix = np.vstack([np.r_[row, np.full(width - len(row), np.nan)] for row in rows])
+    batch = metrics_batch(matrix)
+    for i, row in enumerate(rows):
+        single = metrics_batch(row)
+        for key, values in batch.items():
+            np.testing.assert_allclose(values[i], single[key][0], equal_nan=True)
+
+
+def test_yearly_rows_match_per_year_subsets(results):
+    res = results["Core"]
+    table = yearly_metrics(res)
+    years = pd.to_datetime(res["timestamp"], utc=True).dt.year
+    for year, row in table.iterrows():
+        expected = compute_metrics(res[years == year])
+        for key in CORE_METRICS:
+            assert row[key] == pytest.approx(expected[key])
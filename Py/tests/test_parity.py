@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_prices
+from eod_strategy.eod_continuation import StrategyConfig, run_strategy_on_dataframe
+from eod_strategy.parity import (check_parity, first_divergence, replay, replay_incremental, sample_origins,
+                                 _strip)
+
+CONFIGS = [
+    StrategyConfig(symbol="TEST"),
+    StrategyConfig(symbol="TEST", stoch_k_len=5, use_ema_filter=False),
+    StrategyConfig(symbol="TEST", htf_timeframe="W", htf_mode="stoch", htf_stoch_k_len=5),
+]
+
+
+@pytest.fixture(scope="module")
+def short_prices():
+    return make_prices(n=160, seed=21)
+
+
+@pytest.mark.parametrize("cfg", CONFIGS)
+def test_production_replay_matches_batch(short_prices, cfg):
+    # every origin: one production run per bar
+    batch = _strip(run_strategy_on_dataframe(short_prices, cfg))
+    assert len(batch) > 0
+    assert first_divergence(replay(short_prices, cfg), batch) is None
+
+
+@pytest.mark.parametrize("cfg", CONFIGS)
+def test_incremental_engine_matches_production_replay(prices, cfg):
+    cuts = sample_origins(len(prices), origins=25)
+    incremental = replay_incremental(prices, cfg)
+    on_cuts = incremental[incremental["timestamp"].isin(prices.index[cuts])].reset_index(drop=True)
+    assert first_divergence(on_cuts, replay(prices, cfg, cuts)) is None
+    assert first_divergence(incremental, run_strategy_on_dataframe(prices, cfg)) is None
+
+
+def test_first_divergence_reports_the_first_bad_row(prices):
+    batch = _strip(run_strategy_on_dataframe(prices, CONFIGS[0]))
+    live = batch.copy()
+    live.loc[3, "stop"] += 1e-3
+    live.loc[5, "side"] = "SELL" if live.loc[5, "side"] == "BUY" else "BUY"
+    assert first_divergence(live, batch) == (3, "stop differs")
+    assert first_divergence(batch.iloc[:-1], batch) == (len(batch) - 1, f"live emitted {len(batch) - 1} rows, "
+                                                                         f"batch {len(batch)}")
+
+
+def test_sample_origins():
+    assert list(sample_origins(10, origins=0)) == list(range(1, 10))
+    cuts = sample_origins(1000, origins=50, newest=5)
+    assert cuts[0] == 1 and list(cuts[-5:]) == [995, 996, 997, 998, 999]
+    assert len(sample_origins(1, origins=50)) == 0
+
+
+def test_check_parity_on_csv(tmp_path, short_prices):
+    path = tmp_path / "TEST.csv"
+    frame = short_prices.reset_index()
+    frame["timestamp"] = frame["timestamp"].dt.strftime("%Y-%m-%d")
+    frame.to_csv(path, index=False)
+    res = check_parity(str(path), CONFIGS[0], origins=40, fast=True)
+    assert res.ok, res.detail
+    assert res.bars == len(short_prices) and res.issues == []
+
+    pd.concat([frame, frame.iloc[[-1]]]).to_csv(path, index=False)
+    assert any("duplicate" in issue for issue in check_parity(str(path), CONFIGS[0], origins=10).issues)
@@ -0,0 +1,139 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from conftest import make_prices
+from eod_strategy.publish import AlertPublisher, FileSink, Sink, SocketSink, make_sink, nightly_alerts
+from eod_strategy.strategies import run_strategies
+
+
+def _evaluated_bars(prices, name):
+    """Closed bars on which `name` has a setup in the full batch run, by position."""
+    signals, _ = run_strategies(prices, names=[name], symbol="TEST")
+    stamps = pd.DatetimeIndex(signals[name]["timestamp"])
+    return [prices.index.get_loc(ts) - 1 for ts in stamps]
+
+
+def test_fresh_setup_on_the_newest_bar_is_alerted():
+    prices = make_prices(800)
+    t = _evaluated_bars(prices, "SR")[-1]
+
+    before = nightly_alerts(prices.iloc[:t], "TEST", strategies=["SR"])
+    after = nightly_alerts(prices.iloc[:t + 1], "TEST", strategies=["SR"])
+
+    assert after, "the stochastic cross completed on the newest close must be alerted"
+    assert all(a.timestamp == prices.index[t] for a in after)
+    assert not {(a.side, a.price) for a in after} & {(a.side, a.price) for a in before}
+
+
+def test_alerts_match_batch_rows_for_each_strategy(prices):
+    signals, _ = run_strategies(prices, symbol="TEST")
+    for name, lag in (("EOD", 1), ("Core", 0)):
+        stamp = signals[name]["timestamp"].iloc[-1]
+        t = prices.index.get_loc(stamp) - lag
+        alerts = nightly_alerts(prices.iloc[:t + 1], "TEST", strategies=[name])
+        rows = signals[name][signals[name]["timestamp"] == stamp]
+        assert sorted(a.side for a in alerts) == sorted(rows["side"])
+        assert sorted(a.price for a in alerts) == sorted(rows["entry"])
+        assert all(a.timestamp == prices.index[t] for a in alerts)
+
+
+def test_date_selects_a_past_closed_bar(prices):
+    t = _evaluated_bars(prices, "SR")[0]
+    assert nightly_alerts(prices, "TEST", strategies=["SR"], bar=prices.index[t]) == \
+        nightly_alerts(prices.iloc[:t + 1], "TEST", strategies=["SR"])
+
+
+class RecordingSink(Sink):
+    """Records batches; fails the first `failures` sends, optionally waits on a gate."""
+
+    def __init__(self, name, failures=0, gate=None):
+        self.name = name
+        self.failures = failures
+        self.gate = gate
+        self.batches = []
+
+    async def send(self, batch):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise OSError("sink down")
+        self.batches.append(list(batch))
+
+
+def _publish(sinks, messages, **kwargs):
+    async def run():
+        async with AlertPublisher(sinks, **kwargs) as pub:
+            await pub.publish_many(messages)
+        return pub.stats
+    return asyncio.run(run())
+
+
+def test_batches_keep_order_and_size():
+    sink = RecordingSink("a")
+    messages = [f"m{i}" for i in range(250)]
+    stats = _publish([sink], messages, batch_size=100)
+    assert [m for b in sink.batches for m in b] == messages
+    assert max(len(b) for b in sink.batches) <= 100
+    assert (stats["a"].sent, stats["a"].failed, stats["a"].batches) == (250, 0, len(sink.batches))
+
+
+def test_failed_batches_are_retried_then_dropped_per_sink(capsys):
+    flaky, down, ok = RecordingSink("flaky", failures=2), RecordingSink("down", failures=10**6), RecordingSink("ok")
+    stats = _publish([flaky, down, ok], ["x", "y", "z"], batch_size=10, retries=3, backoff=0.0)
+    assert [m for b in flaky.batches for m in b] == ["x", "y", "z"]
+    assert (stats["flaky"].sent, stats["flaky"].retries, stats["flaky"].failed) == (3, 2, 0)
+    assert (stats["down"].sent, stats["down"].retries, stats["down"].failed) == (0, 3, 3)
+    assert stats["ok"].sent == 3
+    assert "down: dropped 3 alert(s) after 4 attempts" in capsys.readouterr().err
+
+
+def test_full_queue_applies_backpressure():
+    async def run():
+        gate = asyncio.Event()
+        sink = RecordingSink("slow", gate=gate)
+        async with AlertPublisher([sink], batch_size=1, max_queue=2, linger=0.0) as pub:
+            producer = asyncio.ensure_future(pub.publish_many(f"m{i}" for i in range(10)))
+            await asyncio.sleep(0.05)
+            assert not producer.done()
+            assert pub._queues[0].qsize() <= 2
+            gate.set()
+            await producer
+        return sink
+    sink = asyncio.run(run())
+    assert [m for b in sink.batches for m in b] == [f"m{i}" for i in range(10)]
+
+
+def test_sinks(tmp_path):
+    with pytest.raises(TypeError):
+        Sink()
+    with pytest.raises(ValueError):
+        make_sink("ftp://example")
+    with pytest.raises(ValueError):
+        AlertPublisher([])
+
+    path = tmp_path / "alerts.csv"
+    _publish([FileSink(str(path), header="h")], ["a", "b"])
+    _publish([make_sink(f"file:{path}", header="h")], ["c"])
+    assert path.read_text().splitlines() == ["h", "a", "b", "c"]
+
+    async def socket_round_trip():
+        received = []
+
+        async def handle(reader, writer):
+            received.extend((await reader.read()).decode().splitlines())
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        sink = make_sink(f"tcp://127.0.0.1:{port}")
+        assert isinstance(sink, SocketSink)
+        async with AlertPublisher([sink]) as pub:
+            await pub.publish_many(["p", "q"])
+        await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+        return received
+    assert asyncio.run(socket_round_trip()) == ["p", "q"]
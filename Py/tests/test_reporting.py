@@ -0,0 +1,23 @@
+import os
+import re
+
+import pytest
+
+from eod_strategy.backtest_all import run_all
+from eod_strategy.strategies import REGISTRY
+
+
+@pytest.mark.parametrize("strategies", [["EOD"], None])
+def test_report_links_only_written_files(tmp_path, prices, strategies):
+    csv = tmp_path / "TEST.csv"
+    prices.reset_index().to_csv(csv, index=False)
+    outdir = tmp_path / "out"
+    run_all(str(csv), "TEST", str(outdir), plots=False, strategies=strategies)
+
+    html = (outdir / "TEST_report.html").read_text()
+    links = re.findall(r'href="([^"]+)"', html)
+    names = strategies or list(REGISTRY)
+    for name in names:
+        assert f"{name.lower()}_results.csv" in links
+        assert f"{name.lower()}_signals.csv" in links
+    assert all(os.path.exists(outdir / link) for link in links)
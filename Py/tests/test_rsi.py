@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.indicators import rsi_bank
+
+LENGTHS = [2, 5, 14, 30]
+
+
+def _rsi(up, down):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(down == 0, 100.0, 100.0 * up / (up + down))
+
+
+def wilder_reference(close, length):
+    """MT5 / TradingView ta.rsi: SMA seed over the first `length` changes, then Wilder's recursion."""
+    delta = np.diff(close)
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    out = np.full(len(close), np.nan)
+    if len(delta) < length:
+        return out
+    up, down = gain[:length].mean(), loss[:length].mean()
+    out[length] = _rsi(up, down)
+    for i in range(length, len(delta)):
+        up = (up * (length - 1) + gain[i]) / length
+        down = (down * (length - 1) + loss[i]) / length
+        out[i + 1] = _rsi(up, down)
+    return out
+
+
+def pandas_reference(close, length, smoothing):
+    delta = pd.Series(close).diff()
+    gain, loss = delta.clip(lower=0), (-delta).clip(lower=0)
+    if smoothing == "ema":
+        up, down = gain.ewm(span=length, adjust=False).mean(), loss.ewm(span=length, adjust=False).mean()
+    else:
+        up, down = gain.rolling(length).mean(), loss.rolling(length).mean()
+    out = _rsi(up.to_numpy(), down.to_numpy())
+    out[np.isnan(up.to_numpy())] = np.nan
+    return out
+
+
+@pytest.fixture
+def close(prices):
+    close = prices["close"].to_numpy().copy()
+    close[100:120] = close[100] + np.arange(20)  # losing-free stretch -> RSI 100
+    return close
+
+
+def test_wilder_matches_recursive_loop(close):
+    got = rsi_bank(close, LENGTHS, "wilder")
+    for row, length in zip(got, LENGTHS):
+        np.testing.assert_allclose(row, wilder_reference(close, length), rtol=1e-9)
+        assert np.isnan(row[:length]).all() and not np.isnan(row[length])
+
+
+@pytest.mark.parametrize("smoothing", ["ema", "sma"])
+def test_ema_and_sma_match_pandas(close, smoothing):
+    got = rsi_bank(close, LENGTHS, smoothing)
+    for row, length in zip(got, LENGTHS):
+        np.testing.assert_allclose(row, pandas_reference(close, length, smoothing), rtol=1e-9)
+
+
+def test_short_and_degenerate_inputs():
+    assert rsi_bank([], [14]).shape == (1, 0)
+    assert np.isnan(rsi_bank([1.0, 2.0, 3.0], [14])).all()
+    np.testing.assert_array_equal(rsi_bank(np.arange(10.0), [3])[0, 3:], 100.0)
+    with pytest.raises(ValueError):
+        rsi_bank([1.0, 2.0], [14], "hull")
+    with pytest.raises(ValueError):
+        rsi_bank([1.0, 2.0], [0])
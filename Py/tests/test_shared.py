@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.indicators import EMA, STOCH, IndicatorGraph
+from eod_strategy.shared import SharedDatasetStore, attach
+from eod_strategy.strategies import run_strategies
+
+
+def _signal_rows(desc):
+    with attach(desc) as ds:
+        signals, _ = run_strategies(ds.prices(), graph=ds.graph(), names=["EOD", "SR"], symbol=ds.symbol)
+        out = {name: sig[["entry", "stop"]].to_numpy().sum() for name, sig in signals.items()}
+        del signals
+    return out
+
+
+def _block_exists(name):
+    return os.path.exists(os.path.join("/dev/shm", name.lstrip("/")))
+
+
+@pytest.fixture
+def graph(prices):
+    return IndicatorGraph(prices).require(EMA(5), EMA(10), STOCH(14, 3, 3)).compute()
+
+
+def test_attached_views_match_the_published_frame(prices, graph):
+    with SharedDatasetStore() as store:
+        desc = store.publish(prices, symbol="TEST", indicators=graph)
+        with attach(desc) as ds:
+            frame = ds.prices()
+            pd.testing.assert_frame_equal(frame, prices[["open", "high", "low", "close"]], check_index_type=False,
+                                          check_freq=False)
+            assert (frame.index == prices.index).all()
+            for spec, arr in ds.indicators().items():
+                np.testing.assert_array_equal(arr, graph[spec])
+                assert not arr.flags.writeable
+            del frame
+
+
+def test_workers_see_the_same_signals(prices, graph):
+    expected, _ = run_strategies(prices, names=["EOD", "SR"], symbol="TEST")
+    expected = {name: sig[["entry", "stop"]].to_numpy().sum() for name, sig in expected.items()}
+    with SharedDatasetStore() as store:
+        desc = store.publish(prices, symbol="TEST", indicators=graph)
+        for method in ("spawn", "fork"):
+            ctx = multiprocessing.get_context(method)
+            with ProcessPoolExecutor(max_workers=2, mp_context=ctx) as pool:
+                for got in pool.map(_signal_rows, [desc] * 4):
+                    assert got == pytest.approx(expected)
+            # a worker exiting must not unlink the publisher's block
+            assert _block_exists(desc.block)
+            assert _signal_rows(desc) == pytest.approx(expected)
+    assert not _block_exists(desc.block)
+    with pytest.raises(FileNotFoundError):
+        attach(desc)
+
+
+def test_concurrent_publish_and_attach_in_threads(prices):
+    register = resource_tracker.register
+    with SharedDatasetStore() as store:
+        def roundtrip(i):
+            desc = store.publish(prices.iloc[:100 + i], symbol=f"T{i}")
+            with attach(desc) as ds:
+                return desc.block, ds.arrays["close"].sum()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(roundtrip, range(32)))
+        blocks = [b for b, _ in results]
+        assert len(set(blocks)) == 32
+        for i, (_, total) in enumerate(results):
+            assert total == pytest.approx(prices["close"].iloc[:100 + i].sum())
+    assert resource_tracker.register is register
+    assert not any(_block_exists(b) for b in blocks)
+
+
+def test_publish_rejects_misaligned_indicators(prices):
+    with SharedDatasetStore() as store:
+        with pytest.raises(ValueError):
+            store.publish(prices, indicators={EMA(5): np.zeros(3)})
+        with pytest.raises(ValueError):
+            store.publish(prices.drop(columns="low"))
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.eod_continuation import stoch_cross, stochastic_kd
+from eod_strategy.simulator import TradePathIndex, reevaluate_exits, simulate_positions, stoch_cross_indices
+from eod_strategy.strategies import run_strategies
+
+
+def reference_exits(signals, prices):
+    """The original bar-by-bar loop: stop checked before target on each bar."""
+    out = []
+    for s in signals.itertuples(index=False):
+        future = prices.loc[pd.Timestamp(s.timestamp):]
+        buy = s.side == "BUY"
+        exit_price, reason, lo_seen, hi_seen = None, None, np.inf, -np.inf
+        for hi, lo, close in zip(future["high"], future["low"], future["close"]):
+            lo_seen, hi_seen = min(lo_seen, lo), max(hi_seen, hi)
+            if (lo <= s.stop) if buy else (hi >= s.stop):
+                exit_price, reason = s.stop, "SL"
+                break
+            if not np.isnan(s.tp) and ((hi >= s.tp) if buy else (lo <= s.tp)):
+                exit_price, reason = s.tp, "TP"
+                break
+        if exit_price is None:
+            exit_price, reason = future["close"].iloc[-1], "Open"
+        mae = max(s.entry - lo_seen if buy else hi_seen - s.entry, 0.0)
+        mfe = max(hi_seen - s.entry if buy else s.entry - lo_seen, 0.0)
+        if reason == "SL":
+            mae = min(mae, abs(s.entry - s.stop))
+        if reason == "TP":
+            mfe = min(mfe, abs(s.tp - s.entry))
+        out.append((exit_price, reason, mae, mfe))
+    return pd.DataFrame(out, columns=["exit_price", "exit_reason", "mae", "mfe"])
+
+
+@pytest.fixture
+def signals(prices):
+    sig, _ = run_strategies(prices, names=["EOD", "Core"], symbol="TEST")
+    return sig
+
+
+@pytest.mark.parametrize("name", ["EOD", "Core"])
+def test_exits_and_excursions_match_bar_loop(prices, signals, name):
+    sig = signals[name].iloc[::5].reset_index(drop=True)
+    res = simulate_positions(sig, prices)
+    ref = reference_exits(sig, prices)
+    assert list(res["exit_reason"]) == list(ref["exit_reason"])
+    np.testing.assert_allclose(res["exit_price"], ref["exit_price"])
+    np.testing.assert_allclose(res["mae"], ref["mae"])
+    np.testing.assert_allclose(res["mfe"], ref["mfe"])
+    risk = sig["R"] if "R" in sig else (sig["entry"] - sig["stop"]).abs()
+    np.testing.assert_allclose(res["R_mult"], res["PnL"] / risk)
+
+
+def test_reevaluate_exits_matches_resimulation(prices, signals):
+    sig = signals["EOD"]
+    index = TradePathIndex(prices)
+    res = simulate_positions(sig, prices, index)
+    variants = reevaluate_exits(res, index, tp_r=[2.0, 3.0], sl_r=[1.0, 0.5])
+    for row, (tp_r, sl_r) in enumerate([(2.0, 1.0), (3.0, 0.5)]):
+        direction = np.where(sig["side"] == "BUY", 1.0, -1.0)
+        alt = sig.assign(stop=sig["entry"] - direction * sl_r * sig["R"],
+                         tp=sig["entry"] + direction * tp_r * sig["R"])
+        np.testing.assert_allclose(variants[row], simulate_positions(alt, prices, index)["R_mult"])
+
+
+def test_signal_after_last_bar_has_no_outcome(prices):
+    sig = pd.DataFrame({"timestamp": [prices.index[-1] + pd.Timedelta(days=3)], "side": ["BUY"],
+                        "entry": [1.0], "stop": [0.5], "tp": [2.0], "R": [0.5]})
+    res = simulate_positions(sig, prices)
+    assert np.isnan(res["exit_price"].iloc[0]) and res["bars_held"].iloc[0] == -1
+
+
+def reference_cross_exits(signals, prices, k, d):
+    """Bar loop with the cross exit: SL/TP first on each bar, then the opposite cross at the close."""
+    out = []
+    times = prices.index
+    for s in signals.itertuples(index=False):
+        buy = s.side == "BUY"
+        i0 = times.searchsorted(pd.Timestamp(s.timestamp))
+        reason, exit_i = "Open", len(times) - 1
+        for i in range(i0, len(times)):
+            hi, lo = prices["high"].iloc[i], prices["low"].iloc[i]
+            if (lo <= s.stop) if buy else (hi >= s.stop):
+                reason, exit_i = "SL", i
+                break
+            if (hi >= s.tp) if buy else (lo <= s.tp):
+                reason, exit_i = "TP", i
+                break
+            if i > 0 and stoch_cross(not buy, k[i - 1], d[i - 1], k[i], d[i]):
+                reason, exit_i = "Cross", i
+                break
+        out.append((reason, exit_i))
+    return out
+
+
+def test_cross_exit_matches_bar_loop(prices, signals):
+    sig = signals["EOD"]
+    k, d = stochastic_kd(prices["high"], prices["low"], prices["close"], 5, 3, 3)
+    k, d = k.to_numpy(), d.to_numpy()
+    res = simulate_positions(sig, prices, exit_on_cross=True, cross_idx=stoch_cross_indices(k, d))
+    ref = reference_cross_exits(sig, prices, k, d)
+    assert "Cross" in set(res["exit_reason"])
+    assert list(res["exit_reason"]) == [r for r, _ in ref]
+    np.testing.assert_array_equal(res["bars_held"], [i - prices.index.searchsorted(t)
+                                                     for (_, i), t in zip(ref, sig["timestamp"])])
+    crossed = res["exit_reason"] == "Cross"
+    np.testing.assert_allclose(res.loc[crossed, "exit_price"],
+                               prices["close"].to_numpy()[[i for r, i in ref if r == "Cross"]])
+
+
+def test_default_cross_indices_use_stoch_14_3_3(prices, signals):
+    sig = signals["EOD"]
+    k, d = stochastic_kd(prices["high"], prices["low"], prices["close"])
+    explicit = simulate_positions(sig, prices, exit_on_cross=True, cross_idx=stoch_cross_indices(k, d))
+    pd.testing.assert_frame_equal(simulate_positions(sig, prices, exit_on_cross=True), explicit)
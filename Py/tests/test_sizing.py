@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.sizing import ContractSpec, load_contract_specs, size_trades
+
+
+def compute_lot_size(equity, risk_percent, entry, stop, spec):
+    """Scalar port of the EA's ComputeLotSize."""
+    sl_dist = abs(entry - stop)
+    if sl_dist <= 0:
+        return math.nan
+    lots = equity * risk_percent / 100.0 / (sl_dist * spec.tick_value / spec.tick_size)
+    lots = math.floor(lots / spec.lot_step + 1e-9) * spec.lot_step
+    return min(max(lots, spec.min_lot), spec.max_lot)
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(11)
+    n = 200
+    entry = rng.uniform(1000, 2000, n)
+    stop = entry - rng.choice([-1, 1], n) * rng.uniform(0.0, 40.0, n)
+    stop[::50] = entry[::50]
+    return pd.DataFrame({"symbol": rng.choice(["XAUUSD", "EURUSD"], n), "entry": entry, "stop": stop,
+                         "PnL": rng.normal(0, 10, n)})
+
+
+SPECS = {
+    "XAUUSD": ContractSpec("XAUUSD", tick_size=0.01, tick_value=1.0, min_lot=0.01, lot_step=0.01, max_lot=5.0),
+    "EURUSD": ContractSpec("EURUSD", tick_size=0.00001, tick_value=1.0, min_lot=0.1, lot_step=0.1, max_lot=50.0),
+}
+
+
+def test_lots_match_scalar_compute_lot_size(results):
+    sized = size_trades(results, SPECS, equity=25_000, risk_percent=1.5)
+    expected = [compute_lot_size(25_000, 1.5, r.entry, r.stop, SPECS[r.symbol]) for r in results.itertuples()]
+    np.testing.assert_allclose(sized["lots"], expected, rtol=1e-9)
+    vpp = np.array([SPECS[s].value_per_price for s in results["symbol"]])
+    np.testing.assert_allclose(sized["pnl_money"], results["PnL"] * vpp * sized["lots"])
+    assert sized["lots"].isna().sum() == 4
+
+
+def test_missing_spec_raises(results):
+    with pytest.raises(ValueError, match="No contract spec"):
+        size_trades(results, {"XAUUSD": SPECS["XAUUSD"]})
+
+
+def test_csv_and_yaml_tables_agree(tmp_path):
+    csv = tmp_path / "contracts.csv"
+    csv.write_text("Symbol,tick_size,tick_value,min_lot,lot_step,max_lot\nXAUUSD,0.01,1.0,0.01,0.01,5\n"
+                   "EURUSD,0.00001,1.0,0.1,0.1,50\n")
+    yml = tmp_path / "contracts.yaml"
+    yml.write_text("XAUUSD: {tick_size: 0.01, tick_value: 1.0, min_lot: 0.01, lot_step: 0.01, max_lot: 5}\n"
+                   "EURUSD: {tick_size: 0.00001, tick_value: 1.0, min_lot: 0.1, lot_step: 0.1, max_lot: 50}\n")
+    assert load_contract_specs(str(csv)) == load_contract_specs(str(yml)) == SPECS
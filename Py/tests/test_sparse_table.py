@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.sparse_table import SparseTable
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(3)
+    v = rng.normal(size=257)
+    v[[5, 40, 41, 200]] = np.nan
+    return v
+
+
+@pytest.mark.parametrize("op", ["min", "max"])
+def test_query_matches_brute_force(values, op):
+    table = SparseTable(values, op)
+    rng = np.random.default_rng(0)
+    lo = rng.integers(0, len(values), 500)
+    hi = np.minimum(lo + rng.integers(0, 80, 500), len(values) - 1)
+    fn = np.nanmin if op == "min" else np.nanmax
+    expected = [fn(values[a:b + 1]) if not np.isnan(values[a:b + 1]).all() else np.nan for a, b in zip(lo, hi)]
+    got = table.query(lo, hi)
+    np.testing.assert_array_equal(np.where(np.isinf(got), np.nan, got), expected)
+
+
+@pytest.mark.parametrize("op", ["min", "max"])
+@pytest.mark.parametrize("window", [1, 2, 3, 14, 64, 257, 300])
+def test_rolling_matches_pandas_on_finite_values(op, window):
+    values = np.random.default_rng(1).normal(size=257)
+    expected = getattr(pd.Series(values).rolling(window, min_periods=window), op)().to_numpy()
+    np.testing.assert_array_equal(SparseTable(values, op).rolling(window), expected)
+
+
+@pytest.mark.parametrize("op", ["min", "max"])
+def test_first_cross_matches_linear_scan(values, op):
+    table = SparseTable(values, op)
+    rng = np.random.default_rng(2)
+    start = rng.integers(0, len(values) + 3, 400)
+    level = rng.normal(scale=2.0, size=400)
+    level[::37] = np.nan
+
+    def scan(s, lv):
+        for i in range(s, len(values)):
+            if not np.isnan(lv) and (values[i] <= lv if op == "min" else values[i] >= lv):
+                return i
+        return len(values)
+
+    np.testing.assert_array_equal(table.first_cross(start, level), [scan(s, lv) for s, lv in zip(start, level)])
+
+
+def test_invalid_op_and_window():
+    with pytest.raises(ValueError):
+        SparseTable([1.0, 2.0], "mean")
+    with pytest.raises(ValueError):
+        SparseTable([1.0, 2.0]).rolling(0)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.eod_continuation import stoch_cross, stochastic_kd
+from eod_strategy.indicators import IndicatorGraph
+from eod_strategy.sr_strategy import SRStrategyConfig, nearest_sr, run_sr_strategy
+
+
+def reference_levels(high, low, t, cfg):
+    """S/R levels known at the close of bar t, found by scanning pivots one by one."""
+    levels = [lv for lv in cfg.sr_levels if lv and lv > 0]
+    if not cfg.use_pivot_sr:
+        return levels
+    left, right = cfg.pivot_left, cfg.pivot_right
+    for confirm in range(max(t - cfg.pivot_lookback + 1, 0), t + 1):
+        c = confirm - right
+        if c - left < 0:
+            continue
+        if high[c] == max(high[c - left:c + right + 1]):
+            levels.append(high[c])
+        if low[c] == min(low[c - left:c + right + 1]):
+            levels.append(low[c])
+    return levels
+
+
+def reference_nearest(price, levels, is_buy):
+    if not levels:
+        return np.nan
+    best = min(levels, key=lambda lv: abs(price - lv))
+    protective = [lv for lv in levels if (lv < price if is_buy else lv > price)]
+    if protective and (best >= price if is_buy else best <= price):
+        best = max(protective) if is_buy else min(protective)
+    return best
+
+
+def reference_signals(df, cfg):
+    """Bar-by-bar port of the platform script's OnNewBar logic."""
+    close, high, low = (df[c].to_numpy() for c in ("close", "high", "low"))
+    ef = df["close"].ewm(span=cfg.ema_fast, adjust=False).mean().to_numpy()
+    es = df["close"].ewm(span=cfg.ema_slow, adjust=False).mean().to_numpy()
+    k, d = stochastic_kd(df["high"], df["low"], df["close"], cfg.stoch_k_len, cfg.stoch_k_smooth, cfg.stoch_d_smooth)
+    k, d = k.to_numpy(), d.to_numpy()
+    rows = []
+    for t in range(1, len(df) - 1):
+        levels = reference_levels(high, low, t, cfg)
+        if not any(abs(close[t] - lv) <= close[t] * cfg.near_sr_tolerance_pct / 100.0 for lv in levels):
+            continue
+        for side, is_buy in (("BUY", True), ("SELL", False)):
+            trend = ef[t] > es[t] if is_buy else ef[t] < es[t]
+            if not (cfg.allow_counter_trend or trend) or not stoch_cross(is_buy, k[t - 1], d[t - 1], k[t], d[t]):
+                continue
+            sr = reference_nearest(close[t], levels, is_buy)
+            R = close[t] - sr if is_buy else sr - close[t]
+            if R > 0:
+                rows.append((df.index[t + 1], side, close[t], sr))
+    return rows
+
+
+@pytest.mark.parametrize("cfg", [
+    SRStrategyConfig(),
+    SRStrategyConfig(near_sr_tolerance_pct=1.5, pivot_left=3, pivot_right=2, pivot_lookback=40),
+    SRStrategyConfig(use_pivot_sr=False, sr_levels=(950.0, 1000.0, 1050.0, 0.0), near_sr_tolerance_pct=2.0,
+                     allow_counter_trend=True),
+])
+def test_vectorized_signals_match_bar_loop(prices, cfg):
+    sig = run_sr_strategy(prices, cfg)
+    ref = reference_signals(prices, cfg)
+    assert len(ref) > 0
+    assert list(zip(sig["timestamp"], sig["side"])) == [(ts, side) for ts, side, _, _ in ref]
+    np.testing.assert_allclose(sig["entry"], [r[2] for r in ref])
+    np.testing.assert_allclose(sig["stop"], [r[3] for r in ref])
+    np.testing.assert_allclose(sig["tp"] - sig["entry"], cfg.tp_r_multiple * (sig["entry"] - sig["stop"]))
+
+
+def test_nearest_sr_matches_reference():
+    rng = np.random.default_rng(5)
+    price = rng.uniform(900, 1100, 300)
+    levels = rng.uniform(850, 1150, (300, 6))
+    levels[rng.random(levels.shape) < 0.3] = np.nan
+    for is_buy in (True, False):
+        expected = [reference_nearest(p, [lv for lv in row if not np.isnan(lv)], is_buy)
+                    for p, row in zip(price, levels)]
+        np.testing.assert_array_equal(nearest_sr(price, levels, is_buy), expected)
+
+
+def test_shared_graph_gives_same_signals(prices):
+    cfg = SRStrategyConfig(near_sr_tolerance_pct=1.0)
+    pd.testing.assert_frame_equal(run_sr_strategy(prices, cfg, cache=IndicatorGraph(prices)),
+                                  run_sr_strategy(prices, cfg))
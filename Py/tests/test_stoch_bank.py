@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.eod_continuation import stochastic_kd
+from eod_strategy.indicators import rolling_extrema, stoch_bank
+
+PY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("op", ["min", "max"])
+def test_rolling_extrema_matches_pandas_with_nans(prices, op):
+    values = prices["low"].to_numpy().copy()
+    values[[0, 57, 58, 300]] = np.nan
+    windows = [1, 3, 14, 64, 600, 601]
+    got = rolling_extrema(values, windows, op)
+    for row, w in zip(got, windows):
+        expected = getattr(pd.Series(values).rolling(w, min_periods=w), op)().to_numpy()
+        np.testing.assert_array_equal(row, expected)
+
+
+def test_stoch_bank_matches_stochastic_kd(prices):
+    triples = [(14, 3, 3), (5, 3, 3), (14, 1, 1), (21, 5, 3), (5, 3, 5), (9, 1, 3)]
+    got = stoch_bank(prices["high"], prices["low"], prices["close"], triples)
+    assert got.shape == (len(triples), 2, len(prices))
+    for (k, d), triple in zip(got, triples):
+        k_ref, d_ref = stochastic_kd(prices["high"], prices["low"], prices["close"], *triple)
+        np.testing.assert_allclose(k, k_ref, rtol=1e-12)
+        np.testing.assert_allclose(d, d_ref, rtol=1e-12)
+
+
+def test_flat_ranges_give_nan_like_stochastic_kd(prices):
+    df = prices.copy()
+    df.iloc[200:220, :] = 1000.0
+    got = stoch_bank(df["high"], df["low"], df["close"], [(5, 1, 1)])[0]
+    k_ref, _ = stochastic_kd(df["high"], df["low"], df["close"], 5, 1, 1)
+    np.testing.assert_array_equal(np.isnan(got[0]), k_ref.isna())
+    with pytest.raises(ValueError):
+        stoch_bank(df["high"], df["low"], df["close"], [(0, 3, 3)])
+
+
+def test_script_mode_quickstart_runs(tmp_path):
+    # eod_continuation.py run as a script imports its siblings without the package
+    out = tmp_path / "signals.csv"
+    subprocess.run([sys.executable, os.path.join("eod_strategy", "eod_continuation.py"),
+                    os.path.join("examples", "sample_data.csv"), "--symbol", "XAUUSD", "--out", str(out)],
+                   cwd=PY_ROOT, check=True, capture_output=True)
+    assert out.exists()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.eod_continuation import StrategyConfig
+from eod_strategy.metrics import compute_metrics
+from eod_strategy.simulator import simulate_positions
+from eod_strategy.store import ResultStore, config_hash, dataset_fingerprint
+from eod_strategy.strategies import run_strategies
+
+
+@pytest.fixture
+def runs(prices):
+    out = []
+    for k_len in (5, 14):
+        cfg = StrategyConfig(symbol="TEST", stoch_k_len=k_len)
+        sig, _ = run_strategies(prices, {"EOD": cfg}, names=["EOD"])
+        res = simulate_positions(sig["EOD"], prices)
+        out.append((cfg, sig["EOD"], res, compute_metrics(res)))
+    return out
+
+
+@pytest.fixture
+def store(tmp_path, prices, runs):
+    with ResultStore(str(tmp_path / "nested" / "dir" / "results.sqlite")) as store:
+        for cfg, sig, res, met in runs:
+            store.record_run("TEST", "EOD", cfg, prices, sig, res, met, batch_id="b1")
+        yield store
+
+
+def test_trades_round_trip(store, runs):
+    cfg, sig, res, _ = runs[0]
+    trades = store.trades(run_id=1)
+    assert len(trades) == len(res)
+    pd.testing.assert_series_equal(trades["timestamp"], res["timestamp"].reset_index(drop=True),
+                                   check_names=False, check_index=False)
+    np.testing.assert_allclose(trades["r_mult"], res["R_mult"])
+    assert list(trades["exit_reason"]) == list(res["exit_reason"])
+    assert len(store.signals(run_id=1)) == len(sig)
+
+
+def test_filters_and_top_configs(store, runs, prices):
+    assert list(store.runs(params={"stoch_k_len": 5})["run_id"]) == [1]
+    assert list(store.runs(config_hash=config_hash(runs[1][0]))["run_id"]) == [2]
+    assert len(store.runs(dataset_hash=dataset_fingerprint(prices))) == 2
+    assert store.runs(symbol="OTHER").empty
+    assert store.runs(end=prices.index[0] - pd.Timedelta(days=1)).empty
+
+    best = store.top_configs("total_r", n=1)
+    expected = max((met["total_r"], i + 1) for i, (_, _, _, met) in enumerate(runs))
+    assert best["run_id"].iloc[0] == expected[1]
+    assert best["total_r"].iloc[0] == pytest.approx(expected[0])
+
+
+def test_runs_are_append_only(store, runs, prices):
+    cfg, sig, res, met = runs[0]
+    store.record_run("TEST", "EOD", cfg, prices, sig, res, met)
+    assert len(store.runs()) == 3
+    assert list(store.top_configs("total_r", n=10, params={"stoch_k_len": 5})["run_id"]) == [3]
+
+
+def test_trade_date_window(store, runs):
+    res = runs[0][2]
+    start, end = res["timestamp"].iloc[2], res["timestamp"].iloc[-3]
+    window = store.trades(run_id=1, start=start, end=end)
+    assert len(window) == ((res["timestamp"] >= start) & (res["timestamp"] <= end)).sum()
+
+
+def test_metric_names_are_not_spliced_into_sql(store, runs, prices):
+    cfg, sig, res, met = runs[0]
+    store.record_run("TEST", "EOD", cfg, prices, sig, res, {"max dd": 1.5, "x) AS y; --": 2.0})
+    assert list(store.top_configs("max dd", n=5)["max dd"]) == [1.5]
+    assert list(store.top_configs("x) AS y; --", n=5).columns)[-1] == "x) AS y; --"
+    assert store.top_configs("missing").empty
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from eod_strategy.core_strategy import run_core_strategy
+from eod_strategy.eod_continuation import StrategyConfig, run_strategy_on_dataframe
+from eod_strategy.indicators import EMA, STOCH, IndicatorGraph
+from eod_strategy.sr_strategy import SRStrategyConfig, run_sr_strategy
+from eod_strategy.strategies import REGISTRY, register_strategy, run_strategies
+
+
+def test_registry_matches_standalone_runs(prices):
+    signals, _ = run_strategies(prices, symbol="TEST")
+    pd.testing.assert_frame_equal(signals["EOD"], run_strategy_on_dataframe(prices, StrategyConfig(symbol="TEST")))
+    pd.testing.assert_frame_equal(signals["Core"], run_core_strategy(prices))
+    pd.testing.assert_frame_equal(signals["SR"], run_sr_strategy(prices, SRStrategyConfig(symbol="TEST")))
+
+
+def test_shared_indicators_are_computed_once(prices):
+    configs = {"EOD": StrategyConfig(), "SR": SRStrategyConfig()}
+    _, graph = run_strategies(prices, configs, names=["EOD", "SR"])
+    nodes = graph.nodes
+    assert len(nodes) == len(set(nodes))
+    for spec in STOCH(14, 3, 3) + [EMA(5), EMA(10)]:
+        assert spec in graph
+        assert not graph[spec].flags.writeable
+
+
+def test_graph_nodes_match_pandas(prices):
+    graph = IndicatorGraph(prices).require(EMA(20), STOCH(5, 3, 3)).compute()
+    np.testing.assert_allclose(graph.ema(20), prices["close"].ewm(span=20, adjust=False).mean(), rtol=1e-12)
+    low = prices["low"].rolling(5).min()
+    high = prices["high"].rolling(5).max()
+    k = ((prices["close"] - low) / (high - low) * 100).rolling(3).mean()
+    np.testing.assert_allclose(graph.stoch(5, 3, 3)[0], k, rtol=1e-12)
+    np.testing.assert_allclose(graph.stoch(5, 3, 3)[1], k.rolling(3).mean(), rtol=1e-12)
+
+
+def test_registered_strategy_shares_the_graph(prices):
+    seen = {}
+
+    @register_strategy("_Test", indicators=lambda cfg: [EMA(5)], default_config=lambda symbol: None)
+    def _run(prices, cfg, graph):
+        seen["ema"] = graph.ema(5)
+        return pd.DataFrame()
+
+    try:
+        _, graph = run_strategies(prices, names=["EOD", "_Test"])
+        assert seen["ema"] is graph[EMA(5)]
+    finally:
+        REGISTRY.pop("_Test")
+    with pytest.raises(ValueError):
+        run_strategies(prices, names=["_Test"])